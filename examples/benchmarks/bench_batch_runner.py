@@ -0,0 +1,45 @@
+"""Batched chat-completion runner against a local mock server that injects 429/503 failures
+
+>>> python bench_batch_runner.py --num-prompts 2000 --concurrency 32 --failure-rate 0.1
+"""
+import argparse
+import logging
+import tempfile
+import time
+from   pathlib import Path
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.openai.batch import BatchCompletionRunner
+from tests.stubs import start_stub_server, FlakyStubHandler
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-prompts",  type=int,   default=1_000)
+    parser.add_argument("--concurrency",  type=int,   default=16)
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    args   = parser.parse_args()
+
+    FlakyStubHandler.failure_rate = args.failure_rate
+    server, base_url = start_stub_server(handler=FlakyStubHandler)
+    prompts = [f"summarize the quarterly filing number {idx}" for idx in range(args.num_prompts)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        params = dict(
+            model_name="gpt-3.5-turbo", config=dict(temperature=0, max_tokens=64), credentials=dict(api_key="stub"),
+            endpoint=f"{base_url}/v1/chat/completions", max_concurrency=args.concurrency,
+            requests_per_min=600_000, tokens_per_min=60_000_000, backoff_factor=0.01,
+            checkpoint_path=Path(tmp_dir).joinpath("completions.jsonl")
+        )
+        start   = time.perf_counter()
+        results = BatchCompletionRunner(**params).run(prompts[: args.num_prompts // 2])
+        results = BatchCompletionRunner(**params).run(prompts)          # resumes the first half from the checkpoint
+        elapsed = time.perf_counter() - start
+        failed  = sum(result is None for result in results)
+        logger.info(f"prompts={len(prompts)} | prompts/sec={len(prompts) / elapsed:.1f} | failed={failed}")
+    server.shutdown()
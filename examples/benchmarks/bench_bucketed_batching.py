@@ -0,0 +1,38 @@
+"""Fixed vs length-bucketed DenseEncoder batching on texts of widely varying length
+
+>>> python bench_bucketed_batching.py --num-texts 5000 --max-tokens 16384
+"""
+import argparse
+import logging
+import random
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sentencetransformers.encoder import DenseEncoder
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_texts:int, seed:int=42) -> list:
+    # long tail of chunk lengths, as observed via DenseEncoder.get_lengths on our corpora
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    return [" ".join(rng.choices(words, k=min(int(rng.paretovariate(1.2) * 8), 400))) for _ in range(num_texts)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-texts",  type=int, default=5_000)
+    parser.add_argument("--max-tokens", type=int, default=16384)
+    args   = parser.parse_args()
+
+    texts = generate_texts(args.num_texts)
+    for batching in ['fixed', 'bucketed']:
+        enc     = DenseEncoder(batching=batching, max_tokens=args.max_tokens)
+        metrics = profile_runtime(enc.fit, texts, show_progress=False, num_items=len(texts), repeat=1)
+        logger.info(f"{batching:<8} | texts/sec={metrics['throughput']} | latency={metrics['latency_sec']}s")
+    logger.info(f"bucketed stats: {enc.batch_stats.to_dict()}")
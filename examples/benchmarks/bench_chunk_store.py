@@ -0,0 +1,58 @@
+"""Build time, peak memory and lookup latency of the dict-column frame vs the columnar ChunkStore
+
+>>> python bench_chunk_store.py --num-chunks 200000 --dim 384
+"""
+import argparse
+import logging
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from   rich.logging import RichHandler
+from   langchain.schema import Document
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.io.store import ChunkStore
+from keebler_llm.core.eval.profiler import profile_peak_memory
+from keebler_llm.integrations.langchain.reader import TransformerChunks
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-chunks", type=int, default=100_000)
+    parser.add_argument("--dim",        type=int, default=384)
+    parser.add_argument("--top-k",      type=int, default=10)
+    args   = parser.parse_args()
+
+    rng        = np.random.default_rng(42)
+    documents  = [
+        Document(page_content=f"chunk {idx} " * 40, metadata=dict(source=f"doc_{idx // 50}.pdf", page=idx % 50))
+        for idx in range(args.num_chunks)
+    ]
+    embeddings = rng.standard_normal((args.num_chunks, args.dim), dtype=np.float32)
+    scores     = [dict(corpus_id=int(idx), score=float(score)) for idx, score in zip(rng.choice(args.num_chunks, args.top_k), rng.random(args.top_k))]
+
+    start     = time.perf_counter()
+    df_chunks = TransformerChunks.trsfrm_to_frame(documents)
+    logger.info(f"frame build        | sec={time.perf_counter() - start:.2f} | memory={profile_peak_memory(TransformerChunks.trsfrm_to_frame, documents)}")
+    start     = time.perf_counter()
+    # same join as DenseEncoder.lookup
+    df_chunks.join(pd.DataFrame(scores).set_index('corpus_id')).sort_values(by='score', ascending=False)
+    logger.info(f"frame lookup       | sec={time.perf_counter() - start:.4f}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ChunkStore(tmp_dir)
+        start = time.perf_counter()
+        store.write(documents, embeddings=embeddings)
+        logger.info(f"store build+write  | sec={time.perf_counter() - start:.2f} | memory={profile_peak_memory(TransformerChunks.trsfrm_to_table, documents, embeddings)}")
+        start = time.perf_counter()
+        emb   = ChunkStore.to_numpy(store.read(columns=['embedding']))
+        logger.info(f"store embeddings   | sec={time.perf_counter() - start:.4f} | shape={emb.shape}")
+        start = time.perf_counter()
+        store.lookup(scores, columns=['text', 'meta_source', 'meta_page'])
+        logger.info(f"store lookup       | sec={time.perf_counter() - start:.4f}")
@@ -0,0 +1,42 @@
+"""Latency of repeated Experiment.create with a cold (cleared) vs warm process-wide config cache
+
+>>> python bench_config_cache.py --num-configs 500
+"""
+import argparse
+import logging
+import time
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.experiment import Experiment
+from keebler_llm.core.io.reader import config_cache_info, config_cache_clear, YamlLoader
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def create_configs(experiment:Experiment, num_configs:int, clear:bool) -> float:
+    start = time.perf_counter()
+    for idx in range(num_configs):
+        if clear:
+            config_cache_clear()
+        experiment.create(f"experiment-{idx:04d}", tags=["bench"])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-configs", type=int, default=200)
+    args   = parser.parse_args()
+
+    experiment = Experiment()
+    logger.info(f"yaml loader={YamlLoader.__name__}")
+    for name, clear in [("cold", True), ("warm", False)]:
+        config_cache_clear()
+        elapsed = create_configs(experiment, args.num_configs, clear)
+        logger.info(f"{name} | configs/sec={args.num_configs / elapsed:.1f} | ms/config={1e3 * elapsed / args.num_configs:.3f} | cache={config_cache_info()}")
+    # clones are independent, mutating one does not leak into the cache
+    first, second = experiment.create("a", tags=[]), experiment.create("b", tags=[])
+    assert first.experiment.project.name != second.experiment.project.name
@@ -0,0 +1,41 @@
+"""Cold vs warm DenseEncoder encode throughput through the on-disk embedding cache
+
+>>> python bench_embedding_cache.py --num-texts 20000 --changed 0.05
+"""
+import argparse
+import logging
+import random
+import tempfile
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sentencetransformers.encoder import DenseEncoder
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_texts:int, seed:int=42) -> list:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    return [" ".join(rng.choices(words, k=rng.randint(8, 64))) + f" #{idx}" for idx in range(num_texts)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-texts", type=int,   default=10_000)
+    parser.add_argument("--changed",   type=float, default=0.05, help="fraction of texts modified between runs")
+    parser.add_argument("--dtype",     type=str,   default="float16")
+    args   = parser.parse_args()
+
+    texts   = generate_texts(args.num_texts)
+    changed = [text + " (edited)" if idx < int(args.changed * len(texts)) else text for idx, text in enumerate(texts)]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        enc = DenseEncoder(cache=True, cache_dtype=args.dtype, cache_dir=cache_dir)
+        for name, batch in [("cold", texts), ("warm", texts), ("re-index", changed)]:
+            metrics = profile_runtime(enc.fit, batch, show_progress=False, num_items=len(batch), repeat=1)
+            logger.info(f"{name:<8} | texts/sec={metrics['throughput']} | latency={metrics['latency_sec']}s")
+        logger.info(f"cache stats: {enc.cache.stats()}")
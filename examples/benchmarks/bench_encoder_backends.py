@@ -0,0 +1,47 @@
+"""CPU latency/throughput and cosine drift of the fp32, dynamic int8 and ONNX Runtime DenseEncoder backends
+
+>>> python bench_encoder_backends.py --num-texts 4096 --num-threads 4
+"""
+import argparse
+import logging
+import random
+import torch
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sentencetransformers.encoder import DenseEncoder
+from keebler_llm.integrations.sentencetransformers.backends import cosine_drift
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_texts:int, seed:int=42) -> list:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    return [" ".join(rng.choices(words, k=rng.randint(8, 96))) for _ in range(num_texts)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-name",  type=str, default="multi-qa-MiniLM-L6-cos-v1")
+    parser.add_argument("--num-texts",   type=int, default=2048)
+    parser.add_argument("--num-threads", type=int, default=4)
+    parser.add_argument("--max-drift",   type=float, default=1e-2)
+    args   = parser.parse_args()
+
+    torch.set_num_threads(args.num_threads)
+    texts     = generate_texts(args.num_texts)
+    reference = None
+    for backend in ("torch", "int8", "onnx"):
+        enc     = DenseEncoder(args.model_name, backend=backend, num_threads=args.num_threads)
+        enc.encode_model(texts[:64], show_progress=False)                         # warm up (and export for onnx)
+        metrics = profile_runtime(enc.encode_model, texts, num_items=len(texts), repeat=3, show_progress=False)
+        emb     = enc.encode_model(texts, show_progress=False)
+        reference = emb if reference is None else reference
+        drift   = cosine_drift(reference, emb)
+        status  = "ok" if drift['max'] <= args.max_drift else "DRIFT"
+        logger.info(f"{backend:<6} | {metrics} | drift={drift} | {status}")
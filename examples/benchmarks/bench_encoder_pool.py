@@ -0,0 +1,43 @@
+"""Throughput scaling of the DenseEncoder process pool with the number of CPU workers
+
+>>> python bench_encoder_pool.py --num-texts 20000 --workers 1 2 4 8 16
+"""
+import argparse
+import logging
+import random
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sentencetransformers.encoder import DenseEncoder
+from keebler_llm.core.eval.profiler import profile_runtime, profile_device
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_texts:int, seed:int=42) -> list:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    return [" ".join(rng.choices(words, k=rng.randint(16, 128))) for _ in range(num_texts)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-texts",  type=int, default=20_000)
+    parser.add_argument("--workers",    type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--shard-size", type=int, default=512)
+    args   = parser.parse_args()
+
+    texts    = generate_texts(args.num_texts)
+    enc      = DenseEncoder()
+    baseline = None
+    logger.info(f"device: {profile_device()}")
+    for num_workers in args.workers:
+        enc.start_pool(num_workers=num_workers, num_threads=1, shard_size=args.shard_size)
+        enc.fit(texts[:num_workers * args.shard_size], show_progress=False)       # warm up the workers
+        metrics  = profile_runtime(enc.fit, texts, show_progress=False, num_items=len(texts), repeat=1)
+        baseline = baseline or metrics['throughput']
+        logger.info(f"workers={num_workers:<3} | texts/sec={metrics['throughput']} | speedup={metrics['throughput'] / baseline:.2f}x")
+        enc.stop_pool()
@@ -0,0 +1,52 @@
+"""End-to-end queries/sec and per-stage latency of the hybrid sparse+dense retriever
+
+>>> python bench_hybrid_retriever.py --num-docs 50000 --num-queries 256 --rerank-k 20
+"""
+import argparse
+import logging
+import random
+import numpy as np
+from   rich.logging import RichHandler
+from   sklearn.feature_extraction.text import TfidfVectorizer
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sklearn.encoders import EvaluatorEncoder
+from keebler_llm.integrations.sentencetransformers.encoder import DenseEncoder
+from keebler_llm.integrations.sentencetransformers.retriever import HybridRetriever
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_texts:int, seed:int=42) -> list:
+    rng   = random.Random(seed)
+    words = [f"term{idx}" for idx in range(5_000)]
+    return [" ".join(rng.choices(words, k=rng.randint(16, 96))) for _ in range(num_texts)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs",    type=int, default=20_000)
+    parser.add_argument("--num-queries", type=int, default=256)
+    parser.add_argument("--k",           type=int, default=10)
+    parser.add_argument("--rerank-k",    type=int, default=0)
+    parser.add_argument("--index-type",  type=str, default="flat")
+    args   = parser.parse_args()
+
+    texts      = generate_texts(args.num_docs)
+    queries    = [" ".join(text.split()[:8]) for text in random.Random(7).sample(texts, args.num_queries)]
+    tfidf      = TfidfVectorizer()
+    sparse_enc = EvaluatorEncoder(tfidf.fit_transform(texts), tfidf.get_feature_names_out(), indices=np.arange(len(texts)))
+    dense_enc  = DenseEncoder()
+    dense_enc.build_index(dense_enc.fit(texts, show_progress=False), index_type=args.index_type)
+    retriever  = HybridRetriever(
+        sparse_enc, tfidf.transform, dense_enc,
+        reranker_name='cross-encoder/ms-marco-MiniLM-L-6-v2' if args.rerank_k else None
+    )
+    for fusion in ['rrf', 'weighted']:
+        retriever.fusion = fusion
+        retriever.retrieve(queries, k=args.k, rerank_k=args.rerank_k)
+        stages = {stage: round(seconds * 1000, 2) for stage, seconds in retriever.timings.items()}
+        logger.info(f"{fusion:<8} | qps={args.num_queries / retriever.timings['total']:.1f} | stage ms={stages}")
@@ -0,0 +1,75 @@
+"""Cold import latency per subpackage from `python -X importtime`, with a budget guard for CI
+
+Each module is imported in a fresh interpreter; exits non-zero when a module fails to import,
+exceeds --max-ms or imports one of the --forbidden heavy dependencies
+>>> python bench_import_time.py
+>>> python bench_import_time.py --modules keebler_llm keebler_llm.core.eval.outliers --max-ms 250
+"""
+import argparse
+import logging
+import os
+import re
+import subprocess
+from   pathlib import Path
+from   rich.logging import RichHandler
+
+import  sys
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+ROOT_DIR     = Path(__file__).resolve().parents[2]
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module:str, repeat:int=3) -> dict:
+    """best of repeat cold imports, cumulative time of the module and its (transitively) imported modules"""
+    env  = dict(os.environ, PYTHONPATH=f"{ROOT_DIR}{os.pathsep}{os.environ.get('PYTHONPATH', '')}")
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, env=env)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1]}")
+        # (self_us, cumulative_us, depth, name) per imported module
+        rows = [(int(m[1]), int(m[2]), len(m[3]), m[4]) for m in map(LINE_PATTERN.match, proc.stderr.splitlines()) if m]
+        runs.append(rows)
+    rows = min(runs, key=lambda rows: sum(row[0] for row in rows))
+    return dict(
+        module   = module,
+        total_ms = sum(row[0] for row in rows) / 1e3,
+        imported = {row[3] for row in rows},
+        heaviest = sorted(rows, key=lambda row: -row[0])[:5],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules",   type=str, nargs="+", default=[
+        "keebler_llm", "keebler_llm.core", "keebler_llm.core.eval.outliers", "keebler_llm.core.io.reader",
+        "keebler_llm.integrations.openai.encoding", "keebler_llm.integrations.langchain.reader",
+    ])
+    parser.add_argument("--forbidden", type=str, nargs="*", default=["torch", "transformers", "sentence_transformers", "langchain", "omegaconf", "coloredlogs"],
+                        help="dependencies the top-level package import must not pull in")
+    parser.add_argument("--max-ms",    type=float, default=None, help="per module import budget")
+    parser.add_argument("--repeat",    type=int, default=3)
+    args   = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        try:
+            result = profile_import(module, repeat=args.repeat)
+        except RuntimeError as e:
+            # a module that no longer imports is a regression, not a skipped measurement
+            failures.append(str(e))
+            continue
+        heaviest = ", ".join(f"{name}={self_us / 1e3:.1f}ms" for self_us, _, _, name in result['heaviest'])
+        logger.info(f"{module:<45} | import_ms={result['total_ms']:>8.1f} | heaviest: {heaviest}")
+        if args.max_ms is not None and result['total_ms'] > args.max_ms:
+            failures.append(f"{module} took {result['total_ms']:.1f}ms > {args.max_ms}ms")
+        leaked = sorted(dep for dep in args.forbidden if dep in result['imported']) if module == "keebler_llm" else []
+        if leaked:
+            failures.append(f"{module} eagerly imports {leaked}")
+    for failure in failures:
+        logger.error(failure)
+    sys.exit(1 if failures else 0)
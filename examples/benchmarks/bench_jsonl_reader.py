@@ -0,0 +1,57 @@
+"""Records/sec and peak RSS of pd.read_json(lines=True) vs streaming read_jsonl_batches
+
+Run each mode in a separate process, peak RSS is a process-wide high-water mark
+>>> python bench_jsonl_reader.py --mode pandas --num-records 2000000
+>>> python bench_jsonl_reader.py --mode stream --num-records 2000000
+>>> python bench_jsonl_reader.py --mode parallel --num-records 2000000 --num-workers 8
+"""
+import argparse
+import json
+import logging
+import random
+import tempfile
+import time
+from   pathlib import Path
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.io.reader import read_jsonl_to_pandas, read_jsonl_batches
+from keebler_llm.core.eval.profiler import profile_process_memory
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_jsonl(filepath:Path, num_records:int, seed:int=42) -> None:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for idx in range(num_records):
+            record = dict(request_id=f"user-{idx:07d}", title=" ".join(rng.choices(words, k=6)),
+                          body=" ".join(rng.choices(words, k=120)), score=rng.random())
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode",        type=str, default="stream", choices=["pandas", "stream", "parallel"])
+    parser.add_argument("--num-records", type=int, default=500_000)
+    parser.add_argument("--batch-size",  type=int, default=50_000)
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--columns",     type=str, nargs="*", default=None, help="keys to project, e.g. request_id title")
+    args   = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = Path(tmp_dir).joinpath("records.jsonl")
+        generate_jsonl(filepath, args.num_records)
+        logger.info(f"generated {filepath.stat().st_size / 1e6:.1f}MB | memory={profile_process_memory()}")
+        start = time.perf_counter()
+        if args.mode == "pandas":
+            num_records = len(read_jsonl_to_pandas(str(filepath)))
+        else:
+            num_workers = args.num_workers if args.mode == "parallel" else 1
+            num_records = sum(len(df) for df in read_jsonl_batches(str(filepath), batch_size=args.batch_size, columns=args.columns, num_workers=num_workers))
+        elapsed = time.perf_counter() - start
+        logger.info(f"{args.mode:<8} | records/sec={num_records / elapsed:.1f} | records={num_records} | memory={profile_process_memory()}")
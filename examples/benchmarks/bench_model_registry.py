@@ -0,0 +1,57 @@
+"""Load time and resident memory of repeated from_pretrained vs the shared ModelRegistry
+
+Uses tiny BERT models constructed and saved locally, no downloads
+>>> python bench_model_registry.py --num-callers 8 --num-models 3
+"""
+import argparse
+import logging
+import tempfile
+import time
+from   pathlib import Path
+from   rich.logging import RichHandler
+import transformers
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.huggingface.registry import ModelRegistry, calc_model_bytes
+from keebler_llm.integrations.huggingface.tasks import get_task_mapping
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def save_tiny_model(path:Path, hidden_size:int, seed:int) -> str:
+    transformers.set_seed(seed)
+    config = transformers.BertConfig(vocab_size=1024, hidden_size=hidden_size, num_hidden_layers=2, num_attention_heads=2,
+                                     intermediate_size=4 * hidden_size, num_labels=2)
+    transformers.BertForSequenceClassification(config).save_pretrained(path)
+    return str(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-callers", type=int, default=8)
+    parser.add_argument("--num-models",  type=int, default=3)
+    parser.add_argument("--hidden-size", type=int, default=256)
+    args   = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_paths = [save_tiny_model(Path(tmp_dir).joinpath(f"tiny-{idx}"), args.hidden_size, idx) for idx in range(args.num_models)]
+        loader      = get_task_mapping()['sequence_clf']
+
+        start  = time.perf_counter()
+        models = [loader(path) for _ in range(args.num_callers) for path in model_paths]
+        logger.info(f"from_pretrained | sec={time.perf_counter() - start:.2f} | resident_mb={sum(map(calc_model_bytes, models)) / 2**20:.1f}")
+        del models
+
+        registry = ModelRegistry()
+        start    = time.perf_counter()
+        models   = [registry.get('sequence_clf', path) for _ in range(args.num_callers) for path in model_paths]
+        logger.info(f"registry        | sec={time.perf_counter() - start:.2f} | resident_mb={registry.stats()['resident_mb']:.1f}")
+        assert models[0] is models[args.num_models], "callers of the same key share one instance"
+
+        # cap at roughly two models, the least recently used one is evicted
+        capped = ModelRegistry(max_bytes=2 * calc_model_bytes(models[0]))
+        capped.warmup([dict(task='sequence_clf', model_name=path) for path in model_paths])
+        logger.info(f"capped registry | {capped.stats()}")
@@ -0,0 +1,58 @@
+"""Chunks/sec of the langchain splitters vs the native chunker on the same generated documents
+
+>>> python bench_native_chunker.py --num-docs 2000 --chunk-size 1024 --chunk-overlap 128 --num-workers 8
+"""
+import argparse
+import logging
+import random
+import time
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.langchain.reader import TransformerChunks
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_texts(num_docs:int, words_per_doc:int, seed:int=42) -> list:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    def sentence() -> str:
+        return " ".join(rng.choices(words, k=rng.randint(6, 18))).capitalize() + "."
+    def paragraph() -> str:
+        return "\n".join(" ".join(sentence() for _ in range(rng.randint(2, 5))) for _ in range(rng.randint(1, 4)))
+    return ["\n\n".join(paragraph() for _ in range(words_per_doc // 120)) for _ in range(num_docs)]
+
+
+def run(name:str, fn, texts:list) -> None:
+    start      = time.perf_counter()
+    num_chunks = fn(texts)
+    elapsed    = time.perf_counter() - start
+    logger.info(f"{name:<26} | chunks={num_chunks:>8} | chunks/sec={num_chunks / elapsed:>10.1f} | sec={elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs",       type=int, default=1_000)
+    parser.add_argument("--words-per-doc",  type=int, default=5_000)
+    parser.add_argument("--chunk-size",     type=int, default=1024)
+    parser.add_argument("--chunk-overlap",  type=int, default=128)
+    parser.add_argument("--token-size",     type=int, default=256)
+    parser.add_argument("--num-workers",    type=int, default=4)
+    args   = parser.parse_args()
+
+    texts  = generate_texts(args.num_docs, args.words_per_doc)
+    params = dict(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    tokens = dict(chunk_size=args.token_size, chunk_overlap=args.token_size // 8)
+    recursive, native = (TransformerChunks.create_splitter(name, **params) for name in ('recursive', 'native'))
+    token, native_tok = (TransformerChunks.create_splitter(name, **tokens) for name in ('token', 'native_token'))
+
+    run("langchain recursive",       lambda xs: sum(len(recursive.split_text(x)) for x in xs), texts)
+    run("native character",          lambda xs: sum(len(native.split_offsets(x)) for x in xs), texts)
+    run(f"native character x{args.num_workers}", lambda xs: sum(map(len, native.split_batch(xs, num_workers=args.num_workers))), texts)
+    run("langchain token",           lambda xs: sum(len(token.split_text(x)) for x in xs), texts)
+    run("native token",              lambda xs: sum(len(native_tok.split_offsets(x)) for x in xs), texts)
+    run(f"native token x{args.num_workers}", lambda xs: sum(map(len, native_tok.split_batch(xs, num_workers=args.num_workers))), texts)
@@ -0,0 +1,52 @@
+"""Requests/sec of service_request vs the pooled ServiceClient and AsyncServiceClient on a local stub
+
+>>> python bench_service_client.py --num-requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import logging
+import time
+from   concurrent.futures import ThreadPoolExecutor
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.services.rest import service_request, ServiceClient, AsyncServiceClient, ClientConfig
+from tests.stubs import start_stub_server
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def run_timed(name:str, fn, num_requests:int) -> None:
+    start   = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    failed  = sum(result is None for result in results)
+    logger.info(f"{name:<28} | req/sec={num_requests / elapsed:.1f} | failed={failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-requests", type=int, default=1_000)
+    parser.add_argument("--concurrency",  type=int, default=16)
+    args   = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    endpoint = f"{base_url}/v1/chat/completions"
+    bodies   = [dict(model="stub", messages=[dict(role="user", content=f"prompt number {idx}")]) for idx in range(args.num_requests)]
+    client   = ServiceClient(ClientConfig(pool_maxsize=args.concurrency))
+
+    run_timed("service_request",        lambda: [service_request(endpoint, body) for body in bodies], args.num_requests)
+    run_timed("ServiceClient",          lambda: [client.post(endpoint, body) for body in bodies], args.num_requests)
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        run_timed("service_request threads", lambda: list(executor.map(lambda body: service_request(endpoint, body), bodies)), args.num_requests)
+        run_timed("ServiceClient threads",   lambda: list(executor.map(lambda body: client.post(endpoint, body), bodies)), args.num_requests)
+
+    async def fan_out():
+        async with AsyncServiceClient(ClientConfig(pool_maxsize=args.concurrency)) as async_client:
+            return await async_client.gather(endpoint, bodies, concurrency=args.concurrency)
+    run_timed("AsyncServiceClient gather", lambda: asyncio.run(fan_out()), args.num_requests)
+    client.close()
+    server.shutdown()
@@ -0,0 +1,44 @@
+"""Memory and latency of the sparse-native EvaluatorEncoder lookups at realistic TF-IDF sizes
+
+>>> python bench_sparse_encoder.py --num-docs 1000000 --num-vocab 200000 --density 0.0002
+"""
+import argparse
+import logging
+import numpy as np
+import scipy.sparse as sp
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.sklearn.encoders import EvaluatorEncoder
+from keebler_llm.core.eval.profiler import profile_runtime, profile_peak_memory
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs",  type=int,   default=200_000)
+    parser.add_argument("--num-vocab", type=int,   default=100_000)
+    parser.add_argument("--density",   type=float, default=0.0005)
+    args   = parser.parse_args()
+
+    encodings = sp.random(args.num_docs, args.num_vocab, density=args.density, format='csr', dtype=np.float32, random_state=42)
+    vocab     = np.array([f"token_{idx}" for idx in range(args.num_vocab)])
+    logger.info(f"matrix: {encodings.shape} nnz={encodings.nnz} dense would be {np.prod(encodings.shape) * 8 / 1024 ** 3:.1f} GB")
+
+    init_mem  = profile_peak_memory(EvaluatorEncoder, encodings, vocab, np.arange(args.num_docs))
+    evaluator = EvaluatorEncoder(encodings, vocab, np.arange(args.num_docs))
+    tokens    = vocab[encodings[0].indices].tolist()[:5]
+    query     = encodings[1]
+    logger.info(f"__init__           | {init_mem}")
+    for name, fn, fn_args in [
+        ("token_to_index",     evaluator.token_to_index,     (tokens,)),
+        ("lookup_token_score", evaluator.lookup_token_score, (0, tokens)),
+        ("lookup_score",       evaluator.lookup_score,       (query,)),
+    ]:
+        metrics = profile_runtime(fn, *fn_args, repeat=5)
+        memory  = profile_peak_memory(fn, *fn_args)
+        logger.info(f"{name:<18} | latency={metrics['latency_sec']}s | peak={memory['peak_memory']} {memory['memory_units']}")
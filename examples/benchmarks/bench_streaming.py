@@ -0,0 +1,34 @@
+"""Streaming consumption metrics (time-to-first-token, inter-token latency, tokens/sec) against a local SSE stub
+
+>>> python bench_streaming.py --num-words 200 --token-delay 0.005
+"""
+import argparse
+import logging
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.openai.service import stream_chat_completion_rest
+from tests.stubs import start_stub_server, StubHandler
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-words",   type=int,   default=200)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    args   = parser.parse_args()
+
+    StubHandler.token_delay_sec = args.token_delay
+    server, base_url = start_stub_server()
+    messages = [dict(role="user", content=" ".join(f"word{idx}" for idx in range(args.num_words)))]
+    consumer = stream_chat_completion_rest(
+        "gpt-3.5-turbo", messages, dict(temperature=0), endpoint=f"{base_url}/v1/chat/completions", credentials=dict(api_key="stub")
+    )
+    message  = consumer.consume()
+    logger.info(f"received {len(message.split())} words | finish_reason={consumer.finish_reason}")
+    logger.info(f"metrics: {consumer.metrics.to_dict()}")
+    server.shutdown()
@@ -0,0 +1,57 @@
+"""Docs/sec and peak RSS of materialized vs streaming ingestion on a generated local corpus
+
+Run each mode in a separate process, peak RSS is a process-wide high-water mark
+>>> python bench_streaming_ingestion.py --mode load --num-files 2000
+>>> python bench_streaming_ingestion.py --mode lazy --num-files 2000 --num-workers 8
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+from   pathlib import Path
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.langchain.reader import Loader, TransformerChunks
+from keebler_llm.core.eval.profiler import profile_process_memory
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_corpus(root_dir:Path, num_files:int, words_per_file:int, seed:int=42) -> None:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk"]
+    for idx in range(num_files):
+        paragraphs = ["\n".join(" ".join(rng.choices(words, k=12)) for _ in range(8)) for _ in range(words_per_file // 96)]
+        root_dir.joinpath(f"doc_{idx:06d}.txt").write_text("\n\n".join(paragraphs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode",           type=str, default="lazy", choices=["load", "lazy"])
+    parser.add_argument("--num-files",      type=int, default=1_000)
+    parser.add_argument("--words-per-file", type=int, default=20_000)
+    parser.add_argument("--num-workers",    type=int, default=4)
+    args   = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = Path(tmp_dir)
+        generate_corpus(corpus_dir, args.num_files, args.words_per_file)
+        start = time.perf_counter()
+        if args.mode == "load":
+            documents  = Loader.load_content(str(corpus_dir), root_dir=tmp_dir)
+            num_docs   = len(documents)
+            num_chunks = len(TransformerChunks.trsfrm_to_chunks(documents, chunk_size=1024))
+        else:
+            # counts the documents actually streamed, a dropped file shows up as a lower docs count
+            splitter   = TransformerChunks.create_splitter('recursive', chunk_size=1024)
+            num_docs   = num_chunks = 0
+            for document in Loader.lazy_load_content(str(corpus_dir), root_dir=tmp_dir, num_workers=args.num_workers):
+                num_docs   += 1
+                num_chunks += len(splitter.split_documents([document]))
+        elapsed = time.perf_counter() - start
+        logger.info(f"{args.mode:<5} | docs/sec={num_docs / elapsed:.1f} | chunks={num_chunks} | memory={profile_process_memory()}")
@@ -0,0 +1,56 @@
+"""Samples/sec of naive df.iloc row access vs the columnar DatasetTabular (random access, batches, stream, shards)
+
+>>> python bench_tabular_dataset.py --num-rows 1000000 --num-features 32 --num-workers 4
+"""
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from   concurrent.futures import ProcessPoolExecutor
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.datasets.dataset import DatasetTabular
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def consume_shard(dataset:DatasetTabular, num_shards:int, shard_id:int, batch_size:int) -> int:
+    return sum(len(batch['label']) for batch in dataset.shard(num_shards, shard_id).iter_batches(batch_size=batch_size, shuffle=True))
+
+
+def run(name:str, fn, num_samples:int) -> None:
+    start   = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    logger.info(f"{name:<24} | samples/sec={num_samples / elapsed:>14.1f} | sec={elapsed:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-rows",     type=int, default=500_000)
+    parser.add_argument("--num-features", type=int, default=16)
+    parser.add_argument("--num-iloc",     type=int, default=20_000, help="rows sampled for the (slow) iloc baseline")
+    parser.add_argument("--batch-size",   type=int, default=1024)
+    parser.add_argument("--num-workers",  type=int, default=4)
+    args   = parser.parse_args()
+
+    rng     = np.random.default_rng(42)
+    df      = pd.DataFrame(rng.standard_normal((args.num_rows, args.num_features)), columns=[f"x{idx}" for idx in range(args.num_features)])
+    df['label'] = rng.integers(0, 10, args.num_rows)
+    dataset = DatasetTabular(df, target='label')
+    rows    = rng.integers(0, args.num_rows, args.num_iloc)
+
+    run("df.iloc rows",            lambda: [df.iloc[row] for row in rows], len(rows))
+    run("dataset[row]",            lambda: [dataset[int(row)] for row in rows], len(rows))
+    run("dataset.__getitems__",    lambda: [dataset.__getitems__(rows[start:start + args.batch_size]) for start in range(0, len(rows), args.batch_size)], len(rows))
+    run("iter_batches shuffled",   lambda: sum(1 for _ in dataset.iter_batches(batch_size=args.batch_size, shuffle=True, prefetch=4)), len(dataset))
+    run("stream samples",          lambda: sum(1 for _ in dataset), len(dataset))
+    with ProcessPoolExecutor(max_workers=args.num_workers) as executor:
+        run(f"sharded x{args.num_workers}", lambda: sum(executor.map(
+            consume_shard, [dataset] * args.num_workers, [args.num_workers] * args.num_workers, range(args.num_workers), [args.batch_size] * args.num_workers
+        )), len(dataset))
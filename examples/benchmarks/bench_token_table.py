@@ -0,0 +1,45 @@
+"""Per-token decode of Tokenizer.decode_encoding vs the shared memo table (decode_many)
+
+>>> python bench_token_table.py --num-rows 20000
+"""
+import argparse
+import logging
+import random
+import time
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.openai.encoding import Tokenizer, TokenTable
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-rows", type=int, default=20_000)
+    args   = parser.parse_args()
+
+    rng       = random.Random(42)
+    words     = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk", "EBITDA"]
+    texts     = [" ".join(rng.choices(words, k=rng.randint(16, 256))) for _ in range(args.num_rows)]
+    tokenizer = Tokenizer()
+    tokens    = tokenizer.encode_ragged(texts)
+    logger.info(f"corpus: {len(tokens)} rows, {len(tokens.ids)} tokens")
+
+    per_token = lambda: [{int(token): tokenizer.encoding.decode([int(token)]) for token in tokens[idx]} for idx in range(len(tokens))]
+    metrics   = profile_runtime(per_token, num_items=len(tokens.ids), repeat=1)
+    logger.info(f"decode([token]) per token | tokens/sec={metrics['throughput']}")
+    metrics   = profile_runtime(tokenizer.decode_many, tokens.ids, num_items=len(tokens.ids), repeat=3)
+    logger.info(f"decode_many (memo table)  | tokens/sec={metrics['throughput']}")
+
+    start = time.perf_counter()
+    TokenTable(tokenizer.encoding).build().save()
+    logger.info(f"full table build + save   | {time.perf_counter() - start:.3f}s")
+    table = TokenTable(tokenizer.encoding)
+    start = time.perf_counter()
+    table.load()
+    logger.info(f"table load from disk      | {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,43 @@
+"""Rows/sec of Tokenizer.pipe vs the batched ragged Tokenizer.pipe_batch
+
+>>> python bench_tokenizer_pipe.py --num-rows 100000 --num-threads 8
+"""
+import argparse
+import logging
+import random
+import pandas as pd
+from   rich.logging import RichHandler
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.integrations.openai.encoding import Tokenizer
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_frame(num_rows:int, seed:int=42) -> pd.DataFrame:
+    rng   = random.Random(seed)
+    words = ["revenue", "guidance", "margin", "quarter", "growth", "model", "retrieval", "index", "cash", "risk", "EBITDA", "2023"]
+    return pd.DataFrame(dict(text=[" ".join(rng.choices(words, k=rng.randint(16, 256))) for _ in range(num_rows)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-rows",    type=int, default=50_000)
+    parser.add_argument("--num-threads", type=int, default=8)
+    args   = parser.parse_args()
+
+    df        = generate_frame(args.num_rows)
+    tokenizer = Tokenizer()
+    runs      = [
+        ("pipe",                      tokenizer.pipe,       dict()),
+        ("pipe_batch",                tokenizer.pipe_batch, dict(num_threads=args.num_threads)),
+        ("pipe_batch decoded",        tokenizer.pipe_batch, dict(num_threads=args.num_threads, decoded=True)),
+        ("pipe_batch decoded+map",    tokenizer.pipe_batch, dict(num_threads=args.num_threads, decoded=True, token_map=True)),
+    ]
+    for name, fn, params in runs:
+        metrics = profile_runtime(fn, df, num_items=len(df), repeat=1, **params)
+        logger.info(f"{name:<24} | rows/sec={metrics['throughput']} | latency={metrics['latency_sec']}s")
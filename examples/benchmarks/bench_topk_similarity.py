@@ -0,0 +1,41 @@
+"""Blocked top-k similarity vs the full (n, n) cosine_similarity matrix
+
+>>> python bench_topk_similarity.py --num-docs 50000 --num-workers 4
+"""
+import argparse
+import logging
+import numpy as np
+import scipy.sparse as sp
+from   rich.logging import RichHandler
+from   sklearn.metrics.pairwise import cosine_similarity
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.search.topk import topk_similarity
+from keebler_llm.core.eval.profiler import profile_runtime, profile_peak_memory
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs",    type=int,   default=20_000)
+    parser.add_argument("--num-vocab",   type=int,   default=50_000)
+    parser.add_argument("--density",     type=float, default=0.001)
+    parser.add_argument("--k",           type=int,   default=10)
+    parser.add_argument("--num-workers", type=int,   default=4)
+    parser.add_argument("--skip-full",   action="store_true", help="skip the quadratic baseline for large corpora")
+    args   = parser.parse_args()
+
+    encodings = sp.random(args.num_docs, args.num_vocab, density=args.density, format='csr', dtype=np.float32, random_state=42)
+    if not args.skip_full:
+        metrics = profile_runtime(cosine_similarity, encodings, num_items=args.num_docs, repeat=1)
+        memory  = profile_peak_memory(cosine_similarity, encodings)
+        logger.info(f"full matrix          | rows/sec={metrics['throughput']} | peak={memory['peak_memory']} MB")
+    for num_workers in sorted({1, args.num_workers}):
+        params  = dict(k=args.k, exclude_self=True, num_workers=num_workers)
+        metrics = profile_runtime(topk_similarity, encodings, num_items=args.num_docs, repeat=1, **params)
+        memory  = profile_peak_memory(topk_similarity, encodings, **params)
+        logger.info(f"blocked workers={num_workers:<3} | rows/sec={metrics['throughput']} | peak={memory['peak_memory']} MB")
@@ -0,0 +1,64 @@
+"""Recall vs QPS of the vector indexes against the brute-force semantic_search path
+
+>>> python bench_vector_index.py --num-corpus 200000 --num-queries 1000 --dim 384
+"""
+import argparse
+import logging
+import numpy as np
+import torch
+from   rich.logging import RichHandler
+from   sentence_transformers import util
+
+import  sys
+sys.path.append('./../../')
+from keebler_llm.core.search.index import create_index
+from keebler_llm.core.eval.profiler import profile_runtime
+
+logger = logging.getLogger(f"PROGRAM:{__name__}")
+logger.addHandler(RichHandler(markup=True))
+logger.setLevel(logging.INFO)
+
+
+def generate_clustered(num_rows:int, dim:int, num_clusters:int=512, seed:int=42) -> np.ndarray:
+    # embeddings are clustered in practice, uniform noise would understate IVF recall
+    rng     = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    labels  = rng.integers(0, num_clusters, num_rows)
+    return centers[labels] + 0.5 * rng.standard_normal((num_rows, dim)).astype(np.float32)
+
+
+def calc_recall(truth:np.ndarray, approx:np.ndarray) -> float:
+    return float(np.mean([len(np.intersect1d(t, a)) / len(t) for t, a in zip(truth, approx)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-corpus",  type=int, default=100_000)
+    parser.add_argument("--num-queries", type=int, default=1_000)
+    parser.add_argument("--dim",         type=int, default=384)
+    parser.add_argument("--k",           type=int, default=10)
+    parser.add_argument("--n-lists",     type=int, default=1024)
+    args   = parser.parse_args()
+
+    corpus  = generate_clustered(args.num_corpus, args.dim)
+    queries = generate_clustered(args.num_queries, args.dim, seed=7)
+
+    # baseline: current brute-force path
+    corpus_t, queries_t = torch.from_numpy(corpus), torch.from_numpy(queries)
+    hits     = util.semantic_search(queries_t, corpus_t, top_k=args.k)
+    truth    = np.array([[h['corpus_id'] for h in q] for q in hits])
+    baseline = profile_runtime(util.semantic_search, queries_t, corpus_t, top_k=args.k, num_items=args.num_queries, repeat=1)
+    logger.info(f"semantic_search | recall@{args.k}=1.000 | qps={baseline['throughput']}")
+
+    flat = create_index('flat', dim=args.dim)
+    flat.add(corpus)
+    _, ids  = flat.search(queries, k=args.k)
+    metrics = profile_runtime(flat.search, queries, k=args.k, num_items=args.num_queries, repeat=1)
+    logger.info(f"flat            | recall@{args.k}={calc_recall(truth, ids):.3f} | qps={metrics['throughput']}")
+
+    ivf = create_index('ivf', dim=args.dim, n_lists=args.n_lists)
+    ivf.add(corpus)
+    for n_probe in [1, 4, 8, 16, 32, 64]:
+        _, ids  = ivf.search(queries, k=args.k, n_probe=n_probe)
+        metrics = profile_runtime(ivf.search, queries, k=args.k, n_probe=n_probe, num_items=args.num_queries, repeat=1)
+        logger.info(f"ivf n_probe={n_probe:<3} | recall@{args.k}={calc_recall(truth, ids):.3f} | qps={metrics['throughput']}")
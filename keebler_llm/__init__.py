@@ -1,29 +1,67 @@
-import  logging
+import  os
+import  importlib
 from    pathlib import Path
-from    omegaconf import DictConfig
-from    rich.logging import RichHandler
+from    typing import Any, Optional, TYPE_CHECKING
 
-from    .core.io.reader import read_hydra
-from    .infra.trace import configure_logging
-from    .version import watermark
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
 
-root_logger = logging.getLogger("root")
+# subpackages and attributes are resolved on first access (PEP 562), `import keebler_llm` stays cheap
+_submodules = ('core', 'datasets', 'infra', 'integrations', 'version')
+_attributes = dict(watermark='.version', configure_logging='.infra.trace', read_hydra='.core.io.reader')
+_exp_conf:Optional["DictConfig"] = None
+_configured:bool = False
 
-def setup_configure() -> DictConfig:
+select_path:Path = Path(__file__).parent.joinpath("..").resolve()
+conf_folder:Path = select_path.joinpath("config").resolve()
+
+
+def read_experiment_conf() -> "DictConfig":
+    """
+    Experiment structure installed at root, read once on first access of `keebler_llm.exp_conf`
+    :return:
+    """
+    global _exp_conf
+    if _exp_conf is None:
+        from .core.io.reader import read_hydra
+        _exp_conf = read_hydra(conf_folder.joinpath("experimentation", "experiment.yaml"))
+    return _exp_conf
+
+def setup_configure() -> "DictConfig":
     """
-    Default setup configuration upon module load
+    Explicit opt-in setup of logging for the experiment, idempotent per process
+    (set KEEBLER_LLM_SETUP=1 to run it on import as in earlier releases)
     :return:
     """
-    # load experiment structure to be installed at root
-    select_path: str = Path(__file__).parent.joinpath("..").resolve()
-    conf_folder: str = select_path.joinpath("config").resolve()
-    # gather experiment structure to be installed at root
-    exp_conf: DictConfig = read_hydra(conf_folder.joinpath("experimentation", "experiment.yaml"))
-    exp_log_dir: str = exp_conf.experiment.reporting.logs
-    exp_log_dir: str = select_path.joinpath(exp_log_dir).joinpath("..").resolve()
-    # !!!configure logging with prefix from associated experiment path
-    log_conf_path: str = Path(conf_folder).joinpath("logging.yaml")
-    configure_logging(file_path=log_conf_path, prefix=exp_log_dir)
+    global _configured
+    exp_conf = read_experiment_conf()
+    if not _configured:
+        from .infra.trace import configure_logging
+        exp_log_dir: str = exp_conf.experiment.reporting.logs
+        exp_log_dir: str = select_path.joinpath(exp_log_dir).joinpath("..").resolve()
+        # !!!configure logging with prefix from associated experiment path
+        log_conf_path: str = Path(conf_folder).joinpath("logging.yaml")
+        configure_logging(file_path=log_conf_path, prefix=exp_log_dir)
+        _configured = True
     return exp_conf
 
-exp_conf = setup_configure()
+
+def __getattr__(name:str) -> Any:
+    if name == 'exp_conf':
+        return read_experiment_conf()
+    if name in _submodules:
+        module = importlib.import_module(f".{name}", __name__)
+    elif name in _attributes:
+        module = getattr(importlib.import_module(_attributes[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # cache on the module, later lookups bypass __getattr__
+    globals()[name] = module
+    return module
+
+def __dir__() -> list:
+    return sorted(list(globals()) + list(_submodules) + list(_attributes) + ['exp_conf'])
+
+
+if os.environ.get("KEEBLER_LLM_SETUP", "0") == "1":
+    setup_configure()
@@ -1,2 +1,16 @@
-from    .experiment import Experiment 
-from    .utils import read_env, read_root_dir
\ No newline at end of file
+import  importlib
+from    typing import Any
+
+# resolved on first access, importing a core submodule does not pull in the experiment dependencies
+_attributes = dict(Experiment='.experiment', read_env='.utils', read_root_dir='.utils')
+
+
+def __getattr__(name:str) -> Any:
+    if name not in _attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_attributes[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> list:
+    return sorted(list(globals()) + list(_attributes))
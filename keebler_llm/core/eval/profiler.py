@@ -1,7 +1,8 @@
 import multiprocessing
 import psutil 
-import functools
 import time 
+import tracemalloc
+import resource
 import logging
 from   typing import Callable, Any, List
 
@@ -25,5 +26,67 @@ def profile_memory(gb_unit:bool=True) -> dict:
         used_memory      = round(memory.used / scale, 3)
     )
 
+def profile_process_memory(mb_unit:bool=True) -> dict:
+    # current resident set size of this process and its peak since start
+    scale = (1024.0 ** 2) if mb_unit else 1.0
+    peak  = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024      # reported in KB on linux
+    return dict(
+        memory_units = 'MB' if mb_unit else 'B',
+        rss_memory   = round(psutil.Process().memory_info().rss / scale, 3),
+        peak_rss     = round(peak / scale, 3)
+    )
+
 def get_data_sz_mb(data:List[str]):
     return sum(len(s.encode("utf-8")) for s in data) / 1024 / 1024
+
+
+def profile_runtime(fn:Callable, *args:Any, num_items:int=1, repeat:int=3, **kwargs:Any) -> dict:
+    """times a callable over repeated runs, reporting best latency and derived throughput
+
+    Args:
+        fn (Callable): function to profile
+        num_items (int, optional): number of items processed per call, used for throughput. Defaults to 1.
+        repeat (int, optional): number of timed runs, the fastest is reported. Defaults to 3.
+
+    Returns:
+        dict: latency in seconds and items per second
+
+    Examples:
+    >>> profile_runtime(index.search, queries, k=10, num_items=len(queries))
+    """
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    latency = min(timings)
+    return dict(
+        latency_sec = round(latency, 6),
+        throughput  = round(num_items / latency, 3) if latency > 0 else float('inf')
+    )
+
+
+def profile_peak_memory(fn:Callable, *args:Any, mb_unit:bool=True, **kwargs:Any) -> dict:
+    """traces the peak python/numpy heap allocation of a single call
+
+    Args:
+        fn (Callable): function to profile
+        mb_unit (bool, optional): report in MB rather than bytes. Defaults to True.
+
+    Returns:
+        dict: peak allocation during the call
+
+    Examples:
+    >>> profile_peak_memory(evaluator.lookup_score, query_vec, k=10)
+    """
+    scale = (1024.0 ** 2) if mb_unit else 1.0
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return dict(
+        memory_units = 'MB' if mb_unit else 'B',
+        peak_memory  = round(peak / scale, 3)
+    )
@@ -0,0 +1,157 @@
+import  os
+import  json
+import  hashlib
+import  logging
+from    pathlib import Path
+from    dataclasses import dataclass, field, asdict
+from    typing import List, Dict, Optional, Any
+from    omegaconf import DictConfig
+
+from    .utils import search_files
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path:str, block_size:int=1 << 20) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_content(content:str) -> str:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def hash_chunk(path:str, content:str) -> str:
+    # scoped by path, identical chunks of two files are distinct ids downstream
+    return hash_content(f"{path}\0{content}")
+
+
+@dataclass
+class FileRecord:
+    size:int
+    mtime_ns:int
+    content_hash:str
+    chunk_hashes:List[str] = field(default_factory=list)
+
+
+@dataclass
+class ManifestDiff:
+    added:List[str]     = field(default_factory=list)
+    modified:List[str]  = field(default_factory=list)
+    unchanged:List[str] = field(default_factory=list)
+    deleted:List[str]   = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[str]:
+        return self.added + self.modified
+
+    def summary(self) -> dict:
+        return dict(added=len(self.added), modified=len(self.modified), unchanged=len(self.unchanged), deleted=len(self.deleted))
+
+
+@dataclass
+class ManifestEvent:
+    """Hand-off unit of an incremental ingestion: 'upsert' carries new chunks, 'delete' is a tombstone"""
+    action:str                                          # 'upsert' or 'delete'
+    path:str
+    documents:List[Any]     = field(default_factory=list)
+    chunk_hashes:List[str]  = field(default_factory=list)
+    removed_hashes:List[str] = field(default_factory=list)
+
+
+class FileManifest(object):
+    """Persistent manifest of ingested files keyed by path with (size, mtime, content hash) and chunk hashes
+
+    Scans compare size/mtime first and only hash files whose stat changed, so unchanged corpora are
+    detected without reading file contents. Records are committed after downstream hand-off, so an
+    interrupted run re-processes files that were not committed.
+
+    Examples:
+    >>> manifest = FileManifest.from_experiment(exp_conf, name='filings')
+    >>> diff     = manifest.scan("data/filings", ".pdf")
+    >>> for path in diff.changed: ...; manifest.commit(path, chunk_hashes)
+    >>> for path in diff.deleted: manifest.remove(path)
+    >>> manifest.save()
+    """
+    def __init__(self, path:str):
+        self.path                      = Path(path)
+        self.records:Dict[str, FileRecord] = dict()
+        self.pending:Dict[str, FileRecord] = dict()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                self.records = {uri: FileRecord(**record) for uri, record in json.load(f).items()}
+            logger.info(f"Loaded manifest: {len(self.records)} files from {self.path}")
+
+    @classmethod
+    def from_experiment(cls, exp_conf:DictConfig, name:str='manifest') -> "FileManifest":
+        """manifest under the experiment artifacts datasets directory (config/experimentation/experiment.yaml)"""
+        return cls(Path(exp_conf.experiment.artifacts.datasets).joinpath('manifests', f"{name}.json"))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, path:str) -> bool:
+        return path in self.records
+
+    def scan(self, uri:str, extension:str) -> ManifestDiff:
+        """compares files under uri matching extension against the manifest
+
+        Args:
+            uri (str): path to directory
+            extension (str): extension pattern to search for
+
+        Returns:
+            ManifestDiff: added, modified, unchanged and deleted paths
+        """
+        diff  = ManifestDiff()
+        files = search_files(uri, extension)
+        for path in files:
+            stat   = os.stat(path)
+            record = self.records.get(path)
+            if record and record.size == stat.st_size and record.mtime_ns == stat.st_mtime_ns:
+                diff.unchanged.append(path)
+                continue
+            content_hash = hash_file(path)
+            if record and record.content_hash == content_hash:
+                # touched but identical content, refresh stat without re-ingesting
+                record.size, record.mtime_ns = stat.st_size, stat.st_mtime_ns
+                diff.unchanged.append(path)
+                continue
+            self.pending[path] = FileRecord(size=stat.st_size, mtime_ns=stat.st_mtime_ns, content_hash=content_hash)
+            (diff.modified if record else diff.added).append(path)
+        # only paths under the scanned directory with the same extension can be deleted by this scan,
+        # compared by path components so a sibling directory sharing the prefix (data/a vs data/ab) is excluded
+        root    = Path(uri)
+        present = set(files)
+        diff.deleted = sorted(
+            path for path in self.records
+            if path.endswith(extension) and path not in present and Path(path).is_relative_to(root)
+        )
+        logger.info(f"Manifest scan of {uri}: {diff.summary()}")
+        return diff
+
+    def diff_chunks(self, path:str, chunk_hashes:List[str]) -> List[str]:
+        """chunk hashes of the previous version of path which are no longer present"""
+        previous = self.records.get(path)
+        return sorted(set(previous.chunk_hashes) - set(chunk_hashes)) if previous else []
+
+    def commit(self, path:str, chunk_hashes:Optional[List[str]]=None) -> FileRecord:
+        record = self.pending.pop(path)
+        record.chunk_hashes = list(chunk_hashes or [])
+        self.records[path]  = record
+        return record
+
+    def remove(self, path:str) -> Optional[FileRecord]:
+        return self.records.pop(path, None)
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({path: asdict(record) for path, record in self.records.items()}, f)
+        # atomic replace, an interrupted save never leaves a truncated manifest
+        os.replace(tmp_path, self.path)
+        return self.path
@@ -1,13 +1,29 @@
 import  pandas as pd 
 import  hydra 
 import  yaml 
+import  json
+import  os
+import  copy
 import  logging
 import  functools
+import  itertools
+import  threading
+from    collections import deque
+from    concurrent.futures import ProcessPoolExecutor
 
 from    pathlib import Path
-from    typing import TypeVar, Callable, Optional, List, Dict, Tuple, Any
+from    typing import TypeVar, Callable, Optional, List, Dict, Tuple, Any, Generator, Union, Iterable
 from    omegaconf import DictConfig, OmegaConf
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# libyaml backed loader when pyyaml was built against it
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 from    .utils import is_valid_url
 
 logger = logging.getLogger(__name__)
@@ -34,9 +50,47 @@ def read_exec_io(func: Callable[[str, Tuple[Any, ...], Dict[str, Any]], T]
     return wrapper
 
 
+_config_cache:Dict[Tuple[str, ...], Tuple[Tuple[int, int], Any]] = dict()
+_config_stats:Dict[str, int] = dict(hits=0, misses=0)
+_config_lock = threading.Lock()
+
+def cache_config(func: Callable[..., T]) -> Callable[..., T]:
+    """memoizes a config reader per (resolved path, mtime, size), returning deep copies callers can mutate"""
+    @functools.wraps(func)
+    def wrapper(path: str, *args: Tuple[Any, ...], **kwargs: Dict[str, Any]) -> T:
+        if is_valid_url(str(path)):
+            return func(path, *args, **kwargs)
+        resolved  = Path(path).resolve()
+        stat      = resolved.stat()
+        key       = (func.__name__, str(resolved), repr(args), repr(sorted(kwargs.items())))
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with _config_lock:
+            entry = _config_cache.get(key)
+            _config_stats['hits' if entry and entry[0] == signature else 'misses'] += 1
+        if entry and entry[0] == signature:
+            return copy.deepcopy(entry[1])
+        value = func(path, *args, **kwargs)
+        with _config_lock:
+            _config_cache[key] = (signature, value)
+        return copy.deepcopy(value)
+    return wrapper
+
+def config_cache_info() -> dict:
+    """statistics of the process-wide config cache used by read_yaml/read_hydra"""
+    with _config_lock:
+        num_lookups = _config_stats['hits'] + _config_stats['misses']
+        return dict(**_config_stats, entries=len(_config_cache), hit_rate=round(_config_stats['hits'] / num_lookups, 3) if num_lookups else 0.0)
+
+def config_cache_clear() -> None:
+    with _config_lock:
+        _config_cache.clear()
+        _config_stats.update(hits=0, misses=0)
+
+
 @read_exec_io
+@cache_config
 def read_yaml(filepath: str, encoding: str = "utf-8",  *args: Tuple[Any, ...], **kwargs: Dict[str, Any]) -> Optional[dict]:
-    """Reads a Yaml file for usage primarily with configuration
+    """Reads a Yaml file for usage primarily with configuration, cached per file modification
 
     Args:
         filepath (str): path to location of file to read
@@ -46,12 +100,13 @@ def read_yaml(filepath: str, encoding: str = "utf-8",  *args: Tuple[Any, ...], *
         Optional[dict]: dictionary of contents read
     """
     with open(filepath, encoding=encoding) as f:
-        data: dict = yaml.load(f, Loader=yaml.FullLoader)
+        data: dict = yaml.load(f, Loader=YamlLoader)
         return data
 
 @read_exec_io
+@cache_config
 def read_hydra(filepath: str,  *args: Tuple[Any, ...], **kwargs: Dict[str, Any]) -> Optional[DictConfig]:
-    """Reads a Hyrda Yaml Configuraiton
+    """Reads a Hyrda Yaml Configuraiton, cached per file modification (see config_cache_info)
 
     Args:
         filepath (str): path to location of file to read
@@ -96,3 +151,139 @@ def read_jsonl_to_pandas(filepath: str,  *args: Tuple[Any, ...], **kwargs: Dict[
     """
     return pd.read_json(filepath, orient='records', lines=True)
 
+
+
+def find_line_shards(filepath:str, shard_bytes:int) -> List[Tuple[int, int]]:
+    """splits a file into [start, end) byte ranges of roughly shard_bytes aligned to line boundaries"""
+    size, shards, start = os.path.getsize(filepath), [], 0
+    with open(filepath, 'rb') as f:
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            f.readline()                                    # advance to the end of the current line
+            end = min(f.tell(), size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def iter_jsonl_range(filepath:str, start:int=0, end:Optional[int]=None, batch_size:int=10_000, columns:Optional[List[str]]=None,
+                     as_frame:bool=True, errors:Optional[List[Tuple[int, str]]]=None
+                     ) -> Generator[Union[pd.DataFrame, List[dict]], None, None]:
+    """parses lines within the byte range [start, end) into batches, appending (byte offset, error) of malformed lines to errors"""
+    errors  = [] if errors is None else errors
+    records = []
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if end is not None and offset >= end:
+                break
+            if line.strip():
+                try:
+                    record = json_loads(line)
+                    # valid json which is not an object (e.g. [1, 2] or 3) is not a record
+                    if not isinstance(record, dict):
+                        raise ValueError(f"expected a json object, received {type(record).__name__}")
+                    records.append({key: record.get(key) for key in columns} if columns else record)
+                except ValueError as e:
+                    errors.append((offset, str(e)))
+            offset += len(line)
+            if len(records) >= batch_size:
+                yield pd.DataFrame.from_records(records, columns=columns) if as_frame else records
+                records = []
+    if records:
+        yield pd.DataFrame.from_records(records, columns=columns) if as_frame else records
+
+
+def parse_jsonl_shard(filepath:str, start:int, end:int, **kwargs) -> Tuple[List[Union[pd.DataFrame, List[dict]]], List[Tuple[int, str]]]:
+    errors  = []
+    batches = list(iter_jsonl_range(filepath, start, end, errors=errors, **kwargs))
+    return batches, errors
+
+
+def rebatch(batches:Iterable[Union[pd.DataFrame, List[dict]]], batch_size:int, as_frame:bool=True
+            ) -> Generator[Union[pd.DataFrame, List[dict]], None, None]:
+    """re-cuts batches of any size (e.g. shard tails) into batches of exactly batch_size, except the last"""
+    pieces, size = [], 0
+    def join() -> Union[pd.DataFrame, List[dict]]:
+        return pd.concat(pieces, ignore_index=True) if as_frame else list(itertools.chain.from_iterable(pieces))
+    for batch in batches:
+        start = 0
+        while start < len(batch):
+            take   = min(batch_size - size, len(batch) - start)
+            pieces.append(batch.iloc[start:start + take] if as_frame else batch[start:start + take])
+            size  += take
+            start += take
+            if size == batch_size:
+                yield join()
+                pieces, size = [], 0
+    if pieces:
+        yield join()
+
+
+def read_jsonl_batches(filepath:str, batch_size:int=10_000, columns:Optional[List[str]]=None, as_frame:bool=True,
+                       num_workers:int=1, shard_bytes:int=64 << 20, max_pending:Optional[int]=None,
+                       on_error:Optional[Callable[[int, str], None]]=None
+                       ) -> Generator[Union[pd.DataFrame, List[dict]], None, None]:
+    """Streams a JSON lines file (*.jsonl) in batches with bounded memory
+
+    Lines are parsed with orjson when available. With num_workers > 1 the file is split into
+    line aligned byte shards parsed in worker processes, batches are re-cut across shard boundaries
+    and yielded in file order, at most max_pending shards are in flight. Malformed lines are reported via on_error (byte
+    offset, error) or logged, rather than failing the read.
+
+    Args:
+        filepath (str): path to location of file to read
+        batch_size (int, optional): records per batch, only the last batch may be smaller. Defaults to 10_000.
+        columns (Optional[List[str]], optional): keys to project, all keys when None
+        as_frame (bool, optional): yield DataFrames, otherwise lists of records. Defaults to True.
+        num_workers (int, optional): worker processes parsing shards. Defaults to 1.
+        shard_bytes (int, optional): approximate bytes per shard in parallel mode. Defaults to 64MB.
+        max_pending (Optional[int], optional): shards in flight, defaults to 2 * num_workers
+        on_error (Optional[Callable[[int, str], None]], optional): called per malformed line
+
+    Returns:
+        Generator[Union[pd.DataFrame, List[dict]], None, None]: batches of records
+
+    Examples:
+    >>> for df_batch in read_jsonl_batches("prompts.jsonl", batch_size=50_000, columns=['request_id', 'body']):
+    ...     process(df_batch)
+    >>> batches = read_jsonl_batches("evals.jsonl", num_workers=8, on_error=lambda offset, e: bad.append(offset))
+    """
+    if not Path(filepath).is_file():
+        logger.error(f"Path: {filepath} is malformed or does not Exist")
+        return
+    def report(errors:List[Tuple[int, str]]) -> None:
+        for offset, error in errors:
+            if on_error:
+                on_error(offset, error)
+            else:
+                logger.warning(f"Malformed line at byte {offset} of {filepath}: {error}")
+        errors.clear()
+
+    params = dict(batch_size=batch_size, columns=columns, as_frame=as_frame)
+    if num_workers <= 1:
+        errors = []
+        for batch in iter_jsonl_range(filepath, errors=errors, **params):
+            report(errors)
+            yield batch
+        report(errors)
+        return
+
+    def iter_shards() -> Generator[Union[pd.DataFrame, List[dict]], None, None]:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            pending = deque()
+            for start, end in find_line_shards(filepath, shard_bytes):
+                pending.append(executor.submit(parse_jsonl_shard, filepath, start, end, **params))
+                if len(pending) >= max_pending:
+                    batches, errors = pending.popleft().result()
+                    report(errors)
+                    yield from batches
+            while pending:
+                batches, errors = pending.popleft().result()
+                report(errors)
+                yield from batches
+
+    max_pending = max_pending or 2 * num_workers
+    # shards end with partial batches, re-cut in the parent so every batch but the last holds batch_size records
+    yield from rebatch(iter_shards(), batch_size, as_frame=as_frame)
@@ -0,0 +1,176 @@
+import  numpy as np
+import  pandas as pd
+import  uuid
+import  logging
+from    pathlib import Path
+from    typing import List, Dict, Optional, Any, Sequence, Union
+from    omegaconf import DictConfig
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+def flatten_metadata(metadatas:Sequence[dict], prefix:str='meta_') -> Dict[str, list]:
+    """flattens per row metadata dicts into columns, nested keys are joined with '_'
+
+    Args:
+        metadatas (Sequence[dict]): metadata per row
+        prefix (str, optional): column prefix. Defaults to 'meta_'.
+
+    Returns:
+        Dict[str, list]: column name to values, None where a row lacks the key
+    """
+    def flatten(metadata:dict, parent:str) -> dict:
+        items = dict()
+        for key, value in metadata.items():
+            name = f"{parent}{key}"
+            items.update(flatten(value, f"{name}_") if isinstance(value, dict) else {name: value})
+        return items
+    rows    = [flatten(metadata or dict(), prefix) for metadata in metadatas]
+    columns = dict.fromkeys(key for row in rows for key in row)
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+
+class ChunkStore(object):
+    """Columnar store of chunks persisted as (optionally partitioned) Parquet
+
+    Each row keeps chunk_id, text, start/end offsets, flattened `meta_` metadata columns and an
+    optional embedding as a fixed-size-list column. Reads are memory mapped with column projection
+    and filter pushdown, and embeddings are handed to NumPy/torch without copying the values.
+
+    Examples:
+    >>> store  = ChunkStore.from_experiment(exp_conf, name='filings', partition_cols=['meta_source'])
+    >>> store.write(chunks, embeddings=corpus_emb)
+    >>> table  = store.read(columns=['chunk_id', 'embedding'], filter=pc.field('meta_page') < 10)
+    >>> emb    = ChunkStore.to_numpy(table)                    # (n_chunks, dim) float32 view
+    >>> df     = store.lookup(scores)                          # semantic_search hits joined with chunks
+    """
+    embedding_col:str = 'embedding'
+
+    def __init__(self, path:str, partition_cols:Optional[List[str]]=None):
+        if pa is None:
+            raise ImportError("ChunkStore requires pyarrow: pip install pyarrow")
+        self.path           = Path(path)
+        self.partition_cols = partition_cols
+
+    @classmethod
+    def from_experiment(cls, exp_conf:DictConfig, name:str='chunks', **kwargs) -> "ChunkStore":
+        """store under the experiment artifacts datasets directory (config/experimentation/experiment.yaml)"""
+        return cls(Path(exp_conf.experiment.artifacts.datasets).joinpath('chunks', name), **kwargs)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists() and any(self.path.rglob('*.parquet'))
+
+    @staticmethod
+    def build_table(documents:Sequence[Any], embeddings:Optional[np.ndarray]=None, offsets:Optional[np.ndarray]=None,
+                    start_id:int=0) -> "pa.Table":
+        """builds an arrow table from chunks
+
+        Args:
+            documents (Sequence[Any]): Documents (page_content, metadata) or texts
+            embeddings (Optional[np.ndarray], optional): embeddings of shape (n_chunks, dim). Defaults to None.
+            offsets (Optional[np.ndarray], optional): [start, end) offsets of shape (n_chunks, 2), defaults to
+                the start_index/end_index metadata recorded by the chunkers when present
+            start_id (int, optional): first chunk_id. Defaults to 0.
+
+        Returns:
+            pa.Table: chunk table
+        """
+        texts     = [getattr(doc, 'page_content', doc) for doc in documents]
+        metadatas = [dict(getattr(doc, 'metadata', None) or dict()) for doc in documents]
+        if offsets is None and metadatas and all('start_index' in metadata for metadata in metadatas):
+            offsets = np.asarray([(metadata['start_index'], metadata.get('end_index', -1)) for metadata in metadatas])
+        for metadata in metadatas:
+            for key in ('start_index', 'end_index'):
+                metadata.pop(key, None)
+        columns = dict(chunk_id=pa.array(np.arange(start_id, start_id + len(texts), dtype=np.int64)), text=pa.array(texts, type=pa.string()))
+        if offsets is not None:
+            offsets          = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+            columns['start'] = pa.array(offsets[:, 0])
+            columns['end']   = pa.array(offsets[:, 1])
+        for name, values in flatten_metadata(metadatas).items():
+            try:
+                columns[name] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # mixed types across rows, keep them as strings
+                columns[name] = pa.array([None if value is None else str(value) for value in values], type=pa.string())
+        if embeddings is not None:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            columns[ChunkStore.embedding_col] = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), embeddings.shape[1])
+        return pa.table(columns)
+
+    def count(self, filter:Optional["pc.Expression"]=None) -> int:
+        return self.dataset().count_rows(filter=filter) if self.exists else 0
+
+    def write(self, documents:Union[Sequence[Any], "pa.Table"], embeddings:Optional[np.ndarray]=None,
+              offsets:Optional[np.ndarray]=None, overwrite:bool=False) -> "pa.Table":
+        """appends chunks (or a prebuilt table) as new parquet files, chunk_ids continue after existing rows"""
+        if overwrite and self.exists:
+            for file in self.path.rglob('*.parquet'):
+                file.unlink()
+        start_id = self.count()
+        if isinstance(documents, pa.Table):
+            # prebuilt tables number chunks from their own start, reassigned so ids stay unique in the store
+            chunk_ids = pa.array(np.arange(start_id, start_id + documents.num_rows, dtype=np.int64))
+            names     = documents.column_names
+            table     = documents.set_column(names.index('chunk_id'), 'chunk_id', chunk_ids) if 'chunk_id' in names else \
+                        documents.add_column(0, 'chunk_id', chunk_ids)
+        else:
+            table     = self.build_table(documents, embeddings, offsets, start_id=start_id)
+        self.path.mkdir(parents=True, exist_ok=True)
+        # unique basenames per write, appends never overwrite earlier parts of the same partition
+        pq.write_to_dataset(
+            table, root_path=str(self.path), partition_cols=self.partition_cols,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet", existing_data_behavior='overwrite_or_ignore'
+        )
+        logger.info(f"Wrote {table.num_rows} chunks to {self.path}")
+        return table
+
+    def dataset(self) -> "ds.Dataset":
+        return ds.dataset(str(self.path), format='parquet', partitioning='hive' if self.partition_cols else None)
+
+    def read(self, columns:Optional[List[str]]=None, filter:Optional["pc.Expression"]=None, memory_map:bool=True) -> "pa.Table":
+        """reads chunks with column projection and predicate pushdown
+
+        Args:
+            columns (Optional[List[str]], optional): columns to read, all when None
+            filter (Optional[pc.Expression], optional): row filter, e.g. pc.field('meta_page') < 10
+            memory_map (bool, optional): memory map the parquet files. Defaults to True.
+
+        Returns:
+            pa.Table: matching chunks
+        """
+        partitioning = 'hive' if self.partition_cols else None
+        return pq.read_table(str(self.path), columns=columns, filters=filter, memory_map=memory_map, partitioning=partitioning)
+
+    def to_frame(self, columns:Optional[List[str]]=None, filter:Optional["pc.Expression"]=None) -> pd.DataFrame:
+        return self.read(columns=columns, filter=filter).to_pandas(split_blocks=True, self_destruct=True)
+
+    def lookup(self, scores:List[dict], columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """joins semantic search hits ({'corpus_id', 'score'}) with their chunks, reading only the hit rows"""
+        df_scores = pd.DataFrame(scores).rename(columns={'corpus_id': 'chunk_id', 'score': 'dense_score'})
+        columns   = None if columns is None else ['chunk_id'] + [col for col in columns if col != 'chunk_id']
+        df_chunks = self.to_frame(columns=columns, filter=pc.field('chunk_id').isin(df_scores['chunk_id'].tolist()))
+        return df_chunks.merge(df_scores, on='chunk_id').sort_values(by='dense_score', ascending=False)
+
+    @classmethod
+    def to_numpy(cls, table:"pa.Table", column:Optional[str]=None) -> np.ndarray:
+        """embedding column as a (n_rows, dim) array, zero-copy when the column is a single chunk"""
+        array = table.column(column or cls.embedding_col)
+        # multiple record batches must be concatenated once, a single chunk is viewed in place
+        array = array.chunk(0) if array.num_chunks == 1 else array.combine_chunks()
+        return array.flatten().to_numpy(zero_copy_only=True).reshape(len(array), array.type.list_size)
+
+    @classmethod
+    def to_torch(cls, table:"pa.Table", column:Optional[str]=None) -> "torch.Tensor":
+        import torch
+        # arrow buffers are immutable, the tensor shares memory and must not be written to
+        return torch.from_numpy(cls.to_numpy(table, column))
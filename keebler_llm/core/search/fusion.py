@@ -0,0 +1,89 @@
+import  numpy as np
+from    typing import List, Optional
+
+from    .topk import Neighbors, select_topk
+
+
+def fuse_contributions(indices:np.ndarray, contributions:np.ndarray, k:int) -> Neighbors:
+    """sums per-row contributions of duplicate ids and keeps the k best fused ids per row
+
+    Args:
+        indices (np.ndarray): candidate ids of shape (n_queries, n_candidates), -1 for padding
+        contributions (np.ndarray): score contribution per candidate of shape (n_queries, n_candidates)
+        k (int): number of fused results per row
+
+    Returns:
+        Neighbors: fused ids and scores of shape (n_queries, k)
+    """
+    num_rows, num_cols = indices.shape
+    valid       = indices >= 0
+    rows        = np.broadcast_to(np.arange(num_rows)[:, None], indices.shape)[valid]
+    stride      = int(indices.max()) + 1 if valid.any() else 1
+    # (row, id) pairs as a single key, so duplicates are summed across all rows in one pass
+    keys, inverse = np.unique(rows * stride + indices[valid], return_inverse=True)
+    fused       = np.bincount(inverse, weights=contributions[valid])
+    key_rows    = keys // stride
+    positions   = np.arange(len(keys)) - np.searchsorted(key_rows, key_rows, side='left')
+    dense_sc    = np.full((num_rows, num_cols), -np.inf, dtype=np.float32)
+    dense_ids   = np.full((num_rows, num_cols), -1, dtype=np.int64)
+    dense_sc[key_rows, positions]  = fused
+    dense_ids[key_rows, positions] = keys % stride
+    scores, cols = select_topk(dense_sc, k)
+    ids          = np.where(cols >= 0, np.take_along_axis(dense_ids, np.maximum(cols, 0), axis=1), -1)
+    return Neighbors(indices=ids, scores=scores)
+
+
+def reciprocal_rank_fusion(candidates:List[Neighbors], k:int=10, rrf_k:int=60, weights:Optional[List[float]]=None) -> Neighbors:
+    """fuses ranked candidate lists by summing weight / (rrf_k + rank) per id
+
+    Args:
+        candidates (List[Neighbors]): ranked candidates per generator, each of shape (n_queries, k_i)
+        k (int, optional): number of fused results. Defaults to 10.
+        rrf_k (int, optional): rank smoothing constant. Defaults to 60.
+        weights (Optional[List[float]], optional): per generator weights. Defaults to uniform.
+
+    Returns:
+        Neighbors: fused ids and rrf scores of shape (n_queries, k)
+
+    Examples:
+    >>> fused = reciprocal_rank_fusion([sparse_neighbors, dense_neighbors], k=10)
+    """
+    weights       = weights or [1.0] * len(candidates)
+    indices       = np.concatenate([cand.indices for cand in candidates], axis=1)
+    contributions = np.concatenate([
+        np.broadcast_to(weight / (rrf_k + np.arange(1, cand.k + 1)), cand.indices.shape)
+        for cand, weight in zip(candidates, weights)
+    ], axis=1)
+    return fuse_contributions(indices, contributions, k)
+
+
+def normalize_scores(scores:np.ndarray, valid:np.ndarray) -> np.ndarray:
+    # per row min-max over valid entries, constant rows map to 1
+    masked_min = np.where(valid, scores, np.inf).min(axis=1, keepdims=True)
+    masked_max = np.where(valid, scores, -np.inf).max(axis=1, keepdims=True)
+    spread     = masked_max - masked_min
+    normalized = np.where(spread > 0, (scores - masked_min) / np.where(spread > 0, spread, 1.0), 1.0)
+    return np.where(valid, normalized, 0.0)
+
+
+def weighted_score_fusion(candidates:List[Neighbors], k:int=10, weights:Optional[List[float]]=None) -> Neighbors:
+    """fuses candidates by a weighted sum of per-query min-max normalized scores
+
+    Args:
+        candidates (List[Neighbors]): scored candidates per generator, each of shape (n_queries, k_i)
+        k (int, optional): number of fused results. Defaults to 10.
+        weights (Optional[List[float]], optional): per generator weights. Defaults to uniform.
+
+    Returns:
+        Neighbors: fused ids and scores of shape (n_queries, k)
+
+    Examples:
+    >>> fused = weighted_score_fusion([sparse_neighbors, dense_neighbors], k=10, weights=[0.3, 0.7])
+    """
+    weights       = weights or [1.0 / len(candidates)] * len(candidates)
+    indices       = np.concatenate([cand.indices for cand in candidates], axis=1)
+    contributions = np.concatenate([
+        weight * normalize_scores(cand.scores, cand.indices >= 0)
+        for cand, weight in zip(candidates, weights)
+    ], axis=1)
+    return fuse_contributions(indices, contributions, k)
@@ -0,0 +1,397 @@
+import  numpy as np
+import  json
+import  logging
+from    pathlib import Path
+from    typing import Optional, Tuple, Dict, Any
+
+from    .topk import to_numpy, normalize_rows, select_topk
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore(object):
+    """Growable contiguous buffer of (ids, vectors) with amortized appends and compacting removals"""
+    def __init__(self, dim:int):
+        self.dim      = dim
+        self.size     = 0
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._ids     = np.empty((0,), dtype=np.int64)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self.size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.size]
+
+    def append(self, vectors:np.ndarray, ids:np.ndarray) -> None:
+        num_total = self.size + len(ids)
+        if num_total > len(self._ids):
+            # double capacity to amortize incremental adds
+            capacity      = max(num_total, 2 * len(self._ids), 16)
+            self._vectors = np.resize(self._vectors, (capacity, self.dim))
+            self._ids     = np.resize(self._ids, (capacity,))
+        self._vectors[self.size:num_total] = vectors
+        self._ids[self.size:num_total]     = ids
+        self.size = num_total
+
+    def remove(self, ids:np.ndarray) -> int:
+        keep        = ~np.isin(self.ids, ids)
+        num_removed = int(self.size - keep.sum())
+        if num_removed:
+            vectors, kept_ids = self.vectors[keep], self.ids[keep]
+            self.size = 0
+            self.append(vectors, kept_ids)
+        return num_removed
+
+
+class VectorIndex(object):
+    """Base vector index, cosine metric normalizes vectors on add/search, 'ip' uses raw inner product"""
+    index_type:str = None
+
+    def __init__(self, dim:int, metric:str='cosine'):
+        if metric not in ('cosine', 'ip'):
+            raise ValueError(f"Unsupported metric: {metric}, expected one of ['cosine', 'ip']")
+        self.dim     = dim
+        self.metric  = metric
+        self.next_id = 0
+        self.id_set  = set()     # ids present in the index, O(batch) duplicate checks on add
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"Class: {self.__class__.__name__} | Metric: {self.metric} | Shape: ({len(self)}, {self.dim})"
+
+    def prepare(self, vectors:Any) -> np.ndarray:
+        vectors = np.atleast_2d(to_numpy(vectors))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Dimension mismatch: expected {self.dim}, received {vectors.shape[1]}")
+        return normalize_rows(vectors) if self.metric == 'cosine' else vectors
+
+    def assign_ids(self, num_rows:int, ids:Optional[np.ndarray]=None) -> np.ndarray:
+        # sequential ids mirror the corpus_id of the brute-force path, they never collide with existing ids
+        if ids is None:
+            ids = np.arange(self.next_id, self.next_id + num_rows, dtype=np.int64)
+        else:
+            ids = to_numpy(ids, np.int64).ravel()
+            if len(np.unique(ids)) != len(ids):
+                raise ValueError("Duplicate ids within the added batch")
+            existing = [idx for idx in ids.tolist() if idx in self.id_set]
+            if existing:
+                raise ValueError(f"ids already present in the index: {existing[:5]}, remove them first")
+        if len(ids) != num_rows:
+            raise ValueError(f"Number of ids ({len(ids)}) does not match number of vectors ({num_rows})")
+        self.next_id = max(self.next_id, int(ids.max()) + 1) if len(ids) else self.next_id
+        self.id_set.update(ids.tolist())
+        return ids
+
+    def get_ids(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def add(self, vectors:Any, ids:Optional[np.ndarray]=None) -> np.ndarray:
+        raise NotImplementedError
+
+    def remove(self, ids:np.ndarray) -> int:
+        raise NotImplementedError
+
+    def search(self, queries:Any, k:int=10, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def get_params(self) -> dict:
+        return dict(dim=self.dim, metric=self.metric)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def set_arrays(self, arrays:Dict[str, np.ndarray]) -> None:
+        raise NotImplementedError
+
+    def save(self, path:str) -> Path:
+        """persists the index as a single compressed numpy archive (*.npz)
+
+        Args:
+            path (str): output file path
+
+        Returns:
+            Path: location of the persisted index
+        """
+        path = Path(path).with_suffix('.npz')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = dict(index_type=self.index_type, next_id=self.next_id, params=self.get_params())
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), **self.get_arrays())
+        logger.info(f"Persisted {self} to {path}")
+        return path
+
+
+class IndexFlat(VectorIndex):
+    """Exact index, scans every stored vector in query blocks
+
+    Examples:
+    >>> index = IndexFlat(dim=384)
+    >>> index.add(corpus_emb)
+    >>> scores, ids = index.search(query_emb, k=10)
+    """
+    index_type:str = 'flat'
+
+    def __init__(self, dim:int, metric:str='cosine', query_block_size:int=256):
+        super().__init__(dim, metric)
+        self.query_block_size = query_block_size
+        self.store            = VectorStore(dim)
+
+    def __len__(self) -> int:
+        return self.store.size
+
+    def get_ids(self) -> np.ndarray:
+        return self.store.ids
+
+    def add(self, vectors:Any, ids:Optional[np.ndarray]=None) -> np.ndarray:
+        vectors = self.prepare(vectors)
+        ids     = self.assign_ids(len(vectors), ids)
+        self.store.append(vectors, ids)
+        return ids
+
+    def remove(self, ids:np.ndarray) -> int:
+        ids = to_numpy(ids, np.int64).ravel()
+        self.id_set.difference_update(ids.tolist())
+        return self.store.remove(ids)
+
+    def search(self, queries:Any, k:int=10, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+        queries  = self.prepare(queries)
+        scores   = np.empty((len(queries), k), dtype=np.float32)
+        ids      = np.empty((len(queries), k), dtype=np.int64)
+        # bound the (block, n) score matrix rather than materializing (n_queries, n)
+        for start in range(0, len(queries), self.query_block_size):
+            end               = start + self.query_block_size
+            block_sc, block_i = select_topk(queries[start:end] @ self.store.vectors.T, k)
+            scores[start:end] = block_sc
+            # -1 padded positions (fewer than k vectors, or an empty index) are clamped before the lookup
+            ids[start:end]    = np.where(block_i >= 0, self.store.ids[np.maximum(block_i, 0)], -1) if self.store.size else -1
+        return scores, ids
+
+    def get_params(self) -> dict:
+        return dict(super().get_params(), query_block_size=self.query_block_size)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        return dict(vectors=self.store.vectors, ids=self.store.ids)
+
+    def set_arrays(self, arrays:Dict[str, np.ndarray]) -> None:
+        self.store  = VectorStore(self.dim)
+        self.store.append(arrays['vectors'], arrays['ids'])
+        self.id_set = set(self.store.ids.tolist())
+
+
+class IndexIVF(VectorIndex):
+    """Approximate inverted file index, vectors are bucketed by k-means centroid and only
+    the n_probe closest lists are scanned per query
+
+    Vectors added before training are buffered (and searched exactly) until at least n_lists are
+    available, the centroids are then trained on the buffer and it is distributed to the lists.
+
+    Recall/latency knobs:
+        n_lists: number of k-means partitions, more lists means smaller scans per probe
+        n_probe: lists scanned per query, higher improves recall at the cost of latency
+
+    Examples:
+    >>> index = IndexIVF(dim=384, n_lists=1024, n_probe=16)
+    >>> index.add(corpus_emb)               # trains centroids once n_lists vectors were added
+    >>> scores, ids = index.search(query_emb, k=10, n_probe=32)
+    """
+    index_type:str = 'ivf'
+
+    def __init__(self, dim:int, metric:str='cosine', n_lists:int=256, n_probe:int=8,
+                 n_iter:int=10, max_train_per_list:int=256, seed:int=42):
+        super().__init__(dim, metric)
+        self.n_lists            = n_lists
+        self.n_probe            = n_probe
+        self.n_iter             = n_iter
+        self.max_train_per_list = max_train_per_list
+        self.seed               = seed
+        self.centroids          = None
+        self.lists              = [VectorStore(dim) for _ in range(n_lists)]
+        self.pending            = VectorStore(dim)      # vectors added before training
+
+    def __len__(self) -> int:
+        return sum(store.size for store in self.lists) + self.pending.size
+
+    def get_ids(self) -> np.ndarray:
+        return np.concatenate([store.ids for store in self.lists] + [self.pending.ids])
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def assign(self, vectors:np.ndarray, block_size:int=8192) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[start:start + block_size] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), block_size)
+        ]) if len(vectors) else np.empty((0,), dtype=np.int64)
+
+    def train(self, vectors:Any) -> np.ndarray:
+        """learns the coarse centroids with (spherical for cosine) k-means on a subsample, buffered
+        vectors added before training (and, when retraining, vectors already in the lists) are then
+        assigned to the new lists
+
+        Args:
+            vectors (Any): training vectors of shape (n_rows, dim)
+
+        Returns:
+            np.ndarray: centroids of shape (n_lists, dim)
+        """
+        rng     = np.random.default_rng(self.seed)
+        vectors = self.prepare(vectors)
+        if len(vectors) < self.n_lists:
+            raise ValueError(f"Training requires at least n_lists={self.n_lists} vectors, received {len(vectors)}")
+        max_train = self.n_lists * self.max_train_per_list
+        sample    = vectors[rng.choice(len(vectors), max_train, replace=False)] if len(vectors) > max_train else vectors
+        self.centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            labels  = self.assign(sample)
+            counts  = np.bincount(labels, minlength=self.n_lists)
+            sums    = np.zeros_like(self.centroids)
+            np.add.at(sums, labels, sample)
+            empty   = counts == 0
+            # reseed empty partitions with random samples
+            sums[empty]   = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            counts[empty] = 1
+            self.centroids = sums / counts[:, None]
+            self.centroids = normalize_rows(self.centroids) if self.metric == 'cosine' else self.centroids
+        self.centroids = self.centroids.astype(np.float32)
+        stores         = [store for store in self.lists + [self.pending] if store.size]
+        self.lists     = [VectorStore(self.dim) for _ in range(self.n_lists)]
+        self.pending   = VectorStore(self.dim)
+        if stores:
+            self.insert(np.concatenate([store.vectors for store in stores]), np.concatenate([store.ids for store in stores]))
+        return self.centroids
+
+    def add(self, vectors:Any, ids:Optional[np.ndarray]=None) -> np.ndarray:
+        vectors = self.prepare(vectors)
+        ids     = self.assign_ids(len(vectors), ids)
+        if self.is_trained:
+            self.insert(vectors, ids)
+            return ids
+        # k-means needs at least n_lists vectors, small first batches are buffered until then
+        self.pending.append(vectors, ids)
+        if self.pending.size >= self.n_lists:
+            self.train(self.pending.vectors)
+        return ids
+
+    def insert(self, vectors:np.ndarray, ids:np.ndarray) -> None:
+        labels  = self.assign(vectors)
+        order   = np.argsort(labels, kind='stable')
+        bounds  = np.searchsorted(labels[order], np.arange(self.n_lists + 1))
+        for list_id in np.flatnonzero(np.diff(bounds)):
+            rows = order[bounds[list_id]:bounds[list_id + 1]]
+            self.lists[list_id].append(vectors[rows], ids[rows])
+
+    def remove(self, ids:np.ndarray) -> int:
+        ids = to_numpy(ids, np.int64).ravel()
+        self.id_set.difference_update(ids.tolist())
+        return sum(store.remove(ids) for store in self.lists + [self.pending] if store.size)
+
+    def search(self, queries:Any, k:int=10, n_probe:Optional[int]=None, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+        queries       = self.prepare(queries)
+        if not self.is_trained:
+            if not self.pending.size:
+                raise ValueError("Index must be trained (or populated via add) before search")
+            # exact scan of the buffered vectors until the index is trained
+            scores, positions = select_topk(queries @ self.pending.vectors.T, k)
+            return scores, np.where(positions >= 0, self.pending.ids[np.maximum(positions, 0)], -1)
+        n_probe       = min(n_probe or self.n_probe, self.n_lists)
+        num_queries   = len(queries)
+        _, probes     = select_topk(queries @ self.centroids.T, n_probe)
+        cand_scores   = np.full((num_queries, n_probe, k), -np.inf, dtype=np.float32)
+        cand_ids      = np.full((num_queries, n_probe, k), -1, dtype=np.int64)
+        # group (query, probe) pairs by list so each list is scanned once for all of its queries
+        flat_probes   = probes.ravel()
+        order         = np.argsort(flat_probes, kind='stable')
+        bounds        = np.searchsorted(flat_probes[order], np.arange(self.n_lists + 1))
+        for list_id in np.flatnonzero(np.diff(bounds)):
+            store = self.lists[list_id]
+            if not store.size:
+                continue
+            pairs             = order[bounds[list_id]:bounds[list_id + 1]]
+            q_rows, p_cols    = pairs // n_probe, pairs % n_probe
+            block_sc, block_i = select_topk(queries[q_rows] @ store.vectors.T, k)
+            cand_scores[q_rows, p_cols] = block_sc
+            cand_ids[q_rows, p_cols]    = np.where(block_i >= 0, store.ids[block_i], -1)
+        # merge per-probe candidates into the final top-k
+        cand_scores       = cand_scores.reshape(num_queries, -1)
+        cand_ids          = cand_ids.reshape(num_queries, -1)
+        scores, positions = select_topk(cand_scores, k)
+        ids               = np.where(positions >= 0, np.take_along_axis(cand_ids, np.maximum(positions, 0), axis=1), -1)
+        return scores, ids
+
+    def get_params(self) -> dict:
+        return dict(
+            super().get_params(), n_lists=self.n_lists, n_probe=self.n_probe, n_iter=self.n_iter,
+            max_train_per_list=self.max_train_per_list, seed=self.seed
+        )
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        sizes = np.array([store.size for store in self.lists], dtype=np.int64)
+        return dict(
+            centroids       = self.centroids if self.is_trained else np.empty((0, self.dim), dtype=np.float32),
+            vectors         = np.concatenate([store.vectors for store in self.lists]),
+            ids             = np.concatenate([store.ids for store in self.lists]),
+            list_sizes      = sizes,
+            pending_vectors = self.pending.vectors,
+            pending_ids     = self.pending.ids
+        )
+
+    def set_arrays(self, arrays:Dict[str, np.ndarray]) -> None:
+        self.centroids = arrays['centroids'] if len(arrays['centroids']) else None
+        self.lists     = [VectorStore(self.dim) for _ in range(self.n_lists)]
+        self.pending   = VectorStore(self.dim)
+        if 'pending_ids' in arrays:
+            self.pending.append(arrays['pending_vectors'], arrays['pending_ids'])
+        offsets        = np.concatenate([[0], np.cumsum(arrays['list_sizes'])])
+        for list_id, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+            if end > start:
+                self.lists[list_id].append(arrays['vectors'][start:end], arrays['ids'][start:end])
+        self.id_set    = set(self.get_ids().tolist())
+
+
+def lookup_index(index_type:str) -> dict:
+    index_lookup = dict(
+        flat = dict(cls_loader=IndexFlat),
+        ivf  = dict(cls_loader=IndexIVF),
+    )
+    if index_type not in index_lookup:
+        raise ValueError(f"Unsupported index type: {index_type}, expected one of {list(index_lookup)}")
+    return index_lookup.get(index_type)
+
+
+def create_index(index_type:str, dim:int, **kwargs) -> VectorIndex:
+    """creates an empty vector index of a registered type
+
+    Args:
+        index_type (str): registered index type, e.g., 'flat', 'ivf'
+        dim (int): embedding dimension
+
+    Returns:
+        VectorIndex: empty index
+
+    Examples:
+    >>> index = create_index('ivf', dim=384, n_lists=1024, n_probe=16)
+    """
+    return lookup_index(index_type).get('cls_loader')(dim=dim, **kwargs)
+
+
+def load_index(path:str) -> VectorIndex:
+    """loads a persisted index (*.npz) created via VectorIndex.save
+
+    Args:
+        path (str): path to the persisted index
+
+    Returns:
+        VectorIndex: restored index
+    """
+    with np.load(Path(path).with_suffix('.npz'), allow_pickle=False) as archive:
+        meta   = json.loads(str(archive['meta']))
+        arrays = {name: archive[name] for name in archive.files if name != 'meta'}
+    index = create_index(meta['index_type'], **meta['params'])
+    index.set_arrays(arrays)
+    index.next_id = meta['next_id']
+    return index
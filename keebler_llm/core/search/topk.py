@@ -0,0 +1,196 @@
+import  numpy as np 
+import  pandas as pd 
+import  scipy.sparse as sp
+from    concurrent.futures import ThreadPoolExecutor
+from    dataclasses import dataclass
+from    typing import List, Tuple, Any, Optional
+
+
+def to_numpy(data:Any, dtype:np.dtype=np.float32) -> np.ndarray:
+    """converts array-likes (numpy, torch tensors, lists) to a contiguous numpy array
+
+    Args:
+        data (Any): input array-like, torch tensors are moved to cpu
+        dtype (np.dtype, optional): output dtype. Defaults to np.float32.
+
+    Returns:
+        np.ndarray: contiguous numpy array
+    """
+    data = data.detach().cpu().numpy() if hasattr(data, 'detach') else data
+    return np.ascontiguousarray(data, dtype=dtype)
+
+
+def normalize_rows(data:np.ndarray) -> np.ndarray:
+    """L2 normalizes the rows of a dense matrix, leaving zero rows untouched
+
+    Args:
+        data (np.ndarray): matrix of shape (n_rows, dim)
+
+    Returns:
+        np.ndarray: row normalized matrix of shape (n_rows, dim)
+    """
+    norms = np.linalg.norm(data, axis=1, keepdims=True)
+    return data / np.where(norms > 0, norms, 1.0)
+
+
+def select_topk(scores:np.ndarray, k:int) -> Tuple[np.ndarray, np.ndarray]:
+    """selects the k highest scores per row via argpartition, sorted in descending order
+
+    Rows with fewer than k columns are padded with -inf scores and -1 indices
+
+    Args:
+        scores (np.ndarray): score matrix of shape (n_rows, n_cols)
+        k (int): number of entries to keep per row
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (scores, column indices) each of shape (n_rows, k)
+
+    Examples:
+    >>> top_scores, top_indices = select_topk(query_emb @ corpus_emb.T, k=10)
+    """
+    scores         = np.atleast_2d(scores)
+    n_rows, n_cols = scores.shape
+    kth            = min(k, n_cols)
+    out_scores     = np.full((n_rows, k), -np.inf, dtype=np.float32)
+    out_indices    = np.full((n_rows, k), -1, dtype=np.int64)
+    if kth == 0:
+        return out_scores, out_indices
+    # partition only the k best per row, then sort those k rather than the full row
+    part    = np.argpartition(-scores, kth - 1, axis=1)[:, :kth] if kth < n_cols else np.tile(np.arange(n_cols), (n_rows, 1))
+    part_sc = np.take_along_axis(scores, part, axis=1)
+    order   = np.argsort(-part_sc, axis=1, kind='stable')
+    out_scores[:, :kth]  = np.take_along_axis(part_sc, order, axis=1)
+    out_indices[:, :kth] = np.take_along_axis(part, order, axis=1)
+    return out_scores, out_indices
+
+
+def to_hits(scores:np.ndarray, indices:np.ndarray) -> List[List[dict]]:
+    """formats top-k results as per query hits, matching sentence_transformers.util.semantic_search
+
+    Args:
+        scores (np.ndarray): top-k scores of shape (n_queries, k)
+        indices (np.ndarray): top-k corpus ids of shape (n_queries, k), -1 for padding
+
+    Returns:
+        List[List[dict]]: per query list of dict(corpus_id, score)
+    """
+    return [
+        [dict(corpus_id=int(idx), score=float(score)) for idx, score in zip(row_ind, row_sc) if idx >= 0]
+        for row_ind, row_sc in zip(indices, scores)
+    ]
+
+
+@dataclass
+class Neighbors:
+    """Compact top-k neighbor structure, row i holds the k best corpus ids/scores of query i (-1 padded)"""
+    indices:np.ndarray      # (n_queries, k) int64
+    scores:np.ndarray       # (n_queries, k) float32
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    def to_hits(self) -> List[List[dict]]:
+        return to_hits(self.scores, self.indices)
+
+    def to_frame(self, index:Optional[pd.Index]=None) -> pd.DataFrame:
+        """long format frame of (query, rank, corpus_id, score), mapping corpus ids to labels when index is given"""
+        mask      = self.indices >= 0
+        query, rank = np.nonzero(mask)
+        corpus_id = self.indices[mask]
+        return pd.DataFrame(dict(
+            query     = query,
+            rank      = rank,
+            corpus_id = corpus_id if index is None else np.asarray(index)[corpus_id],
+            score     = self.scores[mask]
+        ))
+
+
+def normalize_matrix(data:Any) -> Any:
+    """L2 normalizes the rows of a sparse (kept as CSR) or dense matrix
+
+    Args:
+        data (Any): sparse matrix, numpy array or torch tensor of shape (n_rows, dim)
+
+    Returns:
+        Any: row normalized CSR matrix or float32 numpy array
+    """
+    if sp.issparse(data):
+        data  = sp.csr_matrix(data, dtype=np.float32)
+        norms = np.sqrt(np.asarray(data.multiply(data).sum(axis=1)).ravel())
+        return sp.diags(1.0 / np.where(norms > 0, norms, 1.0)).dot(data).tocsr()
+    return normalize_rows(to_numpy(data))
+
+
+def prepare_corpus(corpus:Any, normalize:bool=True) -> Any:
+    """normalized and transposed corpus of shape (dim, n_corpus), computed once and reused across queries
+
+    Args:
+        corpus (Any): sparse or dense matrix of shape (n_corpus, dim)
+        normalize (bool, optional): L2 normalize rows (cosine). Defaults to True.
+
+    Returns:
+        Any: CSR matrix or numpy array of shape (dim, n_corpus), the corpus_t of topk_similarity
+
+    Examples:
+    >>> corpus_t  = prepare_corpus(tfidf_matrix)
+    >>> neighbors = topk_similarity(query_vec, corpus_t=corpus_t, k=5)
+    """
+    corpus = normalize_matrix(corpus) if normalize else corpus
+    return corpus.T.tocsr() if sp.issparse(corpus) else corpus.T
+
+
+def topk_similarity(queries:Any, corpus:Any=None, k:int=10, block_size:int=1024, num_workers:int=1,
+                    exclude_self:bool=False, normalize:bool=True, corpus_t:Any=None) -> Neighbors:
+    """blocked top-k cosine similarity, never materializes the full (n_queries, n_corpus) matrix
+
+    Query rows are processed in blocks of block_size, each block keeps only its k best per row via
+    argpartition, so memory is bounded by (block_size, n_corpus). Blocks optionally run in a thread
+    pool, numpy/scipy matrix products release the GIL.
+
+    Args:
+        queries (Any): sparse or dense matrix of shape (n_queries, dim)
+        corpus (Any, optional): sparse or dense matrix of shape (n_corpus, dim), defaults to queries (all pairs)
+        k (int, optional): neighbors to keep per query. Defaults to 10.
+        block_size (int, optional): query rows per block. Defaults to 1024.
+        num_workers (int, optional): threads processing blocks. Defaults to 1.
+        exclude_self (bool, optional): drop the self match when corpus is queries. Defaults to False.
+        normalize (bool, optional): L2 normalize rows (cosine), disable for pre-normalized inputs. Defaults to True.
+        corpus_t (Any, optional): corpus prepared by prepare_corpus, used as is in place of corpus. Defaults to None.
+
+    Returns:
+        Neighbors: top-k corpus ids and scores of shape (n_queries, k)
+
+    Examples:
+    >>> neighbors = topk_similarity(tfidf_matrix, k=10, exclude_self=True, num_workers=4)
+    >>> neighbors.to_frame(index=df['movie'])
+    """
+    is_self  = corpus is None and corpus_t is None
+    queries  = normalize_matrix(queries) if normalize else queries
+    if corpus_t is None:
+        corpus_t = prepare_corpus(queries, normalize=False) if is_self else prepare_corpus(corpus, normalize=normalize)
+    num_rows = queries.shape[0]
+    indices  = np.empty((num_rows, k), dtype=np.int64)
+    scores   = np.empty((num_rows, k), dtype=np.float32)
+
+    def process_block(start:int) -> None:
+        end   = min(start + block_size, num_rows)
+        block = queries[start:end] @ corpus_t
+        block = block.toarray() if sp.issparse(block) else np.asarray(block)
+        if exclude_self and is_self:
+            block[np.arange(end - start), np.arange(start, end)] = -np.inf
+        scores[start:end], indices[start:end] = select_topk(block, k)
+
+    starts = range(0, num_rows, block_size)
+    if num_workers > 1:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(process_block, starts))
+    else:
+        for start in starts:
+            process_block(start)
+    # excluded self matches surface as -inf only when a row has fewer than k other candidates
+    indices[~np.isfinite(scores)] = -1
+    return Neighbors(indices=indices, scores=scores)
@@ -1,13 +1,243 @@
 import requests 
 import json 
 import logging 
-import time 
-from   typing import Optional, Dict 
+import random
+import threading
+import asyncio
+from   typing import Optional, Dict, List, Tuple, Any, Iterable, Union, Generator
 from   collections import defaultdict
-from   dataclasses import dataclass
+from   dataclasses import dataclass, field
+from   requests.adapters import HTTPAdapter
+from   urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 logger = logging.getLogger(__name__)
 
+HEADER_DEFAULTS = {
+    "Accept":        "application/json",
+    "Cache-Control": "no-cache",
+    "User-Agent":    "ServiceRuntime/1.0"
+}
+
+
+@dataclass
+class RetryPolicy:
+    """Retry with exponential backoff: sleep = backoff_factor * 2 ** (attempt - 1), jittered for async
+
+    POST is not idempotent (a retried completion can be billed twice), it is only retried when listed in allowed_methods
+    """
+    total:int                       = 3
+    backoff_factor:float            = 0.5
+    status_forcelist:Tuple[int,...] = (429, 500, 502, 503, 504)
+    allowed_methods:Tuple[str,...]  = ('GET',)
+
+
+@dataclass
+class ClientConfig:
+    """Connection pool, timeout and retry configuration of a ServiceClient"""
+    pool_connections:int                  = 10             # number of host pools to cache
+    pool_maxsize:int                      = 32             # keep-alive connections per host
+    timeout:Tuple[float, Optional[float]] = (5.0, None)    # (connect, read) seconds, reads are unbounded unless set
+    retry:RetryPolicy                     = field(default_factory=RetryPolicy)
+    headers:Dict[str, str]                = field(default_factory=dict)
+
+
+def encode_body(body:Optional[dict]) -> Optional[bytes]:
+    # serialize once, requests derives Content-Length from the encoded payload
+    return json.dumps(body).encode('utf-8') if body is not None else None
+
+
+class ServiceClient(object):
+    """Long-lived HTTP client, reuses keep-alive connections from a pool across requests
+
+    Examples:
+    >>> client   = ServiceClient(ClientConfig(pool_maxsize=64, timeout=(5.0, 120.0), retry=RetryPolicy(total=5, allowed_methods=('GET', 'POST'))))
+    >>> response = client.post(endpoint, body=payload, headers={"Authorization": f"Bearer {api_key}"})
+    >>> client.close()
+    """
+    def __init__(self, config:Optional[ClientConfig]=None):
+        self.config  = config or ClientConfig()
+        retry        = Retry(
+            total            = self.config.retry.total,
+            backoff_factor   = self.config.retry.backoff_factor,
+            status_forcelist = self.config.retry.status_forcelist,
+            allowed_methods  = frozenset(self.config.retry.allowed_methods),
+            raise_on_status  = False
+        )
+        adapter      = HTTPAdapter(
+            pool_connections = self.config.pool_connections,
+            pool_maxsize     = self.config.pool_maxsize,
+            max_retries      = retry
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({**HEADER_DEFAULTS, **self.config.headers})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def send(self, endpoint:str, body:Optional[dict], headers:Optional[dict]=None, stream:bool=False) -> requests.Response:
+        """sends a POST request and returns the raw response, raising on connection errors"""
+        headers = {**({"Content-Type": "application/json"} if body is not None else {}), **(headers or {})}
+        return self.session.post(endpoint, data=encode_body(body), headers=headers, timeout=self.config.timeout, stream=stream)
+
+    def post(self, endpoint:str, body:Optional[dict], headers:Optional[dict]=None) -> Optional[Dict[str, str]]:
+        """sends a POST request, returning the json response or None on failure as service_request does"""
+        try:
+            response = self.send(endpoint, body, headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.exception(f"Exception Occured with Endpoint: {endpoint}:{e}")
+            return None
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncServiceClient(object):
+    """Asyncio HTTP client (httpx) with a shared connection pool for request fan-out
+
+    Examples:
+    >>> async with AsyncServiceClient(ClientConfig(pool_maxsize=64)) as client:
+    ...     responses = await client.gather(endpoint, bodies, headers=headers, concurrency=32)
+    """
+    def __init__(self, config:Optional[ClientConfig]=None):
+        if httpx is None:
+            raise ImportError("AsyncServiceClient requires httpx: pip install httpx")
+        self.config = config or ClientConfig()
+        connect, read = self.config.timeout
+        self.client = httpx.AsyncClient(
+            limits  = httpx.Limits(max_connections=self.config.pool_maxsize, max_keepalive_connections=self.config.pool_maxsize),
+            timeout = httpx.Timeout(read, connect=connect),
+            headers = {**HEADER_DEFAULTS, **self.config.headers}
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def send(self, endpoint:str, body:Optional[dict], headers:Optional[dict]=None) -> "httpx.Response":
+        """sends a POST request, retrying retryable statuses and transport errors with jittered backoff when POST is allowed"""
+        headers = {**({"Content-Type": "application/json"} if body is not None else {}), **(headers or {})}
+        content = encode_body(body)
+        policy  = self.config.retry
+        total   = policy.total if 'POST' in policy.allowed_methods else 0
+        for attempt in range(total + 1):
+            try:
+                response = await self.client.post(endpoint, content=content, headers=headers)
+                if response.status_code not in policy.status_forcelist or attempt == total:
+                    return response
+            except httpx.TransportError:
+                if attempt == total:
+                    raise
+            await asyncio.sleep(policy.backoff_factor * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def post(self, endpoint:str, body:Optional[dict], headers:Optional[dict]=None) -> Optional[Dict[str, str]]:
+        try:
+            response = await self.send(endpoint, body, headers)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.exception(f"Exception Occured with Endpoint: {endpoint}:{e}")
+            return None
+
+    async def gather(self, endpoint:str, bodies:List[dict], headers:Optional[dict]=None, concurrency:int=16) -> List[Optional[Dict[str, str]]]:
+        """posts bodies concurrently (bounded by concurrency), results follow the order of bodies"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded_post(body:dict) -> Optional[Dict[str, str]]:
+            async with semaphore:
+                return await self.post(endpoint, body, headers)
+
+        return await asyncio.gather(*[bounded_post(body) for body in bodies])
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_default_client:Optional[ServiceClient] = None
+_default_client_lock                     = threading.Lock()
+
+def get_default_client() -> ServiceClient:
+    """process-wide pooled client shared by service_request(session_en=True)"""
+    global _default_client
+    if _default_client is None:
+        # threads racing on first use share one client rather than each building a pool
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = ServiceClient()
+    return _default_client
+
+
+def iter_sse_events(lines:Iterable[Union[bytes, str]]) -> Generator[str, None, None]:
+    """parses server-sent events, yielding the data payload of each event
+
+    Args:
+        lines (Iterable[Union[bytes, str]]): raw lines of the event stream
+
+    Returns:
+        Generator[str, None, None]: data of each event, multi-line data joined by newlines
+    """
+    data = []
+    for line in lines:
+        line = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not line:
+            # blank line dispatches the pending event
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith('data:'):
+            data.append(line[5:][1:] if line[5:6] == ' ' else line[5:])
+    if data:
+        yield "\n".join(data)
+
+
+def service_stream(
+    endpoint:str,
+    body:dict,
+    headers:dict=None,
+    client:Optional[ServiceClient]=None,
+    **kwargs
+) -> Generator[Dict[str, Any], None, None]:
+    """Send Post Request to a server-sent events endpoint, yielding each decoded json event
+
+    Args:
+        endpoint (str): endpoint url
+        body (dict): payload for endpoint, e.g., with stream=True
+        client (Optional[ServiceClient], optional): pooled client. Defaults to the shared client.
+
+    Returns:
+        Generator[Dict[str, Any], None, None]: json events until the '[DONE]' sentinel
+
+    Examples:
+    >>> for event in service_stream(endpoint, body={**payload, "stream": True}, headers=headers):
+    ...     event["choices"][0]["delta"].get("content")
+    """
+    client   = client or get_default_client()
+    headers  = {"Accept": "text/event-stream", **(headers or {})}
+    response = client.send(endpoint, body, headers=headers, stream=True)
+    try:
+        response.raise_for_status()
+        # chunk_size=None yields data as it arrives rather than buffering fixed size reads
+        for data in iter_sse_events(response.iter_lines(chunk_size=None)):
+            if data.strip() == '[DONE]':
+                break
+            yield json.loads(data)
+    finally:
+        response.close()
+
+
 def service_request(
     endpoint:str, 
     body:dict, 
@@ -20,7 +250,7 @@ def service_request(
     Args:
         endpoint (str): endpoint url
         body (dict): payload for endpoint
-        session_en (bool, optional): if session should be enabled. Defaults to False.
+        session_en (bool, optional): if the shared pooled session should be used. Defaults to False.
         user_agent (str, optional): calling applicaation. Defaults to 'AppClient/1.0'.
 
     Returns:
@@ -34,24 +264,17 @@ def service_request(
         }
     >>> response_data = service_request(endpoint=endpoint, body=payload, headers=headers)
     """
+    if session_en:
+        return get_default_client().post(endpoint, body, headers=headers)
+
     try:
         headers = dict(defaultdict(str)) if not headers else headers
-        header_defaults = {
-            "Accept":        "application/json",
-            "Cache-Control": "no-cache",
-            "User-Agent":    "ServiceRuntime/1.0"
-        }
-        
-        headers = {**header_defaults, **headers}
+        headers = {**HEADER_DEFAULTS, **headers}
         if body is not None: 
-            headers.update({
-                "Content-Type":  "application/json", 
-                'Content-Length': str(len(json.dumps(body))),
-            })
-
-        context_fn = requests.Session().post if session_en else requests.post
-        # not required to use json.dumps(body), since we are using kw 'json='
-        response   = context_fn(endpoint, json=body, headers=headers)
+            headers.update({"Content-Type":  "application/json"})
+
+        # serialize once, Content-Length is derived from the encoded payload
+        response   = requests.post(endpoint, data=encode_body(body), headers=headers)
         response.raise_for_status()
         # check for 200 code
         if response.status_code == requests.codes.OK:
@@ -63,8 +286,3 @@ def service_request(
     except requests.exceptions.RequestException as e:
         logger.exception(f"Exception Occured with Endpoint: {endpoint}:{e}")
         return None 
-
-
-
-
-
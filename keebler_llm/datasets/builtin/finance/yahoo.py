@@ -1,6 +1,7 @@
 import  pandas as pd 
-from    typing import List
+from    typing import List, Optional
 from    ....core.io.utils import trsfrm_frame_camelcase_to_snakecase
+from    ...dataset import DatasetTabular
 
 import yfinance as yf 
 
@@ -21,6 +22,10 @@ class DatasetTicker(object):
     def get_ticker_info(self, ticker:str) -> dict:
         return yf.Ticker(ticker).info()
 
+    def to_dataset(self, target:Optional[str]=None, columns:Optional[List[str]]=None, **kwargs) -> DatasetTabular:
+        # the date index becomes a column, rows stay in time order for contiguous shards
+        return DatasetTabular(self.df.reset_index(), target=target, columns=columns, **kwargs)
+
 class DatasetTickers(object):
     def __init__(self, tickers:List[str], start_date:str, end_date:str):
         self.tickers    = tickers
@@ -35,4 +40,7 @@ class DatasetTickers(object):
         return (
             self.df.xs(ticker, axis=1, level=1)
                 .pipe(trsfrm_frame_camelcase_to_snakecase)
-        )
\ No newline at end of file
+        )
+
+    def to_dataset(self, ticker:str, target:Optional[str]=None, columns:Optional[List[str]]=None, **kwargs) -> DatasetTabular:
+        return DatasetTabular(self.select_ticker(ticker).reset_index(), target=target, columns=columns, **kwargs)
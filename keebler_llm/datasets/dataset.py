@@ -1,55 +1,178 @@
-import  numpy as np 
-import  pandas as pd 
-from    typing import Any, Optional 
+import  numpy as np
+import  pandas as pd
+import  copy
+import  queue
+import  threading
+from    typing import Any, Optional, Callable, Sequence, Iterable, Generator, List, Union
 
 from    typing import TypeVar, Generic
 T_co    = TypeVar('T_co', covariant=True)
 T       = TypeVar('T')
 
+
+def prefetch_iter(iterable:Iterable[T], size:int=2, timeout:float=0.1) -> Generator[T, None, None]:
+    """iterates on a background thread, keeping at most size items ready ahead of the consumer
+
+    The producer stops once the consumer closes the generator (break, exception or garbage collection),
+    puts are retried every timeout seconds so a full queue never blocks it forever.
+    """
+    items  = queue.Queue(maxsize=max(size, 1))
+    stop   = threading.Event()
+    done   = object()
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=timeout)
+                return True
+            except queue.Full:
+                continue
+        return False
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while (item := items.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def unbatch(batch:Any, position:int) -> Any:
+    # single sample of a batch of arrays, dicts or tuples of arrays
+    if isinstance(batch, dict):
+        return {key: value[position] for key, value in batch.items()}
+    if isinstance(batch, tuple):
+        return tuple(value[position] for value in batch)
+    return batch[position]
+
+
 class DatasetT(Generic[T_co]):
-    def __init__(self, **kwargs):
-        pass 
-
-    def __getitem__(self, index:int):
-        sample = None 
-        if self.transform:
-            sample = self.transform(sample)
-
-        return sample[index]
-        
-    def __len__(self):
-        try: 
-            len(self.data)
-        except e: 
-            raise NotImplementedError
-    
+    """Random access dataset with batched gathers, deterministic sharding and prefetched iteration
+
+    Subclasses implement fetch(rows) returning a batch for an array of row positions; samples,
+    batches, shards and streams are all views over `self.indices`, no data is copied to shard.
+
+    Examples:
+    >>> dataset = DatasetTabular(df, target='label')
+    >>> dataset[0], dataset.__getitems__([3, 1, 4])
+    >>> shard   = dataset.shard(num_shards=8, shard_id=worker_id)      # disjoint, same in every process
+    >>> for batch in shard.iter_batches(batch_size=1024, shuffle=True, seed=42, epoch=epoch, prefetch=4):
+    ...     train_step(batch)
+    """
+    def __init__(self, transform:Optional[Callable[[Any], Any]]=None, **kwargs):
+        self.transform_fn = transform
+        self.indices      = np.empty(0, dtype=np.int64)
+
+    def __getitem__(self, index:Union[int, slice, Sequence[int]]):
+        if isinstance(index, (int, np.integer)):
+            index = index + len(self) if index < 0 else index
+            if not 0 <= index < len(self):
+                raise IndexError(f"index {index} out of range for {len(self)} samples")
+            return unbatch(self.__getitems__([index]), 0)
+        positions = np.arange(len(self))[index] if isinstance(index, slice) else index
+        return self.__getitems__(positions)
+
+    def __getitems__(self, positions:Sequence[int]) -> Any:
+        # single vectorized gather for the whole batch
+        return self.transform(self.fetch(self.indices[np.asarray(positions, dtype=np.int64)]))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        # streams samples, gathered in batches behind the scenes
+        batch_size = 1024
+        for start, batch in zip(range(0, len(self), batch_size), self.iter_batches(batch_size=batch_size)):
+            for position in range(min(batch_size, len(self) - start)):
+                yield unbatch(batch, position)
+
+    def fetch(self, rows:np.ndarray) -> Any:
+        raise NotImplementedError
+
+    def shard(self, num_shards:int, shard_id:int, contiguous:bool=False) -> "DatasetT":
+        """view over a deterministic, disjoint partition of the samples
+
+        Args:
+            num_shards (int): number of shards, e.g. worker processes * ranks
+            shard_id (int): shard of this worker in [0, num_shards)
+            contiguous (bool, optional): contiguous blocks rather than strided samples. Defaults to False.
+
+        Returns:
+            DatasetT: dataset sharing the underlying arrays
+        """
+        if not 0 <= shard_id < num_shards:
+            raise ValueError(f"shard_id ({shard_id}) must be in [0, {num_shards})")
+        view         = copy.copy(self)
+        view.indices = np.array_split(self.indices, num_shards)[shard_id] if contiguous else self.indices[shard_id::num_shards]
+        return view
+
+    def iter_batches(self, batch_size:int=32, shuffle:bool=False, seed:int=42, epoch:int=0, drop_last:bool=False,
+                     prefetch:int=2) -> Generator[Any, None, None]:
+        """yields batches gathered ahead by a background thread, the shuffle order depends only on (seed, epoch)"""
+        order = np.random.default_rng([seed, epoch]).permutation(len(self)) if shuffle else np.arange(len(self))
+        stop  = len(order) - len(order) % batch_size if drop_last else len(order)
+        yield from prefetch_iter((self.__getitems__(order[start:min(start + batch_size, stop)]) for start in range(0, stop, batch_size)), prefetch)
+
     def info(self, df:pd.DataFrame) -> dict:
         raise NotImplementedError
 
     def load(self, path:str) -> None:
-        raise NotImplemented
-
-    def transform(self, data:Any, target:Any=None, **kwargs) -> None:
         raise NotImplementedError
 
     def validate(self, schema:dict, **kwargs) -> bool:
         raise NotImplementedError
 
-    def transform(self, data:np.array, **kwargs) -> Any:
-        raise NotImplementedError
+    def transform(self, data:Any, **kwargs) -> Any:
+        return self.transform_fn(data) if self.transform_fn else data
 
 
 class DatasetTabular(DatasetT):
-    def __init__(self, df:pd.DatFrame, target:Optional[str] = None, **kwargs):
+    """Tabular dataset backed by one NumPy array per column, batches are dicts of column arrays
+
+    Examples:
+    >>> dataset = DatasetTabular(df, target='label')
+    >>> X, y    = dataset.to_matrix(), dataset.data['label']
+    """
+    def __init__(self, df:pd.DataFrame, target:Optional[str] = None, columns:Optional[List[str]]=None, **kwargs):
         super().__init__(**kwargs)
-        self.data    = data
-        self.indices = df.index 
-        self.num_obs, self.num_features = df.shape
+        columns      = list(columns) if columns is not None else [col for col in df.columns if col != target]
+        self.columns = columns
+        self.target  = target
+        # columnar copies once, per sample access never touches pandas
+        self.data    = {col: df[col].to_numpy() for col in columns + ([target] if target else [])}
+        self.index   = df.index.to_numpy()
+        self.indices = np.arange(len(df), dtype=np.int64)
+        self.num_obs, self.num_features = len(df), len(columns)
         if target:
-            self.target = target 
-            self.target_cardinality = len( np.unique(target) )
+            self.target_cardinality = len( np.unique(self.data[target]) )
 
     def __repr__(self):
-        return f"Class: {self.__class__.__name__} | Shape: {self.data.shape}"
+        return f"Class: {self.__class__.__name__} | Shape: {(len(self), self.num_features)}"
+
+    def fetch(self, rows:np.ndarray) -> dict:
+        return {col: values[rows] for col, values in self.data.items()}
 
+    def to_matrix(self, columns:Optional[List[str]]=None, dtype:Any=np.float32) -> np.ndarray:
+        """feature columns of this view stacked into a (n_samples, n_columns) array"""
+        columns = columns or self.columns
+        matrix  = np.empty((len(self), len(columns)), dtype=dtype)
+        for pos, col in enumerate(columns):
+            matrix[:, pos] = self.data[col][self.indices]
+        return matrix
 
+    def info(self, df:Optional[pd.DataFrame]=None) -> dict:
+        return dict(
+            num_obs      = len(self),
+            num_features = self.num_features,
+            target       = self.target,
+            dtypes       = {col: str(values.dtype) for col, values in self.data.items()},
+            nbytes       = sum(values.nbytes for values in self.data.values())
+        )
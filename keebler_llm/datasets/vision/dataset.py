@@ -1,57 +1,234 @@
-import  numpy as np 
-import  pandas as pd 
-from    typing import Tuple, List, Optional 
-from    pathlib import Path 
+import  os
+import  numpy as np
+import  pandas as pd
+import  requests
+import  hashlib
+import  threading
+from    concurrent.futures import ThreadPoolExecutor
+from    typing import Tuple, List, Optional, Sequence, Generator, Any
+from    pathlib import Path
 from    PIL import Image
 from    ...core.io.utils import is_url_remote, is_valid_url
+from    ...core.utils import read_cache_dir
+from    ..dataset import DatasetT, prefetch_iter
+
+
+# channels of the decoded sample for modes whose header bands differ, e.g. palette indices expand to RGB
+DECODED_CHANNELS = {'P': 3, 'PA': 4, 'CMYK': 3, 'YCbCr': 3}
+
+
+def read_image_header(uri:str) -> Tuple[int, int, int]:
+    # PIL parses the header on open, pixel data is only decoded on access
+    with Image.open(uri) as img:
+        width, height = img.size
+        return height, width, DECODED_CHANNELS.get(img.mode, len(img.getbands()))
 
 
 class DatasetImage(object):
-    """Loads attributes of image files, loads and normalizes them for processing
+    """Lazy image dataset decoding into preallocated float32 batches
+
+    Only image headers are read up front for shape metadata. Batches are decoded by a thread pool
+    (PIL releases the GIL while decoding) straight into a preallocated NCHW/NHWC float32 array with
+    normalization fused in, (x / 255 - mean) / std, and iter_batches prefetches in the background.
+    With cache=True decoded samples are kept in an on-disk memmap, later epochs skip decoding.
 
     Args:
-        object (_type_): _description_
+        uri (str): directory of image files
+        target_dim (Tuple[int,int,int], optional): (h, w, ch) of samples, required with resize
+        resize (bool, optional): resize images to target_dim, otherwise all images must share one shape
+        channel_format (str, optional): 'NHWC' or 'NCHW' (ONNX) batch layout. Defaults to 'NHWC'.
 
     Examples:
     >>> img_url     = "https://s3.amazonaws.com/model-server/inputs/kitten.jpg"
     >>> dataset_dev = data_path.joinpath('train', 'images')
-    >>> dataset     = DatasetImage(dataset_dev, target_dim=(224,224,3), resize=False)
+    >>> dataset     = DatasetImage(dataset_dev, target_dim=(224,224,3), resize=True, channel_format='NCHW', cache=True)
+    >>> for batch in dataset.iter_batches(batch_size=64, shuffle=True, prefetch=4):
+    ...     session.run(None, {'input': batch})
 
     >>> ex_img = dataset.load_image(img_url, resize=False, dimensions=(224,224, 3))
     >>> ex_img = dataset.normalize(ex_img)
     >>> plot_image(ex_img.squeeze(), plt.gca(), **{'title': f"Spatial dimensions: {ex_img.squeeze().shape}"})
     """
-    def __init__(self, uri:str, target_dim:Tuple[int,int,int]=None, resize:bool=False):
-        self.target_dim  = target_dim
+    def __init__(self, uri:str, target_dim:Tuple[int,int,int]=None, resize:bool=False, channel_format:str='NHWC',
+                 mean:Optional[Sequence[float]]=None, std:Optional[Sequence[float]]=None, num_workers:int=8,
+                 cache:bool=False, cache_dir:Optional[str]=None, pattern:str='*'):
         # ONNX expects NCHW input, so convert the array
-        self.ch_formats  = ['NCHW', 'NHWC']  
-        self.resize      = resize 
-        self.data        = (
-            self.get_dataset_attr(uri)
-            .apply(self.transform_record, axis=1)
-        )
-
-    def transform_record(self, ds:pd.Series):
-        orig_img           = self.load_image(ds['uri'], self.target_dim, resize=self.resize)
-        ds['dim:(h,w,ch)'] = orig_img.squeeze().shape
-        return ds 
-
-    def get_dataset_attr(self, uri:str, pattern:str='*') -> pd.DataFrame: 
+        self.ch_formats  = ['NCHW', 'NHWC']
+        if channel_format not in self.ch_formats:
+            raise ValueError(f"Unsupported channel_format: {channel_format}, expected one of {self.ch_formats}")
+        if resize and not target_dim:
+            raise ValueError("resize requires target_dim=(h, w, ch)")
+        self.target_dim     = target_dim
+        self.resize         = resize
+        self.channel_format = channel_format
+        self.num_workers    = num_workers
+        self.executor       = ThreadPoolExecutor(max_workers=num_workers)
+        self.data           = self.get_dataset_attr(uri, pattern)
+        height, width, ch   = self.sample_dim
+        # fused normalization: x * scale + bias == (x / 255 - mean) / std, broadcast per channel
+        mean                = np.asarray(mean if mean is not None else [0.0] * ch, dtype=np.float32)
+        std                 = np.asarray(std if std is not None else [1.0] * ch, dtype=np.float32)
+        shape               = (ch, 1, 1) if channel_format == 'NCHW' else (ch,)
+        self.scale          = (1.0 / (255.0 * std)).reshape(shape)
+        self.bias           = (-mean / std).reshape(shape)
+        self.sample_shape   = (ch, height, width) if channel_format == 'NCHW' else (height, width, ch)
+        # decoded mode follows the sample channels (target_dim or headers), palette images expand through their palette
+        self.mode           = {1: 'L', 3: 'RGB', 4: 'RGBA'}.get(ch)
+        # guards the cached mask, which pool threads update per slot while flush snapshots it
+        self.lock           = threading.Lock()
+        self.cache, self.cached = self.open_cache(cache_dir, mean, std) if cache else (None, None)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getstate__(self) -> dict:
+        # picklable for worker processes: the thread pool is recreated and the cache memmap reopened by path
+        state = dict(self.__dict__, executor=None, lock=None)
+        state['cache'] = self.cache.filename if self.cache is not None else None
+        return state
+
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.lock     = threading.Lock()
+        self.cache    = np.load(self.cache, mmap_mode='r+') if self.cache is not None else None
+
+    def __repr__(self):
+        return f"Class: {self.__class__.__name__} | Samples: {len(self)} | Shape: {self.sample_shape}"
+
+    def get_dataset_attr(self, uri:str, pattern:str='*') -> pd.DataFrame:
         "walk directories to extract files and attributes of files"
-        files  = Path(uri).rglob(pattern)
-        return pd.DataFrame(files, columns=['uri'])
+        files  = sorted(str(path) for path in Path(uri).rglob(pattern) if path.is_file())
+        df     = pd.DataFrame(files, columns=['uri'])
+        df['dim:(h,w,ch)'] = list(self.executor.map(read_image_header, files))
+        return df
+
+    @property
+    def sample_dim(self) -> Tuple[int, int, int]:
+        if self.resize:
+            return tuple(self.target_dim)
+        dims = self.data['dim:(h,w,ch)'].unique()
+        if len(dims) != 1:
+            raise ValueError(f"Images differ in shape {list(dims)[:5]}, set resize=True with a target_dim")
+        return tuple(dims[0])
+
+    def open_cache(self, cache_dir:Optional[str], mean:np.ndarray, std:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # namespaced by files, layout and normalization, any change maps to a new cache
+        key       = "|".join(self.data['uri']) + f"|{self.sample_shape}|{mean.tolist()}|{std.tolist()}"
+        namespace = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        path      = Path(cache_dir or read_cache_dir(app='keebler_llm')).joinpath('images', namespace)
+        path.mkdir(parents=True, exist_ok=True)
+        shape     = (len(self),) + self.sample_shape
+        data_path = path.joinpath('samples.npy')
+        if not data_path.exists():
+            # allocated under a private name and linked into place, workers opening at once never truncate
+            # a cache another worker already writes to, the first link wins and the others reopen it
+            tmp_path = path.joinpath(f"samples.{os.getpid()}.{threading.get_ident()}.tmp")
+            np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape).flush()
+            try:
+                os.link(tmp_path, data_path)
+            except FileExistsError:
+                pass
+            finally:
+                tmp_path.unlink()
+        # every writer keeps its own mask, samples cached by any of them are cached for all
+        cached    = np.zeros(len(self), dtype=bool)
+        for mask_path in path.glob('cached*.npy'):
+            cached |= np.load(mask_path)
+        return np.load(data_path, mmap_mode='r+'), cached
+
+    def flush(self) -> None:
+        # persists decoded samples and which of them are filled
+        if self.cache is not None:
+            # mask snapshot before the data flush, a slot is never persisted as cached ahead of its pixels
+            with self.lock:
+                cached = self.cached.copy()
+            self.cache.flush()
+            # one mask per process (e.g. shard workers), replaced atomically so readers never see a partial file
+            mask_path = Path(self.cache.filename).with_name(f"cached.{os.getpid()}.npy")
+            tmp_path  = mask_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, cached)
+            os.replace(tmp_path, mask_path)
+
+    def decode_into(self, out:np.ndarray, uri:str) -> None:
+        with Image.open(uri) as img:
+            img = img.convert(self.mode) if self.mode and img.mode != self.mode else img
+            img = img.resize((self.target_dim[1], self.target_dim[0])) if self.resize else img
+            arr = np.asarray(img)                                   # uint8 (h, w[, ch]) decoded image
+        arr = arr[..., None] if arr.ndim == 2 else arr
+        arr = arr.transpose(2, 0, 1) if self.channel_format == 'NCHW' else arr
+        # cast, scale and shift in place on the batch slot
+        np.multiply(arr, self.scale, out=out)
+        np.add(out, self.bias, out=out)
+
+    def load_sample(self, out:np.ndarray, index:int) -> None:
+        if self.cache is not None and self.cached[index]:
+            out[...] = self.cache[index]
+            return
+        self.decode_into(out, self.data['uri'].iat[index])
+        if self.cache is not None:
+            self.cache[index]   = out
+            with self.lock:
+                self.cached[index] = True
+
+    def load_batch(self, indices:Sequence[int], out:Optional[np.ndarray]=None) -> np.ndarray:
+        """decodes samples into a (len(indices), *sample_shape) float32 batch, reusing out when given"""
+        out = np.empty((len(indices),) + self.sample_shape, dtype=np.float32) if out is None else out[:len(indices)]
+        list(self.executor.map(self.load_sample, out, indices))
+        return out
+
+    def iter_batches(self, batch_size:int=32, shuffle:bool=False, seed:int=42, prefetch:int=2,
+                     drop_last:bool=False) -> Generator[np.ndarray, None, None]:
+        """yields batches decoded ahead by a background thread, at most prefetch batches are held"""
+        order   = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        stop    = len(order) - len(order) % batch_size if drop_last else len(order)
+        try:
+            yield from prefetch_iter((self.load_batch(order[start:min(start + batch_size, stop)]) for start in range(0, stop, batch_size)), prefetch)
+        finally:
+            # also persists the samples decoded so far when the consumer stops early
+            self.flush()
+
+    def to_dataset(self, targets:Optional[Sequence[Any]]=None, **kwargs) -> "DatasetImageT":
+        return DatasetImageT(self, targets=targets, **kwargs)
 
     def load_image(self, uri:str, dimensions:Tuple[int,int,int]=None, resize:bool=False, channel_format="NHWC"):
         is_remote = lambda s: is_url_remote(s) and is_valid_url(s)
 
-        uri  = requests.get(uri, stream=True).raw if is_remote(uri) else uri 
+        uri  = requests.get(uri, stream=True).raw if is_remote(uri) else uri
         img  = Image.open(uri)
-        img  = img.resize(dimensions) if resize else img
-        img  = np.asarray(img).astype("float32")
-        img  = np.transpose(img, (2, 0, 1)) if channel_format == 'NCHW' else img 
-        img  = np.expand_dims(img, axis=0)
-        return img
+        img  = img.resize((dimensions[1], dimensions[0])) if resize else img
+        img  = np.asarray(img, dtype="float32")
+        img  = img.transpose(2, 0, 1) if channel_format == 'NCHW' else img
+        return img[None]
 
     def normalize(self, image:np.array) -> np.array:
         return image / 255.
 
+
+class DatasetImageT(DatasetT):
+    """DatasetT adapter of DatasetImage, batches are decoded float32 arrays (with targets when given)
+
+    Examples:
+    >>> dataset = DatasetImage(dataset_dev, target_dim=(224,224,3), resize=True).to_dataset(targets=labels)
+    >>> for images, labels in dataset.shard(num_shards, shard_id).iter_batches(batch_size=64, shuffle=True): ...
+    """
+    def __init__(self, images:DatasetImage, targets:Optional[Sequence[Any]]=None, **kwargs):
+        super().__init__(**kwargs)
+        self.images  = images
+        self.targets = np.asarray(targets) if targets is not None else None
+        self.indices = np.arange(len(images), dtype=np.int64)
+
+    def __repr__(self):
+        return f"Class: {self.__class__.__name__} | Samples: {len(self)} | Shape: {self.images.sample_shape}"
+
+    def iter_batches(self, *args, **kwargs) -> Generator[Any, None, None]:
+        """DatasetT.iter_batches, persisting the decoded samples of the image cache when iteration stops"""
+        try:
+            yield from super().iter_batches(*args, **kwargs)
+        finally:
+            self.images.flush()
+
+    def fetch(self, rows:np.ndarray) -> Any:
+        batch = self.images.load_batch(rows)
+        return (batch, self.targets[rows]) if self.targets is not None else batch
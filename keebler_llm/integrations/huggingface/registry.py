@@ -0,0 +1,210 @@
+import  time
+import  threading
+import  logging
+from    collections import OrderedDict, defaultdict
+from    dataclasses import dataclass, field
+from    typing import Dict, Tuple, Optional, Any, Iterable, Callable, List
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+logger = logging.getLogger(__name__)
+
+# tasks producing torch modules, which take a dtype and device
+MODEL_TASKS = ('masked_lm', 'sequence_clf', 'sentence_transformer')
+
+
+@dataclass
+class ModelEntry:
+    key:Tuple
+    model:Any
+    num_bytes:int
+    load_sec:float
+    hits:int                    = 0
+    loaded_at:float             = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        task, model_name, dtype, device = self.key[:4]
+        return dict(task=task, model_name=model_name, dtype=dtype, device=device, hits=self.hits,
+                    resident_mb=round(self.num_bytes / 2**20, 2), load_sec=round(self.load_sec, 4))
+
+
+def calc_model_bytes(model:Any) -> int:
+    """bytes held by the state (parameters, buffers, packed int8 weights) of a torch module, 0 for tokenizers and processors"""
+    if torch is None or not isinstance(model, torch.nn.Module):
+        return 0
+    # quantized layers store (weight, bias) tuples under _packed_params
+    values  = model.state_dict(keep_vars=True).values()
+    tensors = [tensor for value in values for tensor in (value if isinstance(value, tuple) else (value,)) if isinstance(tensor, torch.Tensor)]
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelRegistry(object):
+    """Process-wide registry sharing loaded models/tokenizers keyed by (task, model name, dtype, device)
+
+    Models load on first use, concurrent callers of the same key wait on a per-key lock so weights
+    are read from disk once, while different keys load in parallel. With max_bytes set, the least
+    recently used entries are evicted once resident parameter memory exceeds the cap (an evicted
+    model is freed once no caller holds a reference to it).
+
+    Examples:
+    >>> registry  = get_registry(max_bytes=4 * 2**30)
+    >>> registry.warmup([dict(task='sentence_transformer', model_name='multi-qa-MiniLM-L6-cos-v1')])
+    >>> tokenizer = registry.get('tokenizer', 'bert-base-cased')
+    >>> model     = registry.get('sequence_clf', 'bert-base-cased', dtype='float16', device='cuda')
+    >>> registry.stats()
+    """
+    def __init__(self, max_bytes:Optional[int]=None, loaders:Optional[Dict[str, Callable]]=None):
+        self.max_bytes = max_bytes
+        if loaders is None:
+            # transformers is only needed for the default loaders
+            from .tasks import get_task_mapping
+            loaders    = get_task_mapping()
+        self.loaders   = loaders
+        self.entries:"OrderedDict[Tuple, ModelEntry]" = OrderedDict()
+        self.lock      = threading.Lock()
+        self.key_locks:Dict[Tuple, threading.Lock] = defaultdict(threading.Lock)
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def make_key(task:str, model_name:str, dtype:Optional[str]=None, device:Optional[str]=None, **kwargs) -> Tuple:
+        # loader options (e.g., max_seq_len) change the instance and are part of the key
+        return (task, model_name, dtype, device) + tuple(sorted(kwargs.items()))
+
+    def __contains__(self, key:Tuple) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.num_bytes for entry in self.entries.values())
+
+    def load(self, task:str, model_name:str, dtype:Optional[str]=None, device:Optional[str]=None, **kwargs) -> Any:
+        if task not in self.loaders:
+            raise ValueError(f"Unsupported task: {task}, expected one of {list(self.loaders)}")
+        loader = self.loaders[task]
+        if task not in MODEL_TASKS:
+            return loader(model_name, **kwargs)
+        if torch is None:
+            raise ImportError(f"task '{task}' requires torch: pip install torch")
+        if dtype == 'qint8':
+            # fp32 weights quantized to dynamic int8 for CPU inference
+            if device not in (None, 'cpu'):
+                raise ValueError(f"dtype 'qint8' runs on cpu, got device: {device}")
+            from ..sentencetransformers.backends import quantize_dynamic
+            return quantize_dynamic(self.load(task, model_name, None, 'cpu', **kwargs))
+        torch_dtype = getattr(torch, dtype) if dtype else None
+        if task == 'sentence_transformer':
+            model = loader(model_name, device=device, **kwargs)
+            return model.to(dtype=torch_dtype) if torch_dtype else model
+        model = loader(model_name, torch_dtype=torch_dtype, **kwargs) if torch_dtype else loader(model_name, **kwargs)
+        return model.to(device).eval() if device else model.eval()
+
+    def get(self, task:str, model_name:str, dtype:Optional[str]=None, device:Optional[str]=None, **kwargs) -> Any:
+        """shared instance for the key, loading it on first use
+
+        Args:
+            task (str): task of get_task_mapping, e.g. 'tokenizer', 'sequence_clf', 'sentence_transformer'
+            model_name (str): hub name or local path
+            dtype (Optional[str], optional): torch dtype name of model weights, e.g. 'float16', or 'qint8' for
+                dynamic int8 quantization on cpu. Defaults to None.
+            device (Optional[str], optional): torch device of model weights. Defaults to None.
+
+        Returns:
+            Any: loaded tokenizer, processor or model
+        """
+        key = self.make_key(task, model_name, dtype, device, **kwargs)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return self.touch(entry)
+            key_lock = self.key_locks[key]
+        try:
+            with key_lock:
+                # another caller may have loaded the key while waiting on its lock
+                with self.lock:
+                    entry = self.entries.get(key)
+                    if entry is not None:
+                        return self.touch(entry)
+                    self.misses += 1
+                start = time.perf_counter()
+                model = self.load(task, model_name, dtype, device, **kwargs)
+                entry = ModelEntry(key=key, model=model, num_bytes=calc_model_bytes(model), load_sec=time.perf_counter() - start)
+                with self.lock:
+                    self.entries[key] = entry
+                    self.evict()
+        finally:
+            # key locks only live while a key loads, later callers are served by the entry
+            with self.lock:
+                if self.key_locks.get(key) is key_lock:
+                    del self.key_locks[key]
+        logger.info(f"Loaded {task}:{model_name} ({dtype}, {device}) in {entry.load_sec:.2f}s, {entry.num_bytes / 2**20:.1f}MB")
+        return model
+
+    def touch(self, entry:ModelEntry) -> Any:
+        self.entries.move_to_end(entry.key)
+        entry.hits += 1
+        self.hits  += 1
+        return entry.model
+
+    def evict(self) -> None:
+        # never evicts the most recently used entry, a single model above the cap stays resident
+        while self.max_bytes and len(self.entries) > 1 and self.resident_bytes > self.max_bytes:
+            key, entry = self.entries.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"Evicted {key[0]}:{key[1]} ({entry.num_bytes / 2**20:.1f}MB)")
+
+    def release(self, task:str, model_name:str, dtype:Optional[str]=None, device:Optional[str]=None, **kwargs) -> bool:
+        with self.lock:
+            return self.entries.pop(self.make_key(task, model_name, dtype, device, **kwargs), None) is not None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def warmup(self, specs:Iterable[dict]) -> List[Tuple]:
+        """loads a configured set of models at startup, e.g. specs from a hydra config list
+
+        Args:
+            specs (Iterable[dict]): keyword arguments of get, e.g. dict(task='tokenizer', model_name='bert-base-cased')
+
+        Returns:
+            List[Tuple]: keys of the loaded entries
+        """
+        keys = []
+        for spec in specs:
+            spec = dict(spec)
+            self.get(**spec)
+            keys.append(self.make_key(**spec))
+        return keys
+
+    def stats(self) -> dict:
+        with self.lock:
+            num_lookups = self.hits + self.misses
+            return dict(
+                entries     = [entry.to_dict() for entry in self.entries.values()],
+                resident_mb = round(self.resident_bytes / 2**20, 2),
+                load_sec    = round(sum(entry.load_sec for entry in self.entries.values()), 4),
+                hits        = self.hits,
+                misses      = self.misses,
+                evictions   = self.evictions,
+                hit_rate    = round(self.hits / num_lookups, 3) if num_lookups else 0.0
+            )
+
+
+_default_registry:Optional[ModelRegistry] = None
+_default_lock = threading.Lock()
+
+def get_registry(max_bytes:Optional[int]=None) -> ModelRegistry:
+    """process-wide registry, max_bytes applies when it is first created or is explicitly given"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry(max_bytes=max_bytes)
+        elif max_bytes is not None:
+            _default_registry.max_bytes = max_bytes
+        return _default_registry
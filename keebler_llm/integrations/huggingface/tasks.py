@@ -1,14 +1,23 @@
 import transformers 
-from   typing import List 
+from   typing import List, Optional
 
 
 
+def load_sentence_transformer(model_name:str, device:Optional[str]=None, max_seq_len:Optional[int]=None, **kwargs):
+    # imported on use, sentence_transformers is only needed for this task
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device=device, **kwargs)
+    if max_seq_len:
+        model.max_seq_length = max_seq_len
+    return model
+
 def get_task_mapping():
     return dict(
-        tokenizer         = transformers.AutoTokenizer.from_pretrained,           #"bert-base-cased"
-        feature_extractor = transformers.AutoFeatureExtractor.from_pretrained,
-        masked_lm         = transformers.AutoModelForMaskedLM.from_pretrained,    #"bert-base-uncased" 
-        sequence_clf      = transformers.AutoModelForSequenceClassification
+        tokenizer            = transformers.AutoTokenizer.from_pretrained,           #"bert-base-cased"
+        feature_extractor    = transformers.AutoFeatureExtractor.from_pretrained,
+        masked_lm            = transformers.AutoModelForMaskedLM.from_pretrained,    #"bert-base-uncased" 
+        sequence_clf         = transformers.AutoModelForSequenceClassification.from_pretrained,
+        sentence_transformer = load_sentence_transformer                             #"multi-qa-MiniLM-L6-cos-v1"
     )
 
 def get_tasks_available() -> List[str]:
@@ -0,0 +1,132 @@
+import  numpy as np
+import  re
+import  multiprocessing
+import  tiktoken
+from    concurrent.futures import ProcessPoolExecutor
+from    typing import List, Optional, Iterable
+from    langchain.schema import Document
+
+
+class NativeChunker(object):
+    """High throughput character or token chunker returning chunk offsets alongside text
+
+    Character mode finds all separator boundaries once per text with precompiled patterns, then
+    cuts each chunk at the last boundary of the highest priority separator that fits, using offset
+    arithmetic (np.searchsorted) rather than splitting and re-joining strings. Token mode windows
+    over tiktoken ids and maps token positions back to character offsets.
+
+    Examples:
+    >>> chunker = NativeChunker(chunk_size=1024, chunk_overlap=128)
+    >>> offsets = chunker.split_offsets(text)                 # (n_chunks, 2) [start, end) character offsets
+    >>> chunks  = [text[start:end] for start, end in offsets]
+    >>> batch   = chunker.split_batch(texts, num_workers=8)   # offsets per text
+    """
+    def __init__(self, chunk_size:int=1024, chunk_overlap:int=0, mode:str='character', separators:Optional[List[str]]=None,
+                 encoding_name:str='cl100k_base', strip_whitespace:bool=True, **kwargs):
+        if mode not in ('character', 'token'):
+            raise ValueError(f"Unsupported mode: {mode}, expected one of ['character', 'token']")
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size       = chunk_size
+        self.chunk_overlap    = chunk_overlap
+        self.mode             = mode
+        self.encoding_name    = encoding_name
+        self.strip_whitespace = strip_whitespace
+        # regex separators in priority order, a chunk ends right after the separator match
+        self.separators       = separators or [r"\n\n", r"\n", r"(?<=\. )", r" "]
+        self.patterns         = [re.compile(separator) for separator in self.separators]
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        # resolved through tiktoken's registry cache, keeps the chunker picklable for process pools
+        return tiktoken.get_encoding(self.encoding_name)
+
+    def find_boundaries(self, text:str) -> List[np.ndarray]:
+        return [np.fromiter((match.end() for match in pattern.finditer(text)), dtype=np.int64) for pattern in self.patterns]
+
+    def split_char_offsets(self, text:str) -> np.ndarray:
+        num_chars  = len(text)
+        boundaries = self.find_boundaries(text)
+        finest     = boundaries[-1]
+        offsets    = []
+        start, prev_end = 0, 0
+        while start < num_chars:
+            limit = start + self.chunk_size
+            end   = num_chars if limit >= num_chars else None
+            for bounds in boundaries if end is None else []:
+                # last boundary of this separator within (prev_end, limit], a chunk always extends past the previous one
+                pos = np.searchsorted(bounds, limit, side='right') - 1
+                if pos >= 0 and bounds[pos] > prev_end:
+                    end = int(bounds[pos])
+                    break
+            end = limit if end is None else end
+            offsets.append((start, end))
+            if end >= num_chars:
+                break
+            next_start = end
+            if self.chunk_overlap and end - self.chunk_overlap > start:
+                # begin the overlap at the first fine boundary in [end - overlap, end), a chunk shorter
+                # than the overlap is not re-entered
+                pos        = np.searchsorted(finest, end - self.chunk_overlap, side='left')
+                next_start = int(finest[pos]) if pos < len(finest) and finest[pos] < end else end - self.chunk_overlap
+            start, prev_end = next_start, end
+        return self.merge_offsets(offsets)
+
+    def merge_offsets(self, offsets:List[tuple]) -> np.ndarray:
+        # adjacent splits are merged while the span fits in chunk_size, as the recursive splitter does
+        merged = []
+        for start, end in offsets:
+            if merged and end - merged[-1][0] <= self.chunk_size:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return np.asarray(merged, dtype=np.int64).reshape(-1, 2)
+
+    def split_token_offsets(self, text:str) -> np.ndarray:
+        encoding      = self.encoding
+        ids           = encoding.encode_ordinary(text)
+        if not ids:
+            return np.empty((0, 2), dtype=np.int64)
+        _, positions  = encoding.decode_with_offsets(ids)
+        positions     = np.append(np.asarray(positions, dtype=np.int64), len(text))
+        stride        = self.chunk_size - self.chunk_overlap
+        token_starts  = np.arange(0, max(len(ids) - self.chunk_overlap, 1), stride)
+        token_ends    = np.minimum(token_starts + self.chunk_size, len(ids))
+        return np.stack([positions[token_starts], positions[token_ends]], axis=1)
+
+    def split_offsets(self, text:str) -> np.ndarray:
+        """splits text into [start, end) character offsets of shape (n_chunks, 2)"""
+        offsets = self.split_char_offsets(text) if self.mode == 'character' else self.split_token_offsets(text)
+        if self.strip_whitespace and len(offsets):
+            # shrink offsets past surrounding whitespace, dropping whitespace only chunks
+            stripped = [
+                (start + len(chunk) - len(chunk.lstrip()), end - len(chunk) + len(chunk.rstrip()))
+                for start, end in offsets.tolist() for chunk in [text[start:end]]
+            ]
+            offsets  = np.asarray([(start, end) for start, end in stripped if end > start], dtype=np.int64).reshape(-1, 2)
+        return offsets
+
+    def split_text(self, text:str) -> List[str]:
+        return [text[start:end] for start, end in self.split_offsets(text).tolist()]
+
+    def split_batch(self, texts:List[str], num_workers:Optional[int]=None, chunksize:int=64) -> List[np.ndarray]:
+        """splits many texts in parallel worker processes, returning the offsets per text"""
+        num_workers = num_workers or multiprocessing.cpu_count()
+        if num_workers <= 1 or len(texts) < 2 * chunksize:
+            return [self.split_offsets(text) for text in texts]
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            return list(executor.map(self.split_offsets, texts, chunksize=chunksize))
+
+    def create_documents(self, texts:List[str], metadatas:Optional[List[dict]]=None, num_workers:Optional[int]=1) -> List[Document]:
+        metadatas = metadatas or [dict() for _ in texts]
+        return [
+            Document(page_content=text[start:end], metadata={**metadata, 'start_index': start, 'end_index': end})
+            for text, metadata, offsets in zip(texts, metadatas, self.split_batch(texts, num_workers=num_workers))
+            for start, end in offsets.tolist()
+        ]
+
+    def split_documents(self, documents:Iterable[Document], num_workers:Optional[int]=1) -> List[Document]:
+        documents = list(documents)
+        return self.create_documents(
+            [doc.page_content for doc in documents], [doc.metadata for doc in documents], num_workers=num_workers
+        )
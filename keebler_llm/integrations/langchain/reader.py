@@ -1,7 +1,11 @@
 import  numpy as np 
 import  pandas as pd 
 import  enum 
-from    typing import List, Union, Optional 
+import  multiprocessing
+import  itertools
+from    collections import deque
+from    concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from    typing import List, Union, Optional, Generator, Iterable, Tuple
 from    pathlib import Path 
 from    omegaconf import DictConfig
 
@@ -9,9 +13,31 @@ import  langchain
 import  langchain.document_loaders as ldl 
 import  langchain.text_splitter as lts
 from    langchain.schema import Document
+from    langchain.document_loaders.base import BaseLoader
 from    ...core.io.utils import is_url_remote, is_valid_url, search_files, search_files_to_dataframe, get_uri_properties
+from    ...core.io.manifest import FileManifest, ManifestEvent, hash_chunk
+from    ...core.io.store import ChunkStore
+from    .chunker import NativeChunker
+
+
+def iter_loader(loader:BaseLoader) -> Generator[Document, None, None]:
+    # not every loader implements lazy_load, fall back to a materialized load
+    try:
+        yield from loader.lazy_load()
+    except NotImplementedError:
+        yield from loader.load()
+
+
+def load_file(uri:str, ext_name:str, **kwargs) -> List[Document]:
+    """parses a single file with its extension loader, executed within pool workers"""
+    mapping:dict = Loader.lookup('extension', DictConfig(dict(uri=uri, ext_name=ext_name, ext_suffix=f".{ext_name}")))
+    return list(iter_loader(mapping.get('cls_loader')(uri, **kwargs)))
+
 
 class Loader(object):
+    # parsing of these formats is CPU bound, files are fanned out to processes rather than threads
+    cpu_bound_ext = ('pdf', 'csv')
+
     @classmethod
     def load_content(cls, uri:str, root_dir:str, **kwargs) -> List[Document]:
         properties:dict = get_uri_properties(uri, root_dir)
@@ -23,11 +49,79 @@ class Loader(object):
         documents       = loader.load()
         return documents
 
+    @classmethod
+    def lazy_load_content(cls, uri:str, root_dir:str, num_workers:Optional[int]=None, max_pending:Optional[int]=None,
+                          **kwargs) -> Generator[Document, None, None]:
+        """streams documents rather than materializing the whole corpus
+
+        Directories are parsed file by file across a worker pool (processes for CPU heavy formats),
+        with at most max_pending files in flight so memory stays flat regardless of corpus size.
+
+        Args:
+            uri (str): file, directory or remote uri
+            root_dir (str): root directory for relative local uris
+            num_workers (Optional[int], optional): pool size for directories. Defaults to the cpu count.
+            max_pending (Optional[int], optional): files parsed ahead of the consumer. Defaults to 2 * num_workers.
+
+        Returns:
+            Generator[Document, None, None]: documents in file order
+
+        Examples:
+        >>> for doc in Loader.lazy_load_content("data/filings", root_dir, num_workers=8):
+        ...     index(doc)
+        """
+        properties:dict = get_uri_properties(uri, root_dir)
+        if properties.is_remote or not properties.is_dir:
+            mapping_svc:str = 'extension' if not properties.is_remote else 'remote'
+            mapping:dict    = Loader.lookup(mapping_svc, properties)
+            kwargs.update(mapping.get('params', dict()))
+            yield from iter_loader(mapping.get('cls_loader')(properties.uri, **kwargs))
+            return
+        files = search_files(properties.uri, properties.ext_suffix)
+        yield from Loader.parallel_load(files, properties.ext_name, num_workers=num_workers, max_pending=max_pending, **kwargs)
+
+    @classmethod
+    def parallel_load(cls, files:List[str], ext_name:str, num_workers:Optional[int]=None, max_pending:Optional[int]=None,
+                      **kwargs) -> Generator[Document, None, None]:
+        for _, documents in Loader.parallel_load_files(files, ext_name, num_workers=num_workers, max_pending=max_pending, **kwargs):
+            yield from documents
+
+    @classmethod
+    def parallel_load_files(cls, files:List[str], ext_name:str, num_workers:Optional[int]=None, max_pending:Optional[int]=None,
+                            **kwargs) -> Generator[Tuple[str, List[Document]], None, None]:
+        num_workers  = num_workers or multiprocessing.cpu_count()
+        max_pending  = max_pending or 2 * num_workers
+        executor_cls = ProcessPoolExecutor if ext_name in cls.cpu_bound_ext else ThreadPoolExecutor
+        files        = iter(files)
+        with executor_cls(max_workers=num_workers) as executor:
+            # bounded window of in-flight files, results are consumed in submission order (backpressure)
+            pending = deque((uri, executor.submit(load_file, uri, ext_name, **kwargs)) for uri in itertools.islice(files, max_pending))
+            while pending:
+                path, future = pending.popleft()
+                documents    = future.result()
+                for uri in files:
+                    pending.append((uri, executor.submit(load_file, uri, ext_name, **kwargs)))
+                    break
+                yield path, documents
+
+    @classmethod
+    def lazy_load_chunks(cls, uri:str, root_dir:str, splitter_type:str='recursive', num_workers:Optional[int]=None,
+                         max_pending:Optional[int]=None, **kwargs) -> Generator[Document, None, None]:
+        """streams chunks, each loaded document is split as it arrives
+
+        Examples:
+        >>> chunks = Loader.lazy_load_chunks("data/filings", root_dir, splitter_type='recursive', chunk_size=1024)
+        """
+        splitter = TransformerChunks.create_splitter(splitter_type, **kwargs)
+        for document in Loader.lazy_load_content(uri, root_dir, num_workers=num_workers, max_pending=max_pending):
+            yield from splitter.split_documents([document])
+
     @classmethod
     def lookup(cls, svc_type:str, properties:dict) -> dict:
         uri = properties.uri 
         ext_lookup = dict(
             text        = dict(cls_loader=ldl.TextLoader), 
+            txt         = dict(cls_loader=ldl.TextLoader), 
             py          = dict(cls_loader=ldl.PythonLoader), 
             csv         = dict(cls_loader=ldl.CSVLoader),
             pdf         = dict(cls_loader=ldl.OnlinePDFLoader if (is_url_remote(uri) and is_valid_url(uri)) else ldl.PyPDFLoader)
@@ -50,10 +144,63 @@ class Loader(object):
             ), 
         )
         lookup_svc = ext_lookup | svc_lookup | defaults_lookup
-        return ext_fn_loader.get(properties.ext_name) if svc_type == 'extension' else lookup_svc.get(svc_type)
+        # unlisted extensions (e.g. md) are read as plain text, as the DirectoryLoader default does
+        ext_loader = ext_lookup.get(properties.ext_name, dict(cls_loader=ldl.TextLoader))
+        return ext_loader if svc_type == 'extension' else lookup_svc.get(svc_type)
 
 
 
+    @classmethod
+    def load_incremental(cls, uri:str, root_dir:str, manifest:FileManifest, splitter_type:str='recursive',
+                         num_workers:Optional[int]=None, max_pending:Optional[int]=None, save_every:int=100,
+                         **kwargs) -> Generator[ManifestEvent, None, None]:
+        """incrementally ingests a directory against a file manifest
+
+        Only new or modified files are loaded and chunked; each yields an 'upsert' event carrying the
+        chunks whose hash was not present in the previous version of the file (chunk_hash in metadata,
+        scoped by path), plus the hashes of chunks that disappeared. Deleted files yield 'delete' tombstones.
+        A file is committed once the consumer has handled its event and the manifest is saved every
+        save_every events and when the generator exits, so an interrupted run resumes after the last save.
+
+        Examples:
+        >>> manifest = FileManifest.from_experiment(exp_conf, name='filings')
+        >>> for event in Loader.load_incremental("data/filings", root_dir, manifest, chunk_size=1024):
+        ...     store.delete(event.removed_hashes); store.upsert(event.documents)
+        """
+        properties:dict = get_uri_properties(uri, root_dir)
+        diff            = manifest.scan(properties.uri, properties.ext_suffix)
+        splitter        = TransformerChunks.create_splitter(splitter_type, **kwargs)
+        handled         = 0
+        try:
+            for path in diff.deleted:
+                yield ManifestEvent(action='delete', path=path, removed_hashes=list(manifest.records[path].chunk_hashes))
+                manifest.remove(path)
+                handled += 1
+                if handled % save_every == 0:
+                    manifest.save()
+            files = Loader.parallel_load_files(diff.changed, properties.ext_name, num_workers=num_workers, max_pending=max_pending)
+            for path, documents in files:
+                chunks   = splitter.split_documents(documents)
+                hashes   = [hash_chunk(path, chunk.page_content) for chunk in chunks]
+                previous = set(manifest.records[path].chunk_hashes) if path in manifest else set()
+                for chunk, chunk_hash in zip(chunks, hashes):
+                    chunk.metadata['chunk_hash'] = chunk_hash
+                yield ManifestEvent(
+                    action         = 'upsert',
+                    path           = path,
+                    documents      = [chunk for chunk, chunk_hash in zip(chunks, hashes) if chunk_hash not in previous],
+                    chunk_hashes   = hashes,
+                    removed_hashes = manifest.diff_chunks(path, hashes)
+                )
+                manifest.commit(path, hashes)
+                handled += 1
+                if handled % save_every == 0:
+                    manifest.save()
+        finally:
+            # a single rewrite per batch of files rather than per file, committed files survive early exits
+            manifest.save()
+
+
 class TransformerChunks(object):
     @classmethod
     def trsfrm_to_text(cls, pages:List[Document]) -> str:
@@ -83,6 +230,19 @@ class TransformerChunks(object):
             for doc in documents]
         )
 
+    @classmethod
+    def trsfrm_to_table(cls, documents:List[Document], embeddings:Optional[np.ndarray]=None) -> "pa.Table":
+        """transform documents into a columnar arrow table of text, offsets, flattened metadata and embeddings
+
+        Args:
+            documents (List[Document]): loaded or chunked documents
+            embeddings (Optional[np.ndarray], optional): embeddings of shape (n_documents, dim). Defaults to None.
+
+        Returns:
+            pa.Table: arrow table, persisted via ChunkStore.write
+        """
+        return ChunkStore.build_table(documents, embeddings=embeddings)
+
     @classmethod
     def trsfrm_to_chunks(cls, content:Union[List[Document], str], splitter_type:str='recursive', **kwargs) -> List[Document]: 
         """chunk documents rather than the entire document
@@ -91,19 +251,51 @@ class TransformerChunks(object):
 
         Args:
             content (Union[List[Document], str]): List of Documents from Extraction or a text string
-            splitter_type (str, optional): mapping of splitter type. Defaults to 'character'.
+            splitter_type (str, optional): mapping of splitter type, 'native' and 'native_token' split
+                documents in parallel (num_workers). Defaults to 'recursive'.
 
         Returns:
             List[Document]: List of splitted documents
         """
+        splitter = TransformerChunks.create_splitter(splitter_type, **kwargs)
+        if isinstance(content, str) or isinstance(content[0], str):
+            return splitter.split_text(content)
+        if isinstance(splitter, NativeChunker):
+            return splitter.split_documents(content, num_workers=kwargs.get('num_workers', 1))
+        return splitter.split_documents(content)
+
+    @classmethod
+    def trsfrm_to_chunk_offsets(cls, texts:List[str], splitter_type:str='native', num_workers:Optional[int]=None, **kwargs) -> List[np.ndarray]:
+        """chunk [start, end) character offsets per text, callers slice text lazily instead of copying chunks
+
+        Args:
+            texts (List[str]): texts to chunk
+            splitter_type (str, optional): 'native' (character) or 'native_token'. Defaults to 'native'.
+            num_workers (Optional[int], optional): worker processes, defaults to the cpu count
+
+        Returns:
+            List[np.ndarray]: offsets of shape (n_chunks, 2) per text
+        """
+        splitter = TransformerChunks.create_splitter(splitter_type, **kwargs)
+        if not isinstance(splitter, NativeChunker):
+            raise ValueError(f"Chunk offsets require a native splitter_type, got: {splitter_type}")
+        return splitter.split_batch(texts, num_workers=num_workers)
+
+    # splitters are stateless after construction, reuse them across calls
+    splitters:dict = dict()
+
+    @classmethod
+    def create_splitter(cls, splitter_type:str='recursive', **kwargs) -> lts.TextSplitter:
         chunk_size    = kwargs.get("chunk_size", 1024)
         chunk_overlap = kwargs.get("chunk_overlap", 0)
-        params        = dict(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        # perform lookup and execution of the splitter 
-        mapping:dict  = TransformerChunks.lookup(splitter_type)
-        params.update(mapping.get('params', dict()))
-        splitter = mapping.get('cls_loader')(**params)
-        return splitter.split_text(content) if isinstance(content[0], str) else splitter.split_documents(content)
+        key           = (splitter_type, chunk_size, chunk_overlap)
+        if key not in cls.splitters:
+            params        = dict(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            # perform lookup and execution of the splitter 
+            mapping:dict  = TransformerChunks.lookup(splitter_type)
+            params.update(mapping.get('params', dict()))
+            cls.splitters[key] = mapping.get('cls_loader')(**params)
+        return cls.splitters[key]
 
 
     @classmethod 
@@ -113,6 +305,8 @@ class TransformerChunks(object):
             token       = dict(cls_loader=lts.TokenTextSplitter),
             character   = dict(cls_loader=lts.CharacterTextSplitter, params=dict(separator=' ', length_function=len)),
             recursive   = dict(cls_loader=lts.RecursiveCharacterTextSplitter, params=dict(seperators=["\n\n", "\n", "(?<=\. )", " ", ""])),
+            native      = dict(cls_loader=NativeChunker, params=dict(mode='character')),
+            native_token = dict(cls_loader=NativeChunker, params=dict(mode='token')),
         )
         chunk_loader.update(dict(
             md_header   = dict(
@@ -1,5 +1,7 @@
 import  pandas as pd 
 import  os 
+import  time
+import  getpass
 from    typing import List, Dict, Generator, Any 
 
 import  openai
@@ -9,6 +11,8 @@ from tenacity import (
     wait_random_exponential,        # for exponential backoff
 )  
 
+from    .cache import cached_completion
+from    .streaming import StreamConsumer
 from    ...core.utils import read_env 
 
 def read_credentials(user_input:bool=False) -> str:
@@ -21,6 +25,13 @@ def read_credentials(user_input:bool=False) -> str:
     return openai.api_key
 
 
+def restore_openai_object(response:Any) -> Any:
+    # resolved per call, openai.util only exists before openai 1.0 (identity otherwise)
+    util = getattr(openai, 'util', None)
+    return util.convert_to_openai_object(response) if util is not None else response
+
+
+@cached_completion(restore=restore_openai_object)
 @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(3))
 def generate_chat_completion(model_name:str, messages:dict, config:dict, stream:bool=True):
     """Generate Chat completion task
@@ -40,6 +51,10 @@ def generate_chat_completion(model_name:str, messages:dict, config:dict, stream:
  
     # response.choices[0].message.content
     # pd.DataFrame( [dict(response.choices[0].message)|dict(response.usage)]) 
+
+    # non-streamed, temperature=0 requests are served from the completion cache when one is set
+    >>> set_default_cache(CompletionCache())
+    >>> generate_chat_completion(model_name, messages, dict(temperature=0), stream=False)
     """
     response = openai.ChatCompletion.create(
         model    = model_name,
@@ -48,3 +63,16 @@ def generate_chat_completion(model_name:str, messages:dict, config:dict, stream:
         **config
     )
     return response
+
+
+def stream_chat_completion(model_name:str, messages:dict, config:dict) -> StreamConsumer:
+    """Generate a streamed chat completion, wrapped for incremental consumption and latency metrics
+
+    Examples:
+    >>> consumer = stream_chat_completion(model_name, messages, config)
+    >>> for delta in consumer: ...
+    >>> consumer.metrics.to_dict()      # ttft_sec, inter_token_mean, tokens_per_sec
+    """
+    start    = time.perf_counter()
+    response = generate_chat_completion(model_name, messages, config, stream=True)
+    return StreamConsumer(response, start=start)
@@ -0,0 +1,192 @@
+import  pandas as pd
+import  json
+import  time
+import  random
+import  threading
+import  logging
+from    pathlib import Path
+from    concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from    typing import List, Dict, Any, Iterable, Optional, Union, Callable
+
+import  requests
+
+from    .encoding import Tokenizer
+from    ...core.services.rest import ServiceClient, ClientConfig, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket refilled continuously at rate_per_min, bursts up to capacity
+
+    clock and sleep default to time.monotonic and time.sleep, a fake pair makes the bucket deterministic in tests
+    """
+    def __init__(self, rate_per_min:float, capacity:Optional[float]=None, clock:Callable[[], float]=time.monotonic,
+                 sleep:Callable[[float], None]=time.sleep):
+        self.rate     = rate_per_min / 60.0
+        self.capacity = capacity or rate_per_min
+        self.tokens   = self.capacity
+        self.clock    = clock
+        self.sleep    = sleep
+        self.updated  = clock()
+        self.lock     = threading.Lock()
+
+    def acquire(self, amount:float=1.0) -> float:
+        """blocks until amount tokens are available, returns the seconds waited"""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                now          = self.clock()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+def to_messages(prompts:Union[pd.DataFrame, Iterable[Any]], col:str='prompt') -> List[List[dict]]:
+    """normalizes prompts into chat messages: DataFrame 'messages' or prompt column, strings or message lists"""
+    if isinstance(prompts, pd.DataFrame):
+        prompts = prompts['messages'] if 'messages' in prompts.columns else prompts[col]
+    return [[dict(role="user", content=prompt)] if isinstance(prompt, str) else list(prompt) for prompt in prompts]
+
+
+class BatchCompletionRunner(object):
+    """Runs chat completions for many prompts with bounded concurrency and rate limits
+
+    Requests are limited by both requests/min and tokens/min buckets (prompt tokens estimated via the
+    Tokenizer plus the configured max_tokens), retried on 429/5xx with jittered exponential backoff,
+    and checkpointed as JSONL so an interrupted run resumes where it stopped.
+
+    Examples:
+    >>> runner  = BatchCompletionRunner("gpt-3.5-turbo", config=dict(temperature=0, max_tokens=256),
+    ...                                 credentials=dict(api_key=api_key), max_concurrency=16,
+    ...                                 requests_per_min=3500, tokens_per_min=90_000, checkpoint_path="runs/eval.jsonl")
+    >>> results = runner.run(df_prompts)                # ordered as the prompts
+    >>> results[0]["choices"][0]["message"]["content"]
+    """
+    def __init__(self, model_name:str, config:dict, credentials:dict, endpoint:Optional[str]=None,
+                 max_concurrency:int=8, requests_per_min:float=3500, tokens_per_min:float=90_000,
+                 max_retries:int=5, backoff_factor:float=1.0, max_backoff:float=60.0,
+                 checkpoint_path:Optional[str]=None, tokenizer:Optional[Tokenizer]=None, client:Optional[ServiceClient]=None):
+        self.model_name      = model_name
+        self.config          = dict(config)
+        self.endpoint        = endpoint or "https://api.openai.com/v1/chat/completions"
+        self.headers         = {"Authorization": f"Bearer {credentials['api_key']}"}
+        self.max_concurrency = max_concurrency
+        self.max_retries     = max_retries
+        self.backoff_factor  = backoff_factor
+        self.max_backoff     = max_backoff
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.tokenizer       = tokenizer or Tokenizer()
+        # retries are handled per request here, so the transport does not retry on its own
+        self.client          = client or ServiceClient(ClientConfig(pool_maxsize=max_concurrency, retry=RetryPolicy(total=0)))
+        self.request_bucket  = TokenBucket(requests_per_min)
+        self.token_bucket    = TokenBucket(tokens_per_min)
+        self.lock            = threading.Lock()
+
+    def estimate_tokens(self, messages:List[dict]) -> int:
+        prompt_tokens = sum(len(self.tokenizer.encode(message.get('content') or '')) + 4 for message in messages)
+        return prompt_tokens + self.config.get('max_tokens', 0)
+
+    def calc_backoff(self, attempt:int, response:Optional[requests.Response]=None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.replace('.', '', 1).isdigit():
+            return float(retry_after)
+        return min(self.max_backoff, self.backoff_factor * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def request(self, index:int, messages:List[dict]) -> dict:
+        body     = {**self.config, "model": self.model_name, "messages": messages}
+        tokens   = self.estimate_tokens(messages)
+        record   = dict(index=index, response=None, error=None, attempts=0)
+        for attempt in range(self.max_retries + 1):
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(tokens)
+            record['attempts'] = attempt + 1
+            response = None
+            try:
+                response = self.client.send(self.endpoint, body, headers=self.headers)
+                if response.status_code == requests.codes.OK:
+                    record.update(response=response.json(), error=None)
+                    return record
+                record['error'] = f"HTTP {response.status_code}: {response.text[:256]}"
+                if response.status_code != 429 and response.status_code < 500:
+                    return record
+            except requests.exceptions.RequestException as e:
+                record['error'] = f"{e.__class__.__name__}: {e}"
+            if attempt < self.max_retries:
+                time.sleep(self.calc_backoff(attempt, response))
+        logger.error(f"Request {index} failed after {record['attempts']} attempts: {record['error']}")
+        return record
+
+    def load_checkpoint(self) -> Dict[int, dict]:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return dict()
+        records = dict()
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue            # partially written trailing line of an interrupted run
+                # only successful records are final, failed ones are retried on resume
+                if record.get('error') is None:
+                    records[record['index']] = record
+        logger.info(f"Resuming from checkpoint: {len(records)} completed requests in {self.checkpoint_path}")
+        return records
+
+    def ends_with_newline(self) -> bool:
+        with open(self.checkpoint_path, 'rb') as f:
+            f.seek(-1, 2)
+            return f.read(1) == b"\n"
+
+    def write_checkpoint(self, handle, record:dict) -> None:
+        if handle is not None:
+            with self.lock:
+                handle.write(json.dumps(record) + "\n")
+                handle.flush()
+
+    def run(self, prompts:Union[pd.DataFrame, Iterable[Any]], col:str='prompt') -> List[Optional[dict]]:
+        """runs all prompts, returning responses in prompt order (None for failed requests)
+
+        Args:
+            prompts (Union[pd.DataFrame, Iterable[Any]]): DataFrame with 'messages' or col, prompt strings or message lists
+            col (str, optional): prompt column of a DataFrame. Defaults to 'prompt'.
+
+        Returns:
+            List[Optional[dict]]: completion responses ordered as the prompts
+        """
+        messages = to_messages(prompts, col=col)
+        records  = self.load_checkpoint()
+        pending  = iter([(index, msgs) for index, msgs in enumerate(messages) if index not in records])
+        handle   = None
+        if self.checkpoint_path:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.checkpoint_path, 'a', encoding='utf-8')
+            if handle.tell() and not self.ends_with_newline():
+                # terminate a partially written line of an interrupted run, appended records start on a new line
+                handle.write("\n")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                # keep a bounded window of in-flight requests rather than submitting everything upfront
+                in_flight = set()
+                for index, msgs in pending:
+                    in_flight.add(executor.submit(self.request, index, msgs))
+                    if len(in_flight) >= 2 * self.max_concurrency:
+                        completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in completed:
+                            self.collect(future.result(), records, handle)
+                for future in wait(in_flight).done:
+                    self.collect(future.result(), records, handle)
+        finally:
+            if handle is not None:
+                handle.close()
+        return [records[index]['response'] if index in records else None for index in range(len(messages))]
+
+    def collect(self, record:dict, records:Dict[int, dict], handle) -> None:
+        records[record['index']] = record
+        self.write_checkpoint(handle, record)
@@ -0,0 +1,164 @@
+import  json
+import  time
+import  sqlite3
+import  hashlib
+import  inspect
+import  functools
+import  threading
+import  logging
+from    pathlib import Path
+from    typing import Optional, Callable, Any, List
+
+from    ...core.utils import read_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionCache(object):
+    """Persistent SQLite cache of chat completion responses
+
+    Keys are a canonical hash of (model, messages, generation config). With normalize=True message
+    contents are whitespace-normalized before hashing, so trivially reformatted prompts share entries.
+    Sampled generations (temperature > 0) bypass the cache unless force=True.
+
+    Examples:
+    >>> cache = CompletionCache(ttl_sec=7 * 24 * 3600, max_entries=100_000)
+    >>> set_default_cache(cache)                         # wraps generate_chat_completion(_rest) transparently
+    >>> response = generate_chat_completion_rest(model_name, messages, dict(temperature=0), endpoint, credentials)
+    >>> cache.stats()
+    """
+    # request fields which are not part of the generation config
+    excluded_keys = ('model', 'messages', 'stream')
+
+    def __init__(self, path:Optional[str]=None, ttl_sec:Optional[float]=None, max_entries:Optional[int]=None,
+                 normalize:bool=False, force:bool=False):
+        self.path        = Path(path) if path else Path(read_cache_dir(app='keebler_llm')).joinpath('completions', 'cache.sqlite')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_sec     = ttl_sec
+        self.max_entries = max_entries
+        self.normalize   = normalize
+        self.force       = force
+        self.lock        = threading.Lock()
+        self.hits = self.misses = self.bypassed = self.evictions = 0
+        self.conn        = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def normalize_messages(self, messages:List[dict]) -> List[dict]:
+        return [
+            {**message, 'content': " ".join(message['content'].split())} if isinstance(message.get('content'), str) else message
+            for message in messages
+        ]
+
+    def make_key(self, model_name:str, messages:List[dict], config:dict) -> str:
+        messages = self.normalize_messages(messages) if self.normalize else messages
+        config   = {key: value for key, value in config.items() if key not in self.excluded_keys}
+        payload  = json.dumps(dict(model=model_name, messages=messages, config=config), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_cacheable(self, config:dict) -> bool:
+        # the API default temperature is 1, i.e. sampled unless explicitly set to 0
+        return self.force or config.get('temperature', 1.0) == 0
+
+    def get(self, key:str) -> Optional[Any]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_sec and now - row[1] > self.ttl_sec:
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key:str, response:Any) -> None:
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response), now, now)
+            )
+            if self.max_entries:
+                # least recently accessed entries beyond max_entries
+                cursor = self.conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+                self.evictions += max(cursor.rowcount, 0)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM completions")
+
+    def stats(self) -> dict:
+        num_lookups = self.hits + self.misses
+        return dict(
+            entries   = len(self),
+            hits      = self.hits,
+            misses    = self.misses,
+            bypassed  = self.bypassed,
+            evictions = self.evictions,
+            hit_rate  = round(self.hits / num_lookups, 3) if num_lookups else 0.0
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_default_cache:Optional[CompletionCache] = None
+
+def set_default_cache(cache:Optional[CompletionCache]) -> None:
+    """sets the process-wide cache used by completion functions when no cache is passed, None disables"""
+    global _default_cache
+    _default_cache = cache
+
+def get_default_cache() -> Optional[CompletionCache]:
+    return _default_cache
+
+
+def cached_completion(restore:Optional[Callable[[Any], Any]]=None) -> Callable:
+    """decorates fn(model_name, messages, config, ...) with the completion cache
+
+    The cache is taken from a `cache` keyword argument or the process-wide default; streamed and
+    sampled requests are passed through. restore converts cached json back to the native response type.
+
+    Examples:
+    >>> @cached_completion(restore=restore_openai_object)
+    ... def generate_chat_completion(model_name, messages, config, stream=True): ...
+    """
+    def decorator(fn:Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, cache:Optional[CompletionCache]=None, **kwargs):
+            # explicit None check, an empty CompletionCache is falsy (__len__ == 0)
+            cache = cache if cache is not None else _default_cache
+            if cache is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            model_name, messages, config = (bound.arguments[name] for name in ('model_name', 'messages', 'config'))
+            if bound.arguments.get('stream', False) or not cache.is_cacheable(config):
+                cache.bypassed += 1
+                return fn(*args, **kwargs)
+            key      = cache.make_key(model_name, messages, dict(config))
+            response = cache.get(key)
+            if response is not None:
+                return restore(response) if restore else response
+            response = fn(*args, **kwargs)
+            if response is not None:
+                cache.put(key, response)
+            return response
+        return wrapper
+    return decorator
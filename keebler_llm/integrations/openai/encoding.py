@@ -1,6 +1,124 @@
+import  numpy  as np 
 import  pandas as pd 
 import  tiktoken
-from    typing import List, Dict, Generator, Any 
+import  itertools
+import  threading
+import  logging
+from    pathlib import Path
+from    dataclasses import dataclass
+from    typing import List, Dict, Generator, Any, Tuple, Optional
+
+from    ...core.utils import read_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RaggedTokens:
+    """Token ids of many texts in a flat int32 array, row i spans ids[offsets[i]:offsets[i+1]]"""
+    ids:np.ndarray          # (n_tokens,) int32
+    offsets:np.ndarray      # (n_rows + 1,) int64
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index:int) -> np.ndarray:
+        return self.ids[self.offsets[index]:self.offsets[index + 1]]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_lists(cls, token_lists:List[List[int]]) -> "RaggedTokens":
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        ids     = np.fromiter(itertools.chain.from_iterable(token_lists), dtype=np.int32, count=int(offsets[-1]))
+        return cls(ids=ids, offsets=offsets)
+
+    @classmethod
+    def concat(cls, parts:List["RaggedTokens"]) -> "RaggedTokens":
+        if not parts:
+            return cls(ids=np.empty((0,), dtype=np.int32), offsets=np.zeros((1,), dtype=np.int64))
+        shifts  = np.cumsum([0] + [int(part.offsets[-1]) for part in parts[:-1]])
+        offsets = np.concatenate([[0]] + [part.offsets[1:] + shift for part, shift in zip(parts, shifts)]).astype(np.int64)
+        return cls(ids=np.concatenate([part.ids for part in parts]), offsets=offsets)
+
+
+class TokenTable(object):
+    """Memo table of token id -> decoded piece for an encoding, populated lazily or built upfront
+
+    Pieces match encoding.decode([token]), i.e. partial utf-8 byte sequences decode with replacement.
+
+    Examples:
+    >>> table  = get_token_table(tiktoken.get_encoding("cl100k_base"))
+    >>> pieces = table.lookup(np.array([9906, 1917]))        # array(['Hello', ' world'], dtype=object)
+    >>> table.build(); table.save()                          # persist the full table for fast startup
+    """
+    def __init__(self, encoding:tiktoken.Encoding, cache_dir:Optional[str]=None):
+        self.encoding = encoding
+        self.path     = Path(cache_dir or read_cache_dir(app='keebler_llm')).joinpath('tiktoken', f"{encoding.name}.npz")
+        self.pieces   = np.empty((encoding.n_vocab,), dtype=object)
+        self.filled   = np.zeros((encoding.n_vocab,), dtype=bool)
+        self.lock     = threading.Lock()
+
+    def decode_token(self, token:int) -> str:
+        try:
+            return self.encoding.decode_single_token_bytes(token).decode('utf-8', errors='replace')
+        except KeyError:
+            # unused ids within n_vocab
+            return ""
+
+    def fill(self, ids:np.ndarray) -> None:
+        with self.lock:
+            for token in np.unique(ids[~self.filled[ids]]).tolist():
+                self.pieces[token] = self.decode_token(token)
+                self.filled[token] = True
+
+    def lookup(self, ids:Any) -> np.ndarray:
+        """maps an array of token ids to their pieces, decoding each unseen id once"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not self.filled[ids].all():
+            self.fill(ids)
+        return self.pieces[ids]
+
+    def build(self) -> "TokenTable":
+        self.fill(np.arange(self.encoding.n_vocab))
+        return self
+
+    def save(self) -> Path:
+        # pieces as a single utf-8 blob plus offsets, avoids pickling object arrays
+        data    = [piece.encode('utf-8') for piece in self.pieces[self.filled]]
+        offsets = np.concatenate([[0], np.cumsum([len(piece) for piece in data])]).astype(np.int64)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(self.path, ids=np.flatnonzero(self.filled), offsets=offsets, blob=np.frombuffer(b"".join(data), dtype=np.uint8))
+        return self.path
+
+    def load(self) -> bool:
+        if not self.path.exists():
+            return False
+        with np.load(self.path, allow_pickle=False) as archive:
+            ids, offsets, blob = archive['ids'], archive['offsets'], archive['blob'].tobytes()
+        with self.lock:
+            for token, start, end in zip(ids.tolist(), offsets[:-1].tolist(), offsets[1:].tolist()):
+                self.pieces[token] = blob[start:end].decode('utf-8')
+            self.filled[ids] = True
+        logger.info(f"Loaded token table: {len(ids)} pieces from {self.path}")
+        return True
+
+
+_token_tables:Dict[str, TokenTable] = {}
+_token_tables_lock = threading.Lock()
+
+def get_token_table(encoding:tiktoken.Encoding) -> TokenTable:
+    """returns the process-wide table of an encoding, shared by all Tokenizer instances of the same model"""
+    with _token_tables_lock:
+        if encoding.name not in _token_tables:
+            table = TokenTable(encoding)
+            table.load()
+            _token_tables[encoding.name] = table
+        return _token_tables[encoding.name]
+
 
 class Tokenizer(object):
     # "text-davinci-003"
@@ -8,6 +126,7 @@ class Tokenizer(object):
     # "cl100k_base" -> design to work with ada-002 model
     def __init__(self, model_name:str="gpt-3.5-turbo-16k"):
         self.encoding = tiktoken.encoding_for_model(model_name)
+        self.table    = get_token_table(self.encoding)
 
     # Tokens are often ~ 4 characters, 2/3 of a word
     def pipe(self, df:pd.DataFrame, col:str='text') -> pd.DataFrame:
@@ -19,12 +138,65 @@ class Tokenizer(object):
             decoded     = lambda df_: df_['token'].apply(lambda x: self.encoding.decode(x)),
             token_map   = lambda df_: df_['token'].apply(lambda x: self.decode_encoding(x))
         )
+
+    def pipe_batch(self, df:pd.DataFrame, col:str='text', batch_size:int=10_000, num_threads:int=8,
+                   decoded:bool=False, token_map:bool=False) -> Tuple[pd.DataFrame, RaggedTokens]:
+        """high throughput variant of pipe, token ids are kept out of the frame in a ragged layout
+
+        Texts are encoded in batches across tiktoken's thread pool; per row lengths come from the
+        ragged offsets. decoded/token_map columns are opt-in, otherwise decode rows on demand via
+        tokenizer.decode(tokens[row]).
+
+        Args:
+            df (pd.DataFrame): input frame
+            col (str, optional): text column. Defaults to 'text'.
+            batch_size (int, optional): texts per encode_ordinary_batch call. Defaults to 10_000.
+            num_threads (int, optional): tiktoken encoding threads. Defaults to 8.
+            decoded (bool, optional): add the decoded text column. Defaults to False.
+            token_map (bool, optional): add the per row id -> piece column. Defaults to False.
+
+        Returns:
+            Tuple[pd.DataFrame, RaggedTokens]: frame with word_len, token_len, token_offset columns and the token ids
+
+        Examples:
+        >>> df_tokens, tokens = tokenizer.pipe_batch(df, col='text')
+        >>> tokens[0], tokenizer.decode(tokens[0])
+        """
+        tokens = self.encode_ragged(df[col].tolist(), batch_size=batch_size, num_threads=num_threads)
+        df     = df.assign(
+            word_len     = df[col].str.split().str.len().fillna(0).astype(np.int64),
+            token_len    = tokens.lengths,
+            token_offset = tokens.offsets[:-1]
+        )
+        if decoded:
+            df = df.assign(decoded=self.encoding.decode_batch([tokens[idx].tolist() for idx in range(len(tokens))], num_threads=num_threads))
+        if token_map:
+            df = df.assign(token_map=[self.decode_encoding(tokens[idx].tolist()) for idx in range(len(tokens))])
+        return df, tokens
+
+    def encode_ragged(self, texts:List[str], batch_size:int=10_000, num_threads:int=8) -> RaggedTokens:
+        # special token text is encoded as ordinary text rather than raising
+        return RaggedTokens.concat([
+            RaggedTokens.from_lists(self.encoding.encode_ordinary_batch(texts[start:start + batch_size], num_threads=num_threads))
+            for start in range(0, len(texts), batch_size)
+        ])
     
     def encode(self, text:List[str]) -> List[int]:
         return self.encoding.encode(text)
 
     def decode(self, ids:List[int]) -> List[str]:
-        return self.encoding.decode(ids)
+        # accepts rows of RaggedTokens (numpy arrays) as well as lists
+        return self.encoding.decode(ids.tolist() if isinstance(ids, np.ndarray) else ids)
 
     def decode_encoding(self, ids:List[int]) -> Dict[int, str]:
-        return {token:self.encoding.decode([token]) for token in ids}
+        ids = ids.tolist() if isinstance(ids, np.ndarray) else list(ids)
+        return dict(zip(ids, self.table.lookup(ids).tolist())) if ids else {}
+
+    def decode_many(self, ids:Any) -> np.ndarray:
+        """vectorized id -> piece mapping through the shared memo table
+
+        Examples:
+        >>> df_tokens, tokens = tokenizer.pipe_batch(df)
+        >>> pieces = tokenizer.decode_many(tokens.ids)          # pieces of every token in the corpus
+        """
+        return self.table.lookup(ids)
@@ -0,0 +1,155 @@
+import  numpy as np
+import  logging
+from    dataclasses import dataclass
+from    typing import List, Optional, Any, Sequence
+
+from    .encoding import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PackedPrompt:
+    messages:List[dict]         # chat messages ready for generate_chat_completion(_rest)
+    indices:List[int]           # selected chunk positions, in packed order
+    num_tokens:int              # prompt tokens as counted by the chat API
+    budget:int                  # prompt token budget (context window minus completion reserve)
+    truncated:Optional[int]     = None  # chunk truncated to fill the remaining budget, packed last
+
+
+class PromptPacker(object):
+    """Packs the highest scoring context chunks into a chat prompt within a token budget
+
+    Chunk lengths are encoded once in a batch, selection works on those counts incrementally
+    ('greedy' by score or 'knapsack' maximizing total score), and the packed prompt is verified
+    with a single final count rather than re-encoding per candidate. Tokens left over are filled
+    with a truncated prefix of the best chunk that did not fit.
+
+    Examples:
+    >>> packer  = PromptPacker(Tokenizer("gpt-3.5-turbo-16k"), max_context=16385, max_completion=1024)
+    >>> chunks  = TransformerChunks.trsfrm_to_chunks(documents, chunk_size=1024)
+    >>> packed  = packer.pack(question, [doc.page_content for doc in chunks], scores=dense_scores,
+    ...                       system="Answer using only the context.")
+    >>> generate_chat_completion_rest(model_name, packed.messages, config, endpoint, credentials)
+    """
+    # chat format overhead, per the OpenAI token counting guidance for gpt-3.5-turbo/gpt-4
+    tokens_per_message:int = 3
+    tokens_per_name:int    = 1
+    tokens_reply:int       = 3
+
+    def __init__(self, tokenizer:Optional[Tokenizer]=None, max_context:int=16385, max_completion:int=1024,
+                 separator:str="\n\n", template:str="Context:\n{context}\n\nQuestion: {question}"):
+        self.tokenizer      = tokenizer or Tokenizer()
+        self.encoding       = self.tokenizer.encoding
+        self.max_context    = max_context
+        self.max_completion = max_completion
+        self.separator      = separator
+        self.template       = template
+        self.separator_len  = self.count_tokens(separator)
+
+    def count_tokens(self, text:str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def count_messages(self, messages:List[dict]) -> int:
+        """counts prompt tokens of chat messages the way the chat completion API bills them"""
+        num_tokens = self.tokens_reply
+        for message in messages:
+            num_tokens += self.tokens_per_message
+            for key, value in message.items():
+                num_tokens += self.count_tokens(value) if isinstance(value, str) else 0
+                num_tokens += self.tokens_per_name if key == 'name' else 0
+        return num_tokens
+
+    def truncate(self, text:str, max_tokens:int) -> str:
+        """truncates text at a token boundary"""
+        ids = self.encoding.encode_ordinary(text)
+        return text if len(ids) <= max_tokens else self.encoding.decode(ids[:max_tokens])
+
+    def build_messages(self, question:str, context:str, system:Optional[str]=None) -> List[dict]:
+        messages = [dict(role="system", content=system)] if system else []
+        return messages + [dict(role="user", content=self.template.format(context=context, question=question))]
+
+    def select_greedy(self, costs:np.ndarray, scores:np.ndarray, capacity:int) -> List[int]:
+        selected, used = [], 0
+        for idx in np.argsort(-scores, kind='stable'):
+            if used + costs[idx] <= capacity:
+                selected.append(int(idx))
+                used += int(costs[idx])
+        return selected
+
+    def select_knapsack(self, costs:np.ndarray, scores:np.ndarray, capacity:int) -> List[int]:
+        # 0/1 knapsack over the token budget, each row update is vectorized over capacities
+        best = np.zeros(capacity + 1, dtype=np.float64)
+        keep = np.zeros((len(costs), capacity + 1), dtype=bool)
+        for idx, (cost, score) in enumerate(zip(costs.tolist(), scores.tolist())):
+            if cost > capacity:
+                continue
+            candidate     = best[:capacity + 1 - cost] + score
+            improve       = candidate > best[cost:]
+            keep[idx, cost:] = improve
+            best[cost:]   = np.where(improve, candidate, best[cost:])
+        selected, remaining = [], capacity
+        for idx in range(len(costs) - 1, -1, -1):
+            if keep[idx, remaining]:
+                selected.append(idx)
+                remaining -= int(costs[idx])
+        # present the chosen chunks by descending score
+        return sorted(selected, key=lambda idx: -scores[idx])
+
+    def pack(self, question:str, chunks:Sequence[Any], scores:Optional[Sequence[float]]=None, system:Optional[str]=None,
+             budget:Optional[int]=None, strategy:str='greedy', partial:bool=True) -> PackedPrompt:
+        """selects chunks maximizing score under the prompt budget and builds the chat messages
+
+        Args:
+            question (str): user question
+            chunks (Sequence[Any]): context chunk texts (or Documents with page_content)
+            scores (Optional[Sequence[float]], optional): relevance per chunk, defaults to the given rank order
+            system (Optional[str], optional): system instruction. Defaults to None.
+            budget (Optional[int], optional): prompt token budget, defaults to max_context - max_completion
+            strategy (str, optional): 'greedy' or 'knapsack'. Defaults to 'greedy'.
+            partial (bool, optional): fill the remaining budget with the truncated best unselected chunk. Defaults to True.
+
+        Returns:
+            PackedPrompt: messages, selected chunk indices and prompt token count
+
+        Raises:
+            ValueError: the prompt without context exceeds the budget
+        """
+        if strategy not in ('greedy', 'knapsack'):
+            raise ValueError(f"Unsupported strategy: {strategy}, expected one of ['greedy', 'knapsack']")
+        texts    = [getattr(chunk, 'page_content', chunk) for chunk in chunks]
+        scores   = np.asarray(scores if scores is not None else np.arange(len(texts), 0, -1), dtype=np.float64)
+        budget   = budget if budget is not None else self.max_context - self.max_completion
+        base     = self.count_messages(self.build_messages(question, "", system))
+        if base > budget:
+            raise ValueError(f"Prompt without context ({base} tokens) exceeds the budget of {budget} tokens")
+        # a chunk costs its own tokens plus one separator, encoded once for all candidates
+        costs    = np.fromiter(
+            (len(ids) + self.separator_len for ids in self.encoding.encode_ordinary_batch(texts)), dtype=np.int64, count=len(texts)
+        )
+        capacity = max(budget - base + self.separator_len, 0)
+        selected = self.select_greedy(costs, scores, capacity) if strategy == 'greedy' else self.select_knapsack(costs, scores, capacity)
+        context  = [texts[idx] for idx in selected]
+        messages = self.build_messages(question, self.separator.join(context), system)
+        num_tokens = self.count_messages(messages)
+        # merges at chunk boundaries can shift counts slightly, drop the weakest chunk until within budget
+        while num_tokens > budget and selected:
+            selected.remove(min(selected, key=lambda idx: scores[idx]))
+            context    = [texts[idx] for idx in selected]
+            messages   = self.build_messages(question, self.separator.join(context), system)
+            num_tokens = self.count_messages(messages)
+        truncated  = None
+        remaining  = budget - num_tokens - (self.separator_len if selected else 0)
+        chosen     = set(selected)
+        unselected = [int(idx) for idx in np.argsort(-scores, kind='stable') if idx not in chosen]
+        if partial and remaining > 0 and unselected:
+            idx, max_tokens = unselected[0], remaining
+            while max_tokens > 0:
+                candidate     = self.build_messages(question, self.separator.join(context + [self.truncate(texts[idx], max_tokens)]), system)
+                candidate_len = self.count_messages(candidate)
+                if candidate_len <= budget:
+                    messages, num_tokens, truncated = candidate, candidate_len, idx
+                    selected = selected + [idx]
+                    break
+                max_tokens -= candidate_len - budget
+        return PackedPrompt(messages=messages, indices=selected, num_tokens=num_tokens, budget=budget, truncated=truncated)
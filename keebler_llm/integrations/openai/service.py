@@ -9,9 +9,12 @@ from tenacity import (
     wait_random_exponential,        # for exponential backoff
 )  
 
-from    ...core.services.rest import service_request
+from    .cache import cached_completion
+from    .streaming import StreamConsumer
+from    ...core.services.rest import service_request, service_stream, ServiceClient
 
 
+@cached_completion()
 @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(3))
 def generate_chat_completion_rest(model_name:str, messages:dict, config:dict, endpoint:str, credentials:dict):
     """envoke completion API via RESTful request
@@ -24,6 +27,9 @@ def generate_chat_completion_rest(model_name:str, messages:dict, config:dict, en
     # model="gpt-3.5-turbo", "gpt-4", "gpt-4-1106-preview"
     >>> response_data = service_request(model_name="gpt-3.5-turbo", endpoint=endpoint, body=payload, headers=headers)    
     >>> response_data["choices"][0]["message"]["content"]
+
+    # repeated temperature=0 requests are served from the completion cache when one is set
+    >>> generate_chat_completion_rest(model_name, messages, config, endpoint, credentials, cache=CompletionCache())
     """
     headers={
         "Accept":           "application/json, text/plain",
@@ -39,3 +45,26 @@ def generate_chat_completion_rest(model_name:str, messages:dict, config:dict, en
         headers=headers, 
         session_en=False,
     )
+
+
+def stream_chat_completion_rest(model_name:str, messages:dict, config:dict, endpoint:str, credentials:dict,
+                                client:ServiceClient=None) -> StreamConsumer:
+    """envoke completion API via RESTful server-sent events, consumed incrementally
+
+    Examples:
+    >>> consumer = stream_chat_completion_rest("gpt-3.5-turbo", messages, config, endpoint, credentials)
+    >>> message  = consumer.consume()
+    >>> consumer.metrics.to_dict()
+    """
+    headers={
+        "Authorization":    f"Bearer {credentials['api_key']}",
+    }
+    body = {**config, "model": model_name, "messages": messages, "stream": True}
+    endpoint_default = "https://api.openai.com/v1/chat/completions"
+    events = service_stream(
+        endpoint=endpoint_default if not endpoint else endpoint,
+        body=body,
+        headers=headers,
+        client=client,
+    )
+    return StreamConsumer(events)
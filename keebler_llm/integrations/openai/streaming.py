@@ -0,0 +1,108 @@
+import  numpy as np
+import  time
+import  logging
+from    dataclasses import dataclass, field
+from    typing import List, Dict, Iterable, Optional, Generator, Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamMetrics:
+    """Latency of a streamed completion, each content delta is counted as one token"""
+    start:float                 = 0.0
+    end:Optional[float]         = None
+    token_times:List[float]     = field(default_factory=list)
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.token_times)
+
+    @property
+    def ttft_sec(self) -> Optional[float]:
+        return self.token_times[0] - self.start if self.token_times else None
+
+    @property
+    def total_sec(self) -> Optional[float]:
+        return self.end - self.start if self.end is not None else None
+
+    @property
+    def inter_token_sec(self) -> np.ndarray:
+        return np.diff(np.asarray(self.token_times))
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        # decode throughput after the first token
+        duration = self.token_times[-1] - self.token_times[0] if self.num_tokens > 1 else 0.0
+        return (self.num_tokens - 1) / duration if duration > 0 else None
+
+    def to_dict(self) -> dict:
+        inter_token = self.inter_token_sec
+        return dict(
+            num_tokens          = self.num_tokens,
+            ttft_sec            = self.ttft_sec,
+            inter_token_mean    = float(inter_token.mean()) if len(inter_token) else None,
+            inter_token_p95     = float(np.percentile(inter_token, 95)) if len(inter_token) else None,
+            tokens_per_sec      = self.tokens_per_sec,
+            total_sec           = self.total_sec
+        )
+
+
+class StreamConsumer(object):
+    """Consumes streamed chat completion chunks (SDK objects or decoded SSE events)
+
+    Iterating yields content deltas as they arrive while recording time-to-first-token and
+    inter-token latency; the message is assembled from collected parts with a single join.
+
+    Examples:
+    >>> consumer = stream_chat_completion(model_name, messages, config)
+    >>> for delta in consumer:
+    ...     print(delta, end="", flush=True)
+    >>> consumer.message, consumer.metrics.to_dict()
+    """
+    def __init__(self, chunks:Iterable[Any], start:Optional[float]=None):
+        self.chunks        = chunks
+        self.metrics       = StreamMetrics(start=start or 0.0)
+        self.parts:List[str] = []
+        self.role          = None
+        self.finish_reason = None
+        self.has_start     = start is not None
+        self._message      = ""
+        self._message_parts = 0
+
+    @staticmethod
+    def extract_delta(chunk:Dict[str, Any]) -> Dict[str, Any]:
+        choices = chunk.get('choices') or [dict()]
+        return choices[0]
+
+    def __iter__(self) -> Generator[str, None, None]:
+        if not self.has_start:
+            # lazily issued requests (e.g., REST) start on first iteration
+            self.metrics.start = time.perf_counter()
+        for chunk in self.chunks:
+            choice  = self.extract_delta(chunk)
+            delta   = choice.get('delta') or dict()
+            self.role          = delta.get('role') or self.role
+            self.finish_reason = choice.get('finish_reason') or self.finish_reason
+            content = delta.get('content')
+            if content:
+                self.metrics.token_times.append(time.perf_counter())
+                self.parts.append(content)
+                yield content
+        self.metrics.end = time.perf_counter()
+
+    def consume(self) -> str:
+        for _ in self:
+            pass
+        return self.message
+
+    @property
+    def message(self) -> str:
+        # join once per growth of parts, avoiding quadratic string concatenation
+        if self._message_parts != len(self.parts):
+            self._message       = "".join(self.parts)
+            self._message_parts = len(self.parts)
+        return self._message
+
+    def to_dict(self) -> dict:
+        return dict(role=self.role or 'assistant', content=self.message, finish_reason=self.finish_reason)
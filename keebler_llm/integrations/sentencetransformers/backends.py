@@ -0,0 +1,153 @@
+import  numpy as np
+import  torch
+import  os
+import  hashlib
+import  logging
+from    pathlib import Path
+from    typing import List, Optional, Union
+
+from    ...core.utils import read_cache_dir
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+
+def quantize_dynamic(model:torch.nn.Module) -> torch.nn.Module:
+    """dynamic int8 quantization of the Linear layers for CPU inference, activations stay float"""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def cosine_drift(reference:Union[np.ndarray, torch.Tensor], candidate:Union[np.ndarray, torch.Tensor]) -> dict:
+    """drift (1 - cosine similarity) per row between reference (fp32) and candidate embeddings
+
+    Args:
+        reference (Union[np.ndarray, torch.Tensor]): fp32 embeddings of shape (n_texts, dim)
+        candidate (Union[np.ndarray, torch.Tensor]): backend embeddings of shape (n_texts, dim)
+
+    Returns:
+        dict: mean, p99 and max drift
+    """
+    reference, candidate = (np.asarray(emb.cpu() if isinstance(emb, torch.Tensor) else emb, dtype=np.float64) for emb in (reference, candidate))
+    similarity = (reference * candidate).sum(1) / (np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1) + 1e-12)
+    drift      = 1.0 - similarity
+    return dict(mean=float(drift.mean()), p99=float(np.percentile(drift, 99)), max=float(drift.max()))
+
+
+def hash_state_dict(model:torch.nn.Module) -> str:
+    """content hash of the parameters and buffers, reads every weight"""
+    digest = hashlib.sha1()
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_weights(model:torch.nn.Module) -> str:
+    """revision of the loaded weights without reading them: the hub commit hash, otherwise the size and mtime of
+    the weights files of a local model directory; models with neither (e.g. built in memory) fall back to a content hash
+    """
+    config   = getattr(model, 'config', None)
+    revision = getattr(config, '_commit_hash', None)
+    if revision:
+        return revision
+    path     = Path(getattr(config, '_name_or_path', None) or '')
+    files    = sorted(file for pattern in ('*.safetensors', '*.bin') for file in path.glob(pattern)) if path.is_dir() else []
+    if files:
+        return "|".join(f"{file.name}:{file.stat().st_size}:{file.stat().st_mtime_ns}" for file in files)
+    return hash_state_dict(model)
+
+
+class TransformerOutput(torch.nn.Module):
+    # exports only the token embeddings, pooling runs outside the graph
+    def __init__(self, model:torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids:torch.Tensor, attention_mask:torch.Tensor, token_type_ids:Optional[torch.Tensor]=None) -> torch.Tensor:
+        inputs = dict(input_ids=input_ids, attention_mask=attention_mask)
+        if token_type_ids is not None:
+            inputs['token_type_ids'] = token_type_ids
+        return self.model(**inputs).last_hidden_state
+
+
+class OnnxEncoder(object):
+    """ONNX Runtime CPU backend of a SentenceTransformer bi-encoder
+
+    The transformer is exported once to `{cache_dir}/onnx/{hash(model_name:max_seq_len:opset:revision)}/model.onnx`
+    with dynamic batch and sequence axes; later instances of the same weights revision load the cached artifact. Pooling (cls,
+    mean or max) and normalization follow the SentenceTransformer modules and run in NumPy.
+
+    Examples:
+    >>> onnx_enc = OnnxEncoder(SentenceTransformer('multi-qa-MiniLM-L6-cos-v1'), 'multi-qa-MiniLM-L6-cos-v1', max_seq_len=256)
+    >>> emb      = onnx_enc.encode(texts, batch_size=64)
+    """
+    def __init__(self, encoder:"SentenceTransformer", model_name:str, max_seq_len:int=256, cache_dir:Optional[str]=None,
+                 num_threads:Optional[int]=None, opset:int=14):
+        if ort is None:
+            raise ImportError("OnnxEncoder requires onnxruntime: pip install onnxruntime")
+        model            = encoder._first_module().auto_model
+        key              = f"{model_name}:{max_seq_len}:{opset}:{fingerprint_weights(model)}"
+        namespace        = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        self.path        = Path(cache_dir or read_cache_dir(app='keebler_llm')).joinpath('onnx', namespace, 'model.onnx')
+        self.tokenizer   = encoder.tokenizer
+        self.max_seq_len = max_seq_len
+        self.dim         = encoder.get_sentence_embedding_dimension()
+        modules          = list(encoder._modules.values())
+        pooling          = next((module for module in modules if hasattr(module, 'pooling_mode_mean_tokens')), None)
+        self.pooling     = 'mean' if pooling is None else (
+            'cls' if pooling.pooling_mode_cls_token else 'max' if pooling.pooling_mode_max_tokens else 'mean'
+        )
+        self.normalize   = any(type(module).__name__ == 'Normalize' for module in modules)
+        if not self.path.exists():
+            self.export(model, opset)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads     = num_threads or 0
+        self.session     = ort.InferenceSession(str(self.path), options, providers=['CPUExecutionProvider'])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def export(self, model:torch.nn.Module, opset:int) -> Path:
+        inputs      = self.tokenizer(["export sample"], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in inputs]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path    = self.path.with_suffix('.tmp')
+        with torch.no_grad():
+            torch.onnx.export(
+                TransformerOutput(model.cpu().eval()), tuple(inputs[name] for name in input_names), str(tmp_path),
+                input_names=input_names, output_names=['last_hidden_state'], opset_version=opset,
+                dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']}
+            )
+        # atomic replace, concurrent processes never load a partially written model
+        os.replace(tmp_path, self.path)
+        logger.info(f"Exported ONNX model to {self.path}")
+        return self.path
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def pool(self, hidden:np.ndarray, attention_mask:np.ndarray) -> np.ndarray:
+        if self.pooling == 'cls':
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        if self.pooling == 'max':
+            return np.where(mask > 0, hidden, -np.inf).max(1)
+        return (hidden * mask).sum(1) / np.clip(mask.sum(1), 1e-9, None)
+
+    def encode(self, texts:Union[str, List[str]], batch_size:int=32, **kwargs) -> np.ndarray:
+        """float32 embeddings of shape (n_texts, dim), SentenceTransformer.encode compatible for numpy output"""
+        single     = isinstance(texts, str)
+        texts      = [texts] if single else texts
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True, max_length=self.max_seq_len, return_tensors='np'
+            )
+            hidden = self.session.run(None, {name: inputs[name].astype(np.int64) for name in self.input_names})[0]
+            embeddings[start:start + batch_size] = self.pool(hidden, inputs['attention_mask'])
+        if self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
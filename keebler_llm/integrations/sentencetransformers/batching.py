@@ -0,0 +1,77 @@
+import  numpy as np
+from    dataclasses import dataclass
+from    typing import List
+
+
+@dataclass
+class BatchStats:
+    """Token accounting of an encoding run, padded tokens count every position up to the batch max length"""
+    num_texts:int           = 0
+    num_batches:int         = 0
+    num_tokens:int          = 0
+    num_padded_tokens:int   = 0
+    num_padded_fixed:int    = 0     # padded tokens of fixed-size batches in arrival order, for comparison
+    elapsed_sec:float       = 0.0
+
+    @property
+    def padding_waste(self) -> float:
+        return round(1 - self.num_tokens / self.num_padded_tokens, 4) if self.num_padded_tokens else 0.0
+
+    @property
+    def padding_waste_fixed(self) -> float:
+        return round(1 - self.num_tokens / self.num_padded_fixed, 4) if self.num_padded_fixed else 0.0
+
+    @property
+    def tokens_per_sec(self) -> float:
+        return round(self.num_tokens / self.elapsed_sec, 3) if self.elapsed_sec else 0.0
+
+    def to_dict(self) -> dict:
+        return dict(
+            num_texts           = self.num_texts,
+            num_batches         = self.num_batches,
+            num_tokens          = self.num_tokens,
+            num_padded_tokens   = self.num_padded_tokens,
+            padding_waste       = self.padding_waste,
+            padding_waste_fixed = self.padding_waste_fixed,
+            tokens_per_sec      = self.tokens_per_sec,
+            elapsed_sec         = round(self.elapsed_sec, 4)
+        )
+
+
+def build_token_batches(lengths:np.ndarray, max_tokens:int=16384, max_batch_size:int=256) -> List[np.ndarray]:
+    """groups inputs of similar token length into batches bounded by a padded token budget
+
+    Inputs are sorted by descending length, so the first item of each batch sets its padded length
+    and the batch grows until batch_size * max_len would exceed max_tokens
+
+    Args:
+        lengths (np.ndarray): token length per input of shape (n_texts,)
+        max_tokens (int, optional): padded token budget per batch. Defaults to 16384.
+        max_batch_size (int, optional): upper bound of inputs per batch. Defaults to 256.
+
+    Returns:
+        List[np.ndarray]: batches of original input positions
+
+    Examples:
+    >>> batches = build_token_batches(np.array([12, 250, 8, 240]), max_tokens=512)
+    [array([1, 3]), array([0, 2])]
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    order   = np.argsort(-lengths, kind='stable')
+    batches = []
+    start   = 0
+    while start < len(order):
+        max_len    = max(int(lengths[order[start]]), 1)
+        batch_size = max(1, min(max_batch_size, max_tokens // max_len))
+        batches.append(order[start:start + batch_size])
+        start     += batch_size
+    return batches
+
+
+def calc_padded_tokens(lengths:np.ndarray, batches:List[np.ndarray]) -> int:
+    lengths = np.asarray(lengths, dtype=np.int64)
+    return int(sum(len(batch) * lengths[batch].max() for batch in batches if len(batch)))
+
+
+def build_fixed_batches(num_texts:int, batch_size:int=32) -> List[np.ndarray]:
+    return [np.arange(start, min(start + batch_size, num_texts)) for start in range(0, num_texts, batch_size)]
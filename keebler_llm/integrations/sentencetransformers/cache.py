@@ -0,0 +1,159 @@
+import  numpy as np
+import  hashlib
+import  logging
+from    collections import OrderedDict
+from    pathlib import Path
+from    typing import List, Tuple, Optional
+
+from    ...core.utils import read_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text:str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EmbeddingCache(object):
+    """Content-addressed on-disk embedding cache
+
+    Embeddings are stored as rows of a memory-mapped matrix, addressed by an offsets index of
+    text hash -> row. The cache namespace is keyed by (model_name, max_seq_len, backend), so changing
+    any of them never serves stale embeddings (int8/onnx embeddings drift slightly from fp32). Least recently used rows are evicted once max_entries is reached.
+
+    Examples:
+    >>> cache     = EmbeddingCache('multi-qa-MiniLM-L6-cos-v1', max_seq_len=256, dim=384)
+    >>> emb, miss = cache.get(texts)
+    >>> cache.put([texts[i] for i in np.flatnonzero(miss)], model_emb)
+    >>> cache.flush()
+    >>> cache.stats()
+    """
+    def __init__(self, model_name:str, max_seq_len:int, dim:int, dtype:str='float16',
+                 max_entries:Optional[int]=None, cache_dir:Optional[str]=None, backend:str='torch'):
+        if dtype not in ('float16', 'float32'):
+            raise ValueError(f"Unsupported dtype: {dtype}, expected one of ['float16', 'float32']")
+        namespace        = hashlib.sha1(f"{model_name}:{max_seq_len}:{backend}".encode('utf-8')).hexdigest()[:16]
+        self.cache_dir   = Path(cache_dir or read_cache_dir(app='keebler_llm')).joinpath('embeddings', namespace)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.dim         = dim
+        self.dtype       = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.matrix_path = self.cache_dir.joinpath(f'embeddings.{dtype}.mmap')
+        self.index_path  = self.cache_dir.joinpath(f'offsets.{dtype}.npz')
+        # text hash -> row, ordered from least to most recently used
+        self.offsets:OrderedDict = OrderedDict()
+        self.free_rows:List[int] = []
+        self.capacity    = 0
+        self.matrix      = None
+        self.hits = self.misses = self.evictions = 0
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def load(self) -> None:
+        if self.index_path.exists() and self.matrix_path.exists():
+            with np.load(self.index_path, allow_pickle=False) as archive:
+                keys, rows    = archive['keys'], archive['rows']
+                self.capacity = int(archive['capacity'])
+                self.free_rows = archive['free_rows'].tolist()
+            self.offsets = OrderedDict(zip(keys.astype(str).tolist(), rows.tolist()))
+            self.matrix  = np.memmap(self.matrix_path, dtype=self.dtype, mode='r+', shape=(max(self.capacity, 1), self.dim))
+            logger.info(f"Loaded embedding cache: {len(self)} entries from {self.cache_dir}")
+
+    def grow(self, min_capacity:int) -> None:
+        # extend the backing file in place, then remap at the larger shape
+        capacity = max(min_capacity, 2 * self.capacity, 1024)
+        if self.matrix is not None:
+            self.matrix.flush()
+        with open(self.matrix_path, 'ab') as f:
+            f.truncate(capacity * self.dim * self.dtype.itemsize)
+        self.matrix   = np.memmap(self.matrix_path, dtype=self.dtype, mode='r+', shape=(capacity, self.dim))
+        self.free_rows.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def lookup(self, texts:List[str]) -> Tuple[List[str], np.ndarray]:
+        """resolves texts to cache rows, -1 for misses, refreshing recency of hits
+
+        Args:
+            texts (List[str]): input texts
+
+        Returns:
+            Tuple[List[str], np.ndarray]: text hashes and rows of shape (n_texts,)
+        """
+        keys = [hash_text(text) for text in texts]
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        for pos, key in enumerate(keys):
+            row = self.offsets.get(key)
+            if row is not None:
+                rows[pos] = row
+                self.offsets.move_to_end(key)
+        num_hits     = int((rows >= 0).sum())
+        self.hits   += num_hits
+        self.misses += len(keys) - num_hits
+        return keys, rows
+
+    def get(self, texts:List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """reads cached embeddings for texts
+
+        Args:
+            texts (List[str]): input texts
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: float32 embeddings of shape (n_texts, dim) with zero rows
+                for misses, and a boolean miss mask of shape (n_texts,)
+        """
+        _, rows    = self.lookup(texts)
+        miss       = rows < 0
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if (~miss).any():
+            embeddings[~miss] = self.matrix[rows[~miss]]
+        return embeddings, miss
+
+    def put(self, texts:List[str], embeddings:np.ndarray) -> None:
+        """writes embeddings for texts, evicting least recently used rows beyond max_entries
+
+        Args:
+            texts (List[str]): input texts
+            embeddings (np.ndarray): embeddings of shape (n_texts, dim)
+        """
+        keys = [hash_text(text) for text in texts]
+        rows = np.empty(len(keys), dtype=np.int64)
+        for pos, key in enumerate(keys):
+            row = self.offsets.get(key)
+            if row is None:
+                if self.max_entries and len(self.offsets) >= self.max_entries:
+                    _, evicted = self.offsets.popitem(last=False)
+                    self.free_rows.append(evicted)
+                    self.evictions += 1
+                if not self.free_rows:
+                    self.grow(self.capacity + len(keys) - pos)
+                row = self.free_rows.pop()
+            self.offsets[key] = row
+            self.offsets.move_to_end(key)
+            rows[pos] = row
+        self.matrix[rows] = np.asarray(embeddings, dtype=self.dtype)
+
+    def flush(self) -> None:
+        if self.matrix is None:
+            return
+        self.matrix.flush()
+        np.savez(
+            self.index_path,
+            keys      = np.array(list(self.offsets.keys()), dtype='S32'),
+            rows      = np.fromiter(self.offsets.values(), dtype=np.int64, count=len(self.offsets)),
+            free_rows = np.array(self.free_rows, dtype=np.int64),
+            capacity  = np.array(self.capacity)
+        )
+
+    def stats(self) -> dict:
+        num_requests = self.hits + self.misses
+        return dict(
+            entries   = len(self),
+            capacity  = self.capacity,
+            hits      = self.hits,
+            misses    = self.misses,
+            evictions = self.evictions,
+            hit_rate  = round(self.hits / num_requests, 3) if num_requests else 0.0,
+            size_mb   = round(self.capacity * self.dim * self.dtype.itemsize / 1024 / 1024, 3)
+        )
@@ -1,37 +1,246 @@
 import  numpy  as np 
 import  pandas as pd 
 import  torch 
-from    typing import List
+import  time
+import  logging
+from    typing import List, Optional, Union
 from    sentence_transformers import SentenceTransformer, CrossEncoder, util
 
+from    .cache import EmbeddingCache
+from    .pool import EncoderPool
+from    .backends import OnnxEncoder, quantize_dynamic, cosine_drift
+from    .batching import BatchStats, build_token_batches, build_fixed_batches, calc_padded_tokens
+from    ...core.search.index import VectorIndex, create_index, load_index
+from    ...core.search.topk import Neighbors, to_hits, topk_similarity
+from    ..huggingface.registry import get_registry
+
+logger = logging.getLogger(__name__)
+
 class DenseEncoder(object):
     # 'paraphrase-MiniLM-L6-v2'
     # https://huggingface.co/sentence-transformers/paraphrase-MiniLM-L6-v2
-    def __init__(self, model_name:str='multi-qa-MiniLM-L6-cos-v1', max_seq_len:int=256, device:str='cpu'):
-        self.device_gpu:bool = torch.cuda.is_available()
+    # cache: persist embeddings on disk keyed by (model_name, max_seq_len, backend, text hash)
+    # batching: 'fixed' (model default) or 'bucketed' (length sorted, token budget batches)
+    # shared: reuse the model instance of the process-wide ModelRegistry rather than loading a copy
+    # backend: 'torch' (fp32), 'int8' (dynamic quantization) or 'onnx' (onnxruntime), int8/onnx are CPU only
+    def __init__(self, model_name:str='multi-qa-MiniLM-L6-cos-v1', max_seq_len:int=256, device:str='cpu',
+                 cache:bool=False, cache_dtype:str='float16', cache_max_entries:Optional[int]=None, cache_dir:Optional[str]=None,
+                 batching:str='fixed', max_tokens:int=16384, max_batch_size:int=256, shared:bool=False,
+                 backend:str='torch', num_threads:Optional[int]=None):
+        if batching not in ('fixed', 'bucketed'):
+            raise ValueError(f"Unsupported batching: {batching}, expected one of ['fixed', 'bucketed']")
+        if backend not in ('torch', 'int8', 'onnx'):
+            raise ValueError(f"Unsupported backend: {backend}, expected one of ['torch', 'int8', 'onnx']")
+        if backend != 'torch' and device != 'cpu':
+            raise ValueError(f"backend '{backend}' runs on cpu, got device: {device}")
+        self.device_gpu:bool = torch.cuda.is_available() and backend == 'torch'
+        self.model_name:str  = model_name
         self.max_seq_len:int = max_seq_len                                 # truncation
-        self.encoder         = SentenceTransformer(model_name).to(device)  # bi-encoder (dim: 384)
-        self.encoder.max_seq_length = self.max_seq_len
+        self.backend:str     = backend
+        self.cache_dir       = cache_dir
+        dtype                = 'qint8' if backend == 'int8' else None
+        if shared:
+            self.encoder     = get_registry().get('sentence_transformer', model_name, dtype=dtype, device=device, max_seq_len=max_seq_len)
+        else:
+            self.encoder     = SentenceTransformer(model_name).to(device)  # bi-encoder (dim: 384)
+            self.encoder.max_seq_length = self.max_seq_len
+            self.encoder     = quantize_dynamic(self.encoder) if backend == 'int8' else self.encoder
+        # model used for inference, the torch encoder is kept for its tokenizer and configuration
+        self.runtime         = OnnxEncoder(
+            self.encoder, model_name, max_seq_len, cache_dir=cache_dir, num_threads=num_threads
+        ) if backend == 'onnx' else self.encoder
+        self.index:Optional[VectorIndex] = None
+        self.cache:Optional[EmbeddingCache] = EmbeddingCache(
+            model_name, max_seq_len, dim=self.encoder.get_sentence_embedding_dimension(),
+            dtype=cache_dtype, max_entries=cache_max_entries, cache_dir=cache_dir, backend=backend
+        ) if cache else None
+        self.batching:str       = batching
+        self.max_tokens:int     = max_tokens
+        self.max_batch_size:int = max_batch_size
+        self.batch_stats        = BatchStats()
+        self.pool:Optional[EncoderPool] = None
+        self._reference:Optional[SentenceTransformer] = None
+
+    @property
+    def is_default_path(self) -> bool:
+        # no cache, custom batching, worker pool or onnx backend, defer directly to SentenceTransformer.encode
+        return self.cache is None and self.batching == 'fixed' and self.pool is None and self.backend != 'onnx'
+
+    def start_pool(self, num_workers:Optional[int]=None, num_threads:int=1, shard_size:int=1024, batch_size:int=32) -> EncoderPool:
+        """shards subsequent encoding across CPU worker processes, each with its own model copy of the same backend
+
+        Examples:
+        >>> enc.start_pool(num_workers=16, num_threads=1)
+        >>> corpus_emb = enc.fit(texts)
+        >>> enc.stop_pool()
+        """
+        self.stop_pool()
+        self.pool = EncoderPool(
+            self.model_name, dim=self.encoder.get_sentence_embedding_dimension(), max_seq_len=self.max_seq_len,
+            num_workers=num_workers, num_threads=num_threads, shard_size=shard_size, batch_size=batch_size,
+            backend=self.backend, cache_dir=self.cache_dir
+        )
+        return self.pool
+
+    def stop_pool(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    @property
+    def reference(self) -> SentenceTransformer:
+        # fp32 model the backend is validated against, the onnx backend keeps it for its tokenizer already
+        if self.backend != 'int8':
+            return self.encoder
+        if self._reference is None:
+            self._reference = SentenceTransformer(self.model_name, device='cpu')
+            self._reference.max_seq_length = self.max_seq_len
+        return self._reference
+
+    def validate_backend(self, texts:List[str], max_drift:float=1e-2, strict:bool=True) -> dict:
+        """accuracy guard of the int8/onnx backend against fp32 embeddings via cosine drift (1 - cosine)
+
+        Examples:
+        >>> enc = DenseEncoder(backend='int8')
+        >>> enc.validate_backend(sample_texts, max_drift=1e-2)   # raises ValueError beyond the tolerance
+        """
+        drift     = cosine_drift(
+            self.reference.encode(texts, convert_to_numpy=True, show_progress_bar=False),
+            self.runtime.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        )
+        if drift['max'] > max_drift:
+            message = f"backend '{self.backend}' drifts from fp32 beyond {max_drift}: {drift}"
+            if strict:
+                raise ValueError(message)
+            logger.warning(message)
+        return drift
 
     def fit(self, texts:List[str], show_progress:bool=True) -> torch.Tensor:
         self.data:List[str] = texts
-        return self.encoder.encode(texts, convert_to_tensor=True, show_progress_bar=show_progress)
+        if self.is_default_path:
+            return self.encoder.encode(texts, convert_to_tensor=True, show_progress_bar=show_progress)
+        embeddings = self.encode_array(texts, show_progress=show_progress)
+        if self.cache is not None:
+            self.cache.flush()
+        return torch.from_numpy(embeddings)
 
-    def get_lengths(self, texts:List[str]):
-        return [self.encode(text)['input_ids'].shape[1] for text in texts]
+    def get_lengths(self, texts:List[str]) -> np.ndarray:
+        # single batched (rust backed for fast tokenizers) call, truncated as the model would
+        encoded = self.encoder.tokenizer(
+            list(texts), truncation=True, max_length=self.max_seq_len, return_length=True,
+            return_attention_mask=False, return_token_type_ids=False
+        )
+        return np.asarray(encoded['length'], dtype=np.int64)
 
     def normalize_l2(self, embeddings:np.ndarray) -> np.ndarray:
         # L2 Normalize the rows
         return embeddings / np.sqrt((embeddings**2).sum(1, keepdims=True))
 
-    def encode(self, text:str, convert_to_tensor:bool=True, show_progress:bool=True) -> torch.Tensor:
-        emb = self.encoder.encode(text, convert_to_tensor=convert_to_tensor, show_progress_bar=show_progress)
-        return emb if not self.device_gpu else emb.cuda()
+    def encode(self, text:Union[str, List[str]], convert_to_tensor:bool=True, show_progress:bool=True) -> torch.Tensor:
+        if self.is_default_path:
+            emb = self.encoder.encode(text, convert_to_tensor=convert_to_tensor, show_progress_bar=show_progress)
+        else:
+            emb = self.encode_array([text] if isinstance(text, str) else text, show_progress=show_progress)
+            emb = emb[0] if isinstance(text, str) else emb
+            emb = torch.from_numpy(emb) if convert_to_tensor else emb
+        return emb if not (self.device_gpu and convert_to_tensor) else emb.cuda()
+
+    def encode_array(self, texts:List[str], show_progress:bool=True) -> np.ndarray:
+        return self.encode_cached(texts, show_progress=show_progress) if self.cache is not None else self.encode_model(texts, show_progress=show_progress)
 
-    def score(self, query_emb:torch.Tensor, corpus_emb:torch.Tensor, top_k:int=100) -> List[List[dict]]:
+    def encode_model(self, texts:List[str], show_progress:bool=True) -> np.ndarray:
+        # single entry point to the model, returns float32 embeddings of shape (n_texts, dim)
+        if self.pool is not None:
+            return self.pool.encode(texts)
+        if self.batching == 'bucketed':
+            return self.encode_bucketed(texts)
+        return self.runtime.encode(texts, convert_to_numpy=True, show_progress_bar=show_progress).astype(np.float32)
+
+    def encode_bucketed(self, texts:List[str]) -> np.ndarray:
+        """encodes length-sorted batches bounded by a token budget, restoring the input order on output
+
+        Examples:
+        >>> enc = DenseEncoder(batching='bucketed', max_tokens=16384)
+        >>> emb = enc.encode_bucketed(texts)
+        >>> enc.batch_stats.to_dict()     # tokens_per_sec, padding_waste, padding_waste_fixed
+        """
+        start      = time.perf_counter()
+        lengths    = self.get_lengths(texts)
+        batches    = build_token_batches(lengths, max_tokens=self.max_tokens, max_batch_size=self.max_batch_size)
+        embeddings = np.empty((len(texts), self.encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+        for batch in batches:
+            # scatter each batch back to its original positions
+            embeddings[batch] = self.runtime.encode(
+                [texts[idx] for idx in batch], batch_size=len(batch), convert_to_numpy=True, show_progress_bar=False
+            )
+        self.batch_stats = BatchStats(
+            num_texts         = len(texts),
+            num_batches       = len(batches),
+            num_tokens        = int(lengths.sum()),
+            num_padded_tokens = calc_padded_tokens(lengths, batches),
+            num_padded_fixed  = calc_padded_tokens(lengths, build_fixed_batches(len(texts))),
+            elapsed_sec       = time.perf_counter() - start
+        )
+        return embeddings
+
+    def encode_cached(self, texts:List[str], show_progress:bool=True) -> np.ndarray:
+        """encodes texts through the embedding cache, only cache misses are sent to the model
+
+        Examples:
+        >>> enc = DenseEncoder(cache=True, cache_max_entries=5_000_000)
+        >>> emb = enc.encode_cached(texts)
+        >>> enc.cache.flush(); enc.cache.stats()
+        """
+        embeddings, miss = self.cache.get(texts)
+        if miss.any():
+            # deduplicate misses so repeated texts are encoded once
+            miss_idx     = np.flatnonzero(miss)
+            unique_texts = list(dict.fromkeys(texts[idx] for idx in miss_idx))
+            unique_emb   = self.encode_model(unique_texts, show_progress=show_progress)
+            position     = {text: pos for pos, text in enumerate(unique_texts)}
+            embeddings[miss_idx] = unique_emb[[position[texts[idx]] for idx in miss_idx]]
+            self.cache.put(unique_texts, unique_emb)
+        return embeddings
+
+    def build_index(self, corpus_emb:torch.Tensor, index_type:str='flat', **kwargs) -> VectorIndex:
+        """builds a vector index over the corpus embeddings, ids follow the corpus row order
+
+        Examples:
+        >>> corpus_emb = enc.fit(texts)
+        >>> enc.build_index(corpus_emb, index_type='ivf', n_lists=1024, n_probe=16)
+        >>> hits = enc.score(enc.encode(queries))
+        """
+        self.index = create_index(index_type, dim=corpus_emb.shape[1], **kwargs)
+        self.index.add(corpus_emb)
+        return self.index
+
+    def save_index(self, path:str) -> str:
+        return str(self.index.save(path))
+
+    def load_index(self, path:str) -> VectorIndex:
+        self.index = load_index(path)
+        return self.index
+
+    def score(self, query_emb:torch.Tensor, corpus_emb:Optional[torch.Tensor]=None, top_k:int=100, **kwargs) -> List[List[dict]]:
         # top_k: number of records to retrieve
-        hit_at_k =  util.semantic_search(query_emb, corpus_emb, top_k=top_k)
-        return hit_at_k
+        # brute-force scan when corpus embeddings are passed, otherwise search the built index
+        if corpus_emb is not None:
+            return util.semantic_search(query_emb, corpus_emb, top_k=top_k)
+        if self.index is None:
+            raise ValueError("Either corpus embeddings or a built index (build_index/load_index) are required")
+        scores, ids = self.index.search(query_emb, k=top_k, **kwargs)
+        return to_hits(scores, ids)
+
+    def calc_topk_similarity(self, query_emb:torch.Tensor, corpus_emb:Optional[torch.Tensor]=None, k:int=10,
+                             block_size:int=1024, num_workers:int=1, exclude_self:bool=False) -> Neighbors:
+        """blocked top-k cosine similarity, corpus_emb defaults to query_emb for all-pairs neighbors
+
+        Examples:
+        >>> neighbors = enc.calc_topk_similarity(corpus_emb, k=10, exclude_self=True, num_workers=4)
+        """
+        return topk_similarity(
+            query_emb, corpus_emb, k=k, block_size=block_size, num_workers=num_workers, exclude_self=exclude_self
+        )
 
     def lookup(self, df_src:pd.DataFrame, scores:List[dict]) -> pd.DataFrame:
         # for a particular individual query
@@ -0,0 +1,100 @@
+import  numpy as np
+import  torch
+import  multiprocessing
+import  logging
+from    pathlib import Path
+from    typing import List, Tuple, Optional, Generator, Union
+from    sentence_transformers import SentenceTransformer
+
+from    .backends import OnnxEncoder, quantize_dynamic
+
+logger = logging.getLogger(__name__)
+
+# model copy held by each worker process, created once by the pool initializer
+_worker_encoder:Optional[Union[SentenceTransformer, OnnxEncoder]] = None
+_worker_batch_size:int = 32
+
+
+def init_worker(model_name:str, max_seq_len:int, num_threads:int, batch_size:int, backend:str='torch',
+                cache_dir:Optional[str]=None) -> None:
+    global _worker_encoder, _worker_batch_size
+    # pin intra-op threads so workers do not oversubscribe the cores
+    torch.set_num_threads(num_threads)
+    encoder            = SentenceTransformer(model_name, device='cpu')
+    encoder.max_seq_length = max_seq_len
+    # same backend as the parent encoder, embeddings land in the cache namespace of that backend
+    if backend == 'int8':
+        encoder        = quantize_dynamic(encoder)
+    elif backend == 'onnx':
+        encoder        = OnnxEncoder(encoder, model_name, max_seq_len, cache_dir=cache_dir, num_threads=num_threads)
+    _worker_encoder    = encoder
+    _worker_batch_size = batch_size
+
+
+def encode_shard(shard:Tuple[int, List[str]]) -> Tuple[int, np.ndarray]:
+    start, texts = shard
+    embeddings   = _worker_encoder.encode(texts, batch_size=_worker_batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return start, embeddings.astype(np.float32)
+
+
+class EncoderPool(object):
+    """Pool of CPU worker processes each holding its own SentenceTransformer copy (fp32, int8 or ONNX backend)
+
+    Text lists are split into shards, encoded in parallel and streamed back in order into a
+    preallocated (optionally memory-mapped *.npy) output array.
+
+    Examples:
+    >>> with EncoderPool('multi-qa-MiniLM-L6-cos-v1', dim=384, num_workers=8, num_threads=1) as pool:
+    ...     emb = pool.encode(texts, memmap_path='corpus_emb.npy')
+    """
+    def __init__(self, model_name:str, dim:int, max_seq_len:int=256, num_workers:Optional[int]=None,
+                 num_threads:int=1, shard_size:int=1024, batch_size:int=32, backend:str='torch', cache_dir:Optional[str]=None):
+        self.dim         = dim
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.num_threads = num_threads
+        self.shard_size  = shard_size
+        # spawn avoids forking a parent holding torch thread pools
+        context          = multiprocessing.get_context('spawn')
+        self.pool        = context.Pool(
+            self.num_workers, initializer=init_worker,
+            initargs=(model_name, max_seq_len, num_threads, batch_size, backend, cache_dir)
+        )
+        logger.info(f"Started {self.__class__.__name__}: {self.num_workers} workers x {num_threads} threads ({backend})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def generate_shards(self, texts:List[str]) -> Generator[Tuple[int, List[str]], None, None]:
+        for start in range(0, len(texts), self.shard_size):
+            yield start, texts[start:start + self.shard_size]
+
+    def encode(self, texts:List[str], out:Optional[np.ndarray]=None, memmap_path:Optional[str]=None) -> np.ndarray:
+        """encodes texts across the worker pool, writing shards in order as they complete
+
+        Args:
+            texts (List[str]): input texts
+            out (Optional[np.ndarray], optional): preallocated output of shape (n_texts, dim). Defaults to None.
+            memmap_path (Optional[str], optional): write into a memory-mapped *.npy file instead. Defaults to None.
+
+        Returns:
+            np.ndarray: float32 embeddings of shape (n_texts, dim)
+        """
+        shape = (len(texts), self.dim)
+        if out is None and memmap_path:
+            Path(memmap_path).parent.mkdir(parents=True, exist_ok=True)
+            out = np.lib.format.open_memmap(memmap_path, mode='w+', dtype=np.float32, shape=shape)
+        out = np.empty(shape, dtype=np.float32) if out is None else out
+        if out.shape != shape:
+            raise ValueError(f"Output shape mismatch: expected {shape}, received {out.shape}")
+        for start, embeddings in self.pool.imap(encode_shard, self.generate_shards(texts)):
+            out[start:start + len(embeddings)] = embeddings
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
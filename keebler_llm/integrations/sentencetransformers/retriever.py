@@ -0,0 +1,135 @@
+import  numpy as np
+import  torch
+import  time
+import  logging
+from    typing import List, Optional, Callable, Any
+from    sentence_transformers import CrossEncoder
+
+from    .encoder import DenseEncoder
+from    ..sklearn.encoders import EvaluatorEncoder
+from    ...core.search.topk import Neighbors, topk_similarity, prepare_corpus
+from    ...core.search.fusion import reciprocal_rank_fusion, weighted_score_fusion
+
+logger = logging.getLogger(__name__)
+
+
+class HybridRetriever(object):
+    """Hybrid sparse (TF-IDF) + dense retrieval with score fusion and optional cross-encoder reranking
+
+    Both candidate generators run over the whole query batch and return (n_queries, k) arrays,
+    which are fused by reciprocal rank ('rrf') or normalized score weighting ('weighted').
+
+    Examples:
+    >>> tfidf      = TfidfVectorizer(stop_words='english')
+    >>> sparse_enc = EvaluatorEncoder(tfidf.fit_transform(texts), tfidf.get_feature_names_out(), indices=df.index)
+    >>> dense_enc  = DenseEncoder()
+    >>> corpus_emb = dense_enc.fit(texts)
+    >>> retriever  = HybridRetriever(sparse_enc, tfidf.transform, dense_enc, corpus_emb=corpus_emb,
+    ...                              reranker_name='cross-encoder/ms-marco-MiniLM-L-6-v2')
+    >>> neighbors  = retriever.retrieve(queries, k=10, candidates_k=100, rerank_k=20)
+    >>> retriever.timings
+    """
+    def __init__(self, sparse_encoder:EvaluatorEncoder, vectorizer:Callable[[List[str]], Any], dense_encoder:DenseEncoder,
+                 corpus_emb:Optional[torch.Tensor]=None, corpus:Optional[List[str]]=None, fusion:str='rrf',
+                 weights:Optional[List[float]]=None, rrf_k:int=60, reranker_name:Optional[str]=None, rerank_batch_size:int=64):
+        if fusion not in ('rrf', 'weighted'):
+            raise ValueError(f"Unsupported fusion: {fusion}, expected one of ['rrf', 'weighted']")
+        self.sparse_encoder    = sparse_encoder
+        self.vectorizer        = vectorizer                    # e.g., TfidfVectorizer.transform
+        self.dense_encoder     = dense_encoder
+        self.corpus_emb        = corpus_emb
+        self.corpus            = corpus if corpus is not None else getattr(dense_encoder, 'data', None)
+        self.fusion            = fusion
+        self.weights           = weights
+        self.rrf_k             = rrf_k
+        self.reranker          = CrossEncoder(reranker_name) if reranker_name else None
+        self.rerank_batch_size = rerank_batch_size
+        self.timings:dict      = {}
+        self._corpus_emb_t     = None
+
+    @property
+    def corpus_emb_t(self) -> np.ndarray:
+        # normalized, transposed dense corpus built once, rather than per retrieve call
+        if self._corpus_emb_t is None:
+            self._corpus_emb_t = prepare_corpus(self.corpus_emb)
+        return self._corpus_emb_t
+
+    def generate_sparse(self, queries:List[str], k:int) -> Neighbors:
+        # the sparse corpus is normalized and transposed once, cached on the encoder
+        return topk_similarity(self.vectorizer(queries), corpus_t=self.sparse_encoder.corpus_t, k=k)
+
+    def generate_dense(self, queries:List[str], k:int) -> Neighbors:
+        query_emb = self.dense_encoder.encode(list(queries), convert_to_tensor=False, show_progress=False)
+        if self.dense_encoder.index is not None:
+            scores, ids = self.dense_encoder.index.search(query_emb, k=k)
+            return Neighbors(indices=ids, scores=scores)
+        if self.corpus_emb is None:
+            raise ValueError("Dense retrieval requires corpus_emb or a built DenseEncoder index")
+        return topk_similarity(query_emb, corpus_t=self.corpus_emb_t, k=k)
+
+    def fuse(self, candidates:List[Neighbors], k:int) -> Neighbors:
+        if self.fusion == 'rrf':
+            return reciprocal_rank_fusion(candidates, k=k, rrf_k=self.rrf_k, weights=self.weights)
+        return weighted_score_fusion(candidates, k=k, weights=self.weights)
+
+    def rerank(self, queries:List[str], neighbors:Neighbors, rerank_k:int) -> Neighbors:
+        """reorders the top rerank_k fused results per query by cross-encoder relevance
+
+        All (query, passage) pairs of the batch are scored in a single CrossEncoder.predict call,
+        results beyond rerank_k keep their fused order. Cross-encoder logits and fused scores are on
+        different scales, so the reranked block is offset per query to rank at or above the fused tail.
+        """
+        if self.corpus is None:
+            raise ValueError("Reranking requires the corpus texts, pass corpus or fit the DenseEncoder")
+        head_ids   = neighbors.indices[:, :rerank_k]
+        valid      = head_ids >= 0
+        rows, cols = np.nonzero(valid)
+        pairs      = [(queries[row], self.corpus[head_ids[row, col]]) for row, col in zip(rows, cols)]
+        head_sc    = np.full(head_ids.shape, -np.inf, dtype=np.float32)
+        if pairs:
+            head_sc[rows, cols] = self.reranker.predict(pairs, batch_size=self.rerank_batch_size, show_progress_bar=False)
+        order      = np.argsort(-head_sc, axis=1, kind='stable')
+        indices, scores = neighbors.indices.copy(), neighbors.scores.copy()
+        indices[:, :rerank_k] = np.take_along_axis(head_ids, order, axis=1)
+        scores[:, :rerank_k]  = np.take_along_axis(head_sc, order, axis=1)
+        indices[:, :rerank_k][~np.isfinite(scores[:, :rerank_k])] = -1
+        head, tail = scores[:, :rerank_k], scores[:, rerank_k:]
+        if tail.shape[1]:
+            head_min = np.where(np.isfinite(head), head, np.inf).min(1)
+            tail_max = np.where(np.isfinite(tail), tail, -np.inf).max(1)
+            offset   = np.where(np.isfinite(head_min) & np.isfinite(tail_max), np.maximum(tail_max - head_min, 0.0), 0.0)
+            head    += offset[:, None].astype(head.dtype)
+        return Neighbors(indices=indices, scores=scores)
+
+    def retrieve(self, queries:List[str], k:int=10, candidates_k:int=100, rerank_k:int=0) -> Neighbors:
+        """retrieves the k best corpus ids per query, recording per stage latency in self.timings
+
+        Args:
+            queries (List[str]): batch of query texts
+            k (int, optional): results per query. Defaults to 10.
+            candidates_k (int, optional): candidates per generator before fusion. Defaults to 100.
+            rerank_k (int, optional): fused results reranked by the cross-encoder, 0 disables. Defaults to 0.
+
+        Returns:
+            Neighbors: corpus ids and scores of shape (n_queries, k)
+        """
+        if rerank_k > 0 and self.reranker is None:
+            raise ValueError("rerank_k requires a cross-encoder, pass reranker_name to HybridRetriever")
+        queries  = list(queries)
+        timings  = {}
+        start    = time.perf_counter()
+        sparse   = self.generate_sparse(queries, candidates_k)
+        timings['sparse'] = time.perf_counter() - start
+        start    = time.perf_counter()
+        dense    = self.generate_dense(queries, candidates_k)
+        timings['dense']  = time.perf_counter() - start
+        start    = time.perf_counter()
+        fused    = self.fuse([sparse, dense], k=max(k, rerank_k))
+        timings['fusion'] = time.perf_counter() - start
+        if rerank_k > 0:
+            start = time.perf_counter()
+            fused = self.rerank(queries, fused, rerank_k)
+            timings['rerank'] = time.perf_counter() - start
+        timings['total'] = sum(timings.values())
+        self.timings     = timings
+        return Neighbors(indices=fused.indices[:, :k], scores=fused.scores[:, :k])
@@ -6,6 +6,8 @@ import  sklearn
 from    sklearn.metrics.pairwise import cosine_similarity
 from    scipy.sparse._csr import csr_matrix
 
+from    ...core.search.topk import Neighbors, topk_similarity, prepare_corpus
+
 import  logging 
 logger = logging.getLogger(__name__)
 
@@ -30,53 +32,86 @@ class EvaluatorEncoder(object):
     df_tokens = evaluator.to_frame(df)
     df_scores = evaluator.calc_cosine_sim_frame()
     df_scores['Movie A'].sort_values(ascending=False).to_dict()
+
+    # large corpora: blocked top-k rather than the full (n_rows, n_rows) matrix
+    neighbors = evaluator.calc_topk_similarity(k=3)
+    neighbors.to_frame(index=evaluator.indices)
     """
 
     def __init__(self, encodings:csr_matrix, vocab:np.ndarray, indices:np.array):
-        self.encodings = encodings
-        self.vocab     = vocab
-        self.df_vector = pd.DataFrame(self.encodings.toarray(), columns=self.vocab, index=indices)
+        # keep the matrix sparse (CSR for row slicing), dense views are only built on demand
+        self.encodings   = csr_matrix(encodings)
+        self.vocab       = np.asarray(vocab)
+        self.indices     = pd.Index(indices)
+        self.vocab_index = {token: col_idx for col_idx, token in enumerate(self.vocab)}
+        self._df_vector  = None
+        self._corpus_t   = None
+
+    @property
+    def df_vector(self) -> pd.DataFrame:
+        # dense (n_rows, n_vocab) frame as before, only built when accessed rather than on construction
+        if self._df_vector is None:
+            self._df_vector = pd.DataFrame(self.encodings.toarray(), index=self.indices, columns=self.vocab)
+        return self._df_vector
+
+    @property
+    def corpus_t(self) -> csr_matrix:
+        # normalized, transposed encodings built once, lookups only normalize the query
+        if self._corpus_t is None:
+            self._corpus_t = prepare_corpus(self.encodings)
+        return self._corpus_t
 
     def to_frame(self, df:pd.DataFrame) -> pd.DataFrame:
-        # e.g, row.nonzero() returns nnz_row_ind, nnz_col_inz
+        # CSR row i holds its column indices in indices[indptr[i]:indptr[i+1]]
+        row_columns = np.split(self.encodings.indices, self.encodings.indptr[1:-1])
         return df.assign(
-            tokens_encoded = [
-                sorted([self.vocab[col_idx] for col_idx in row.nonzero()[1]])  
-                for row in self.encodings 
-            ]
+            tokens_encoded = [sorted(self.vocab[col_indices].tolist()) for col_indices in row_columns]
         )
 
     def calc_cosine_sim_frame(self):
-        indices = self.df_vector.index
+        # materializes (n_rows, n_rows), prefer calc_topk_similarity beyond small corpora
+        indices = self.indices
         cosine_sim_items    = cosine_similarity(self.encodings, self.encodings)
         return pd.DataFrame(cosine_sim_items, index=indices, columns=indices)
 
     def token_to_index(self, tokens:List[str]) -> np.ndarray:
-        return np.where(np.isin(self.vocab, tokens))[-1]
+        # O(1) vocab lookups per token, unknown tokens are skipped
+        return np.array([self.vocab_index[token] for token in tokens if token in self.vocab_index], dtype=np.int64)
 
     # for given record, look up token score (tfidf score)
     def lookup_token_score(self, corpus_index:int, tokens:List[str]) -> dict:
-        try:
-            encodings     = self.encodings.toarray()
-            token_indices = list( self.token_to_index(tokens) )
-            scores        = encodings[corpus_index, token_indices]
-            return {
-                token: dict(indices = index, scores = round(score, 3)) 
-                for token, index, score in zip(tokens, token_indices, scores)
-            }
-        except ValueError as e:
-            logger.exception(f"Exception, Token not in Vocab: {token}:{e}")
-            return None
+        # tokens not in the vocab are skipped
+        tokens        = [token for token in tokens if token in self.vocab_index]
+        token_indices = self.token_to_index(tokens)
+        # slice the single CSR row, then only the requested columns
+        scores        = self.encodings[corpus_index][:, token_indices].toarray().ravel()
+        return {
+            token: dict(indices = index, scores = round(score, 3)) 
+            for token, index, score in zip(tokens, token_indices.tolist(), scores.tolist())
+        }
 
     def lookup_score(self, encoding:np.ndarray, k:int=5) -> dict:
-        # flatten to extract single list: (1, num_rows) -> (num_rows, )
-        encodings        = self.encodings.toarray()
-        metric_vector    = cosine_similarity(encoding, encodings).flatten()
-        sorted_indices   = np.argsort(metric_vector)[::-1].astype(int)
-        top_k_indices    = list(sorted_indices[:k])
-        results          = [round(metric_vector[idx],3) for idx in top_k_indices] 
+        # partial selection of the k best rather than a full argsort over all rows
+        neighbors        = topk_similarity(encoding, corpus_t=self.corpus_t, k=k)
+        valid            = neighbors.indices[0] >= 0
+        top_k_indices    = neighbors.indices[0][valid].tolist()
+        results          = [round(float(score), 3) for score in neighbors.scores[0][valid]]
         return dict(top_k_ind=top_k_indices, scores=results)
 
+    def calc_topk_similarity(self, k:int=10, block_size:int=1024, num_workers:int=1, exclude_self:bool=True) -> Neighbors:
+        """calculates the k most similar rows per row without the (n_rows, n_rows) matrix
+
+        Args:
+            k (int, optional): neighbors per row. Defaults to 10.
+            block_size (int, optional): rows scored per block. Defaults to 1024.
+            num_workers (int, optional): threads processing blocks. Defaults to 1.
+            exclude_self (bool, optional): drop each row's match with itself. Defaults to True.
+
+        Returns:
+            Neighbors: neighbor ids and cosine scores of shape (n_rows, k)
+        """
+        return topk_similarity(self.encodings, k=k, block_size=block_size, num_workers=num_workers, exclude_self=exclude_self)
+
     def get_sparsity(self) -> float:
         return round( (self.encodings.nnz / np.prod(self.encodings.shape)) * 100, 3)
 
@@ -96,5 +131,5 @@ class EvaluatorEncoder(object):
         top_k_indices    = sorted_indices[:k]
         results          = [(idx, metric_vector[idx]) for idx in top_k_indices]
         """
-        # shape of similarity_matrix will be (n_rows, n_rows)
+        # shape of similarity_matrix will be (n_rows, n_rows), see calc_topk_similarity for large corpora
         return cosine_similarity(self.encodings)
@@ -0,0 +1,6 @@
+import  sys
+from    pathlib import Path
+
+# package root importable from tests, the stub HTTP server (tests/stubs.py) sits next to the tests
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
@@ -0,0 +1,89 @@
+"""Local stub HTTP server used by the tests and the service benchmarks, mimics the chat completion endpoint
+
+>>> server, base_url = start_stub_server()
+>>> service_request(f"{base_url}/v1/chat/completions", body=payload)
+>>> server.shutdown()
+"""
+import json
+import random
+import threading
+import time
+from   http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from   typing import Tuple
+
+
+def build_completion(body:dict) -> dict:
+    content = " ".join(message.get("content", "") for message in body.get("messages", []))
+    words   = content.split()
+    return dict(
+        id      = "chatcmpl-stub",
+        object  = "chat.completion",
+        model   = body.get("model", "stub"),
+        choices = [dict(index=0, message=dict(role="assistant", content=" ".join(reversed(words))), finish_reason="stop")],
+        usage   = dict(prompt_tokens=len(words), completion_tokens=len(words), total_tokens=2 * len(words))
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # keep-alive, so pooled clients can reuse connections
+    protocol_version = "HTTP/1.1"
+    token_delay_sec:float = 0.005
+
+    def read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def write_json(self, payload:dict, status:int=200) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def write_sse(self, body:dict) -> None:
+        # one event per word, spaced by token_delay_sec, terminated by the [DONE] sentinel
+        content = build_completion(body)["choices"][0]["message"]["content"].split()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        deltas  = [dict(role="assistant")] + [dict(content=f"{word} ") for word in content]
+        for delta in deltas:
+            event = dict(id="chatcmpl-stub", object="chat.completion.chunk", choices=[dict(index=0, delta=delta, finish_reason=None)])
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.token_delay_sec)
+        final = dict(id="chatcmpl-stub", object="chat.completion.chunk", choices=[dict(index=0, delta=dict(), finish_reason="stop")])
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+        self.close_connection = True
+
+    def do_POST(self) -> None:
+        body = self.read_body()
+        if body.get("stream"):
+            self.write_sse(body)
+            return
+        self.write_json(build_completion(body) if self.path.endswith("/chat/completions") else body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class FlakyStubHandler(StubHandler):
+    # injects rate limit (429) and server (503) errors to exercise client retries
+    failure_rate:float = 0.1
+
+    def do_POST(self) -> None:
+        body = self.read_body()
+        if random.random() < self.failure_rate:
+            self.write_json(dict(error=dict(message="stub injected failure")), status=random.choice([429, 503]))
+            return
+        self.write_json(build_completion(body) if self.path.endswith("/chat/completions") else body)
+
+
+def start_stub_server(host:str="127.0.0.1", port:int=0, handler=StubHandler) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,143 @@
+import  json
+import  threading
+import  pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("requests")
+
+from    keebler_llm.integrations.openai.batch import TokenBucket, BatchCompletionRunner
+from    stubs import start_stub_server, build_completion, StubHandler
+
+
+class FakeClock(object):
+    # monotonic clock advanced only by sleep, records every sleep
+    def __init__(self):
+        self.now    = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds:float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_bucket(rate_per_min:float, capacity:float=None):
+    clock = FakeClock()
+    return TokenBucket(rate_per_min, capacity=capacity, clock=clock, sleep=clock.sleep), clock
+
+
+def test_burst_up_to_capacity_without_waiting():
+    bucket, clock = make_bucket(rate_per_min=60, capacity=5)
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+    assert clock.sleeps == []
+
+
+def test_waits_for_refill_at_rate():
+    bucket, clock = make_bucket(rate_per_min=60, capacity=2)       # 1 token/sec
+    bucket.acquire(2)
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire(2) == pytest.approx(2.0)
+    assert clock.now == pytest.approx(3.0)
+
+
+def test_refills_with_elapsed_time_up_to_capacity():
+    bucket, clock = make_bucket(rate_per_min=120, capacity=4)      # 2 tokens/sec
+    bucket.acquire(4)
+    clock.now += 10.0
+    assert bucket.acquire(4) == 0.0
+    assert bucket.acquire(1) == pytest.approx(0.5)
+
+
+def test_amount_above_capacity_is_capped():
+    bucket, clock = make_bucket(rate_per_min=60, capacity=3)
+    assert bucket.acquire(10) == 0.0
+    assert bucket.acquire(10) == pytest.approx(3.0)
+
+
+class CountingHandler(StubHandler):
+    # counts the requests per prompt, failing the first attempts of every prompt with 429 then 503
+    failures:int  = 0
+    status:int    = 429
+    attempts:dict = dict()
+    lock          = threading.Lock()
+
+    def do_POST(self) -> None:
+        body    = self.read_body()
+        content = body["messages"][0]["content"]
+        with self.lock:
+            attempt = self.attempts[content] = self.attempts.get(content, 0) + 1
+        if attempt <= self.failures:
+            status = self.status if attempt == 1 else 503
+            self.write_json(dict(error=dict(message="stub injected failure")), status=status)
+            return
+        self.write_json(build_completion(body))
+
+
+class WordTokenizer(object):
+    # whitespace tokens, the default Tokenizer needs a tiktoken encoding download
+    def encode(self, text:str) -> list:
+        return text.split()
+
+
+@pytest.fixture
+def counting_server():
+    CountingHandler.attempts, CountingHandler.failures, CountingHandler.status = dict(), 0, 429
+    server, base_url = start_stub_server(handler=CountingHandler)
+    yield f"{base_url}/v1/chat/completions"
+    server.shutdown()
+
+
+def make_runner(endpoint:str, **kwargs) -> BatchCompletionRunner:
+    params = dict(max_concurrency=4, requests_per_min=60_000, tokens_per_min=10_000_000, backoff_factor=0.0)
+    return BatchCompletionRunner("stub", config=dict(max_tokens=16), credentials=dict(api_key="test"), endpoint=endpoint,
+                                 tokenizer=WordTokenizer(), **{**params, **kwargs})
+
+
+PROMPTS = [f"prompt number {idx}" for idx in range(25)]
+
+
+def contents(results:list) -> list:
+    return [result["choices"][0]["message"]["content"] if result else None for result in results]
+
+
+def test_results_follow_prompt_order(counting_server):
+    results = make_runner(counting_server).run(PROMPTS)
+    assert contents(results) == [f"{idx} number prompt" for idx in range(25)]
+
+
+def test_retries_rate_limits_and_server_errors(counting_server):
+    CountingHandler.failures = 2                # 429 then 503 before every success
+    results = make_runner(counting_server, max_retries=2).run(PROMPTS[:5])
+    assert contents(results) == [f"{idx} number prompt" for idx in range(5)]
+    assert set(CountingHandler.attempts.values()) == {3}
+
+
+def test_gives_up_after_max_retries(counting_server):
+    CountingHandler.failures = 5
+    assert make_runner(counting_server, max_retries=1).run(PROMPTS[:3]) == [None] * 3
+    assert set(CountingHandler.attempts.values()) == {2}
+
+
+def test_client_errors_are_not_retried(counting_server):
+    CountingHandler.failures, CountingHandler.status = 1, 400
+    assert make_runner(counting_server, max_retries=3).run(PROMPTS[:3]) == [None] * 3
+    assert set(CountingHandler.attempts.values()) == {1}
+
+
+def test_resumes_from_checkpoint(counting_server, tmp_path):
+    checkpoint = tmp_path.joinpath("run.jsonl")
+    first      = make_runner(counting_server, checkpoint_path=str(checkpoint)).run(PROMPTS[:10])
+    # an interrupted run: drop the last records, mark one as failed and leave a partially written line
+    records    = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    kept       = sorted(records, key=lambda record: record["index"])[:6]
+    kept[0]    = dict(kept[0], response=None, error="HTTP 503")
+    checkpoint.write_text("".join(json.dumps(record) + "\n" for record in kept) + '{"index": 9, "resp')
+    CountingHandler.attempts = dict()
+    resumed    = make_runner(counting_server, checkpoint_path=str(checkpoint)).run(PROMPTS[:10])
+    assert contents(resumed) == contents(first)
+    # only the failed and the missing requests are sent again
+    assert sorted(CountingHandler.attempts) == sorted([PROMPTS[0]] + PROMPTS[6:10])
+    # records appended after the partial line stay readable for the next resume
+    assert sorted(make_runner(counting_server, checkpoint_path=str(checkpoint)).load_checkpoint()) == list(range(10))
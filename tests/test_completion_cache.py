@@ -0,0 +1,92 @@
+import  pytest
+
+from    keebler_llm.integrations.openai.cache import CompletionCache, cached_completion
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CompletionCache(path=str(tmp_path.joinpath('cache.sqlite')))
+    yield cache
+    cache.close()
+
+
+def make_completion():
+    calls = []
+
+    @cached_completion()
+    def generate(model_name:str, messages:list, config:dict, stream:bool=False):
+        calls.append(messages)
+        return dict(choices=[dict(message=dict(role="assistant", content=f"answer {len(calls)}"))])
+    return generate, calls
+
+
+MESSAGES = [dict(role="user", content="What is the  capital of France?")]
+
+
+def test_miss_then_hit(cache):
+    generate, calls = make_completion()
+    first  = generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    second = generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    assert first == second
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+
+def test_key_depends_on_model_messages_and_config(cache):
+    generate, calls = make_completion()
+    generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    generate("other", MESSAGES, dict(temperature=0), cache=cache)
+    generate("stub", MESSAGES, dict(temperature=0, max_tokens=16), cache=cache)
+    generate("stub", [dict(role="user", content="Another question")], dict(temperature=0), cache=cache)
+    assert len(calls) == 4
+    assert cache.hits == 0
+
+
+def test_sampled_and_streamed_requests_bypass(cache):
+    generate, calls = make_completion()
+    generate("stub", MESSAGES, dict(temperature=0.7), cache=cache)
+    generate("stub", MESSAGES, dict(temperature=0.7), cache=cache)
+    generate("stub", MESSAGES, dict(temperature=0), stream=True, cache=cache)
+    assert len(calls) == 3
+    assert (cache.bypassed, len(cache)) == (3, 0)
+
+
+def test_normalize_shares_reformatted_prompts(tmp_path):
+    cache = CompletionCache(path=str(tmp_path.joinpath('cache.sqlite')), normalize=True)
+    generate, calls = make_completion()
+    generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    generate("stub", [dict(role="user", content="What is the capital of France? ")], dict(temperature=0), cache=cache)
+    assert len(calls) == 1
+    cache.close()
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = CompletionCache(path=str(tmp_path.joinpath('cache.sqlite')), ttl_sec=-1)
+    generate, calls = make_completion()
+    generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+    assert len(calls) == 2
+    assert cache.hits == 0
+    cache.close()
+
+
+def test_max_entries_evicts_least_recently_accessed(tmp_path):
+    cache = CompletionCache(path=str(tmp_path.joinpath('cache.sqlite')), max_entries=2)
+    keys  = [cache.make_key("stub", [dict(role="user", content=str(idx))], dict()) for idx in range(3)]
+    for key in keys:
+        cache.put(key, dict(content=key))
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == dict(content=keys[2])
+    assert cache.evictions == 1
+    cache.close()
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path.joinpath('cache.sqlite'))
+    generate, calls = make_completion()
+    for _ in range(2):
+        cache = CompletionCache(path=path)
+        generate("stub", MESSAGES, dict(temperature=0), cache=cache)
+        cache.close()
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+import  pytest
+
+np = pytest.importorskip("numpy")
+
+from    keebler_llm.core.search.index import IndexFlat, IndexIVF, create_index, load_index
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(42).standard_normal((64, 8)).astype(np.float32)
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf'])
+def test_search_empty_index(index_type):
+    index       = create_index(index_type, dim=8, n_lists=4) if index_type == 'ivf' else create_index(index_type, dim=8)
+    if index_type == 'ivf':
+        index.train(np.random.default_rng(0).standard_normal((16, 8)))
+    scores, ids = index.search(np.ones((2, 8)), k=3)
+    assert (ids == -1).all() and np.isneginf(scores).all()
+
+
+def test_flat_search_after_removing_every_id(vectors):
+    index = IndexFlat(dim=8)
+    ids   = index.add(vectors[:5])
+    assert index.remove(ids) == 5
+    scores, found = index.search(vectors[:2], k=3)
+    assert (found == -1).all() and np.isneginf(scores).all()
+
+
+def test_flat_pads_fewer_than_k(vectors):
+    index = IndexFlat(dim=8)
+    index.add(vectors[:2], ids=[10, 20])
+    _, found = index.search(vectors[:1], k=4)
+    assert found[0].tolist() == [10, 20, -1, -1]
+
+
+def test_rejects_duplicate_ids(vectors):
+    index = IndexFlat(dim=8)
+    index.add(vectors[:2], ids=[1, 2])
+    with pytest.raises(ValueError):
+        index.add(vectors[2:3], ids=[2])
+    with pytest.raises(ValueError):
+        index.add(vectors[2:4], ids=[5, 5])
+    index.remove([2])
+    assert index.add(vectors[2:3], ids=[2]).tolist() == [2]
+
+
+def test_ivf_buffers_until_trainable(vectors):
+    index = IndexIVF(dim=8, n_lists=16, n_probe=16)
+    index.add(vectors[:5])
+    assert not index.is_trained and len(index) == 5
+    _, found = index.search(vectors[:2], k=1)
+    assert found[:, 0].tolist() == [0, 1]
+    index.add(vectors[5:])
+    assert index.is_trained and len(index) == 64
+    _, found = index.search(vectors[:3], k=1)
+    assert found[:, 0].tolist() == [0, 1, 2]
+
+
+def test_ivf_retrain_reassigns_vectors(vectors):
+    index = IndexIVF(dim=8, n_lists=8, n_probe=8)
+    index.add(vectors)
+    index.train(vectors[::-1] * 2.0)
+    assert len(index) == 64
+    labels = index.assign(index.prepare(vectors))
+    for list_id, store in enumerate(index.lists):
+        assert (labels[store.ids] == list_id).all()
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf'])
+def test_save_load_roundtrip(tmp_path, vectors, index_type):
+    index = create_index(index_type, dim=8, n_lists=4) if index_type == 'ivf' else create_index(index_type, dim=8)
+    index.add(vectors)
+    loaded = load_index(index.save(str(tmp_path.joinpath('index'))))
+    assert len(loaded) == len(index) and loaded.next_id == index.next_id
+    assert (loaded.search(vectors[:4], k=2)[1] == index.search(vectors[:4], k=2)[1]).all()
+    with pytest.raises(ValueError):
+        loaded.add(vectors[:1], ids=[0])
@@ -0,0 +1,179 @@
+import  threading
+import  pytest
+
+from    keebler_llm.integrations.huggingface.registry import ModelRegistry, calc_model_bytes
+
+
+class TinyProcessor(object):
+    # locally constructed non-model artifact (tokenizer/processor tasks), no torch required
+    def __init__(self, model_name:str, **kwargs):
+        self.model_name = model_name
+        self.kwargs     = kwargs
+
+
+class ProcessorLoader(object):
+    # records loads per model name and signals their start, loads wait on release when it is given
+    def __init__(self, release:threading.Event=None):
+        self.calls   = []
+        self.started = dict()
+        self.release = release
+        self.lock    = threading.Lock()
+
+    def __call__(self, model_name:str, **kwargs) -> TinyProcessor:
+        with self.lock:
+            self.calls.append(model_name)
+            started = self.started.setdefault(model_name, threading.Event())
+        started.set()
+        if self.release is not None:
+            assert self.release.wait(timeout=5)
+        return TinyProcessor(model_name, **kwargs)
+
+
+def test_get_returns_shared_instance():
+    loader   = ProcessorLoader()
+    registry = ModelRegistry(loaders=dict(tokenizer=loader))
+    assert registry.get('tokenizer', 'model-a') is registry.get('tokenizer', 'model-a')
+    assert loader.calls == ['model-a']
+    assert (registry.hits, registry.misses) == (1, 1)
+
+
+def test_loader_kwargs_are_part_of_the_key():
+    registry = ModelRegistry(loaders=dict(tokenizer=ProcessorLoader()))
+    short    = registry.get('tokenizer', 'model-a', max_seq_len=128)
+    long     = registry.get('tokenizer', 'model-a', max_seq_len=256)
+    assert len(registry) == 2
+    assert (short.kwargs, long.kwargs) == (dict(max_seq_len=128), dict(max_seq_len=256))
+
+
+def test_concurrent_callers_load_a_key_once():
+    release  = threading.Event()
+    loader   = ProcessorLoader(release=release)
+    loader.started['model-a'] = threading.Event()
+    registry = ModelRegistry(loaders=dict(tokenizer=loader))
+    results  = []
+    threads  = [threading.Thread(target=lambda: results.append(registry.get('tokenizer', 'model-a'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # the first caller is inside the loader, the others wait on the key lock or arrive after the load
+    assert loader.started['model-a'].wait(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == ['model-a']
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert (registry.hits, registry.misses) == (7, 1)
+
+
+def test_different_keys_load_in_parallel():
+    # each load only finishes once the other key's load has started, serialized loads would time out
+    loader   = ProcessorLoader()
+    overlap  = dict()
+
+    def load(model_name:str, other:str, **kwargs) -> TinyProcessor:
+        processor = loader(model_name, **kwargs)
+        overlap[model_name] = loader.started[other].wait(timeout=5)
+        return processor
+
+    loader.started.update({name: threading.Event() for name in ('model-a', 'model-b')})
+    registry = ModelRegistry(loaders=dict(tokenizer=load))
+    threads  = [threading.Thread(target=registry.get, args=('tokenizer', name), kwargs=dict(other=other))
+                for name, other in (('model-a', 'model-b'), ('model-b', 'model-a'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlap == {'model-a': True, 'model-b': True}
+    assert len(registry) == 2
+
+
+def test_key_locks_only_live_while_loading():
+    def failing(model_name:str, **kwargs):
+        raise OSError(f"missing weights: {model_name}")
+
+    registry = ModelRegistry(loaders=dict(tokenizer=ProcessorLoader(), feature_extractor=failing))
+    for idx in range(16):
+        registry.get('tokenizer', f'model-{idx}')
+    with pytest.raises(OSError):
+        registry.get('feature_extractor', 'model-a')
+    assert registry.key_locks == {}
+
+
+def test_release_and_unknown_task():
+    registry = ModelRegistry(loaders=dict(tokenizer=ProcessorLoader()))
+    registry.get('tokenizer', 'model-a')
+    assert registry.release('tokenizer', 'model-a')
+    assert not registry.release('tokenizer', 'model-a')
+    with pytest.raises(ValueError):
+        registry.get('missing', 'model-a')
+
+
+@pytest.fixture
+def torch():
+    return pytest.importorskip("torch")
+
+
+@pytest.fixture
+def tiny_models(torch, tmp_path):
+    # tiny BERT checkpoints constructed and saved locally, loaded through the default from_pretrained loaders
+    transformers = pytest.importorskip("transformers")
+    paths        = []
+    for idx in range(3):
+        transformers.set_seed(idx)
+        config = transformers.BertConfig(vocab_size=128, hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                                         intermediate_size=64, num_labels=2)
+        path   = tmp_path.joinpath(f"tiny-{idx}")
+        transformers.BertForSequenceClassification(config).save_pretrained(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_calc_model_bytes(torch):
+    model = torch.nn.Linear(16, 8)
+    assert calc_model_bytes(model) == (16 * 8 + 8) * 4
+    assert calc_model_bytes(model.to(torch.float16)) == (16 * 8 + 8) * 2
+    assert calc_model_bytes(TinyProcessor('tokenizer')) == 0
+
+
+def test_load_model_tasks(torch, tiny_models):
+    registry = ModelRegistry()
+    model    = registry.get('sequence_clf', tiny_models[0])
+    assert not model.training
+    assert registry.resident_bytes == calc_model_bytes(model) == sum(
+        tensor.numel() * tensor.element_size() for tensor in model.state_dict().values()
+    )
+    half     = registry.get('sequence_clf', tiny_models[0], dtype='float16')
+    assert half is not model and next(half.parameters()).dtype == torch.float16
+    masked   = registry.get('masked_lm', tiny_models[0], device='cpu')
+    assert type(masked).__name__ == 'BertForMaskedLM' and not masked.training
+    assert len(registry) == 3
+
+
+def test_qint8_quantizes_linear_layers(torch, tiny_models):
+    registry  = ModelRegistry()
+    fp32      = registry.get('sequence_clf', tiny_models[0])
+    int8      = registry.get('sequence_clf', tiny_models[0], dtype='qint8')
+    quantized = [module for module in int8.modules() if type(module).__name__ == 'Linear' and 'quantized' in type(module).__module__]
+    assert quantized and int8 is not fp32
+    assert 0 < calc_model_bytes(int8) < calc_model_bytes(fp32)
+    with pytest.raises(ValueError):
+        registry.get('sequence_clf', tiny_models[0], dtype='qint8', device='cuda')
+
+
+def test_lru_eviction_over_max_bytes(torch, tiny_models):
+    model_bytes = calc_model_bytes(ModelRegistry().get('sequence_clf', tiny_models[0]))
+    registry    = ModelRegistry(max_bytes=int(2.5 * model_bytes))
+    model_a, model_b, model_c = tiny_models
+    registry.get('sequence_clf', model_a)
+    registry.get('sequence_clf', model_b)
+    registry.get('sequence_clf', model_a)                   # model_b becomes least recently used
+    registry.get('sequence_clf', model_c)
+    assert registry.make_key('sequence_clf', model_b) not in registry
+    assert registry.make_key('sequence_clf', model_a) in registry
+    assert registry.evictions == 1
+    assert registry.resident_bytes == 2 * model_bytes
+
+
+def test_single_entry_above_cap_stays_resident(torch, tiny_models):
+    registry = ModelRegistry(max_bytes=1)
+    registry.get('sequence_clf', tiny_models[0])
+    assert len(registry) == 1
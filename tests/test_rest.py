@@ -0,0 +1,118 @@
+import  asyncio
+import  pytest
+
+requests = pytest.importorskip("requests")
+
+from    keebler_llm.core.services.rest import ServiceClient, AsyncServiceClient, ClientConfig, RetryPolicy, service_request, service_stream
+from    stubs import start_stub_server, FlakyStubHandler
+
+
+class FailingHandler(FlakyStubHandler):
+    # every request fails with 429/503, counting the requests that reach the server
+    failure_rate:float = 1.0
+    num_requests:int   = 0
+
+    def do_POST(self) -> None:
+        type(self).num_requests += 1
+        super().do_POST()
+
+
+@pytest.fixture
+def stub_url():
+    server, base_url = start_stub_server()
+    yield f"{base_url}/v1/chat/completions"
+    server.shutdown()
+
+
+@pytest.fixture
+def failing_url():
+    FailingHandler.num_requests = 0
+    server, base_url = start_stub_server(handler=FailingHandler)
+    yield f"{base_url}/v1/chat/completions"
+    server.shutdown()
+
+
+def make_body(content:str="hello pooled world", **kwargs) -> dict:
+    return dict(model="stub", messages=[dict(role="user", content=content)], **kwargs)
+
+
+def test_default_config_unbounded_read_no_post_retry():
+    config = ClientConfig()
+    assert config.timeout[1] is None
+    assert 'POST' not in config.retry.allowed_methods
+    with ServiceClient() as client:
+        retry = client.session.get_adapter('http://localhost').max_retries
+        assert 'POST' not in retry.allowed_methods
+
+
+def test_client_post(stub_url):
+    with ServiceClient() as client:
+        response = client.post(stub_url, make_body())
+    assert response['choices'][0]['message']['content'] == "world pooled hello"
+
+
+def test_service_request_matches_client(stub_url):
+    assert service_request(stub_url, make_body()) == service_request(stub_url, make_body(), session_en=True)
+
+
+def test_post_not_retried_by_default(failing_url):
+    with ServiceClient(ClientConfig(retry=RetryPolicy(total=3, backoff_factor=0))) as client:
+        assert client.post(failing_url, make_body()) is None
+    assert FailingHandler.num_requests == 1
+
+
+def test_post_retried_when_allowed(failing_url):
+    retry = RetryPolicy(total=2, backoff_factor=0, allowed_methods=('GET', 'POST'))
+    with ServiceClient(ClientConfig(retry=retry)) as client:
+        assert client.post(failing_url, make_body()) is None
+    assert FailingHandler.num_requests == 3
+
+
+def test_service_stream(stub_url):
+    with ServiceClient() as client:
+        events = list(service_stream(stub_url, make_body(stream=True), client=client))
+    content = "".join(event['choices'][0]['delta'].get('content', "") for event in events)
+    assert content.split() == ["world", "pooled", "hello"]
+    assert events[-1]['choices'][0]['finish_reason'] == "stop"
+
+
+def test_default_client_shared_across_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from keebler_llm.core.services import rest
+    monkeypatch.setattr(rest, '_default_client', None)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: rest.get_default_client(), range(32)))
+    assert len({id(client) for client in clients}) == 1
+    clients[0].close()
+
+
+def test_async_gather_keeps_order(stub_url):
+    pytest.importorskip("httpx")
+    bodies = [make_body(f"request {idx}") for idx in range(20)]
+
+    async def run():
+        async with AsyncServiceClient() as client:
+            return await client.gather(stub_url, bodies, concurrency=4)
+    responses = asyncio.run(run())
+    assert [response['choices'][0]['message']['content'] for response in responses] == [f"{idx} request" for idx in range(20)]
+
+
+def test_async_post_not_retried_by_default(failing_url):
+    pytest.importorskip("httpx")
+
+    async def run():
+        async with AsyncServiceClient(ClientConfig(retry=RetryPolicy(total=3, backoff_factor=0))) as client:
+            return await client.post(failing_url, make_body())
+    assert asyncio.run(run()) is None
+    assert FailingHandler.num_requests == 1
+
+
+def test_async_post_retried_when_allowed(failing_url):
+    pytest.importorskip("httpx")
+    retry = RetryPolicy(total=2, backoff_factor=0, allowed_methods=('GET', 'POST'))
+
+    async def run():
+        async with AsyncServiceClient(ClientConfig(retry=retry)) as client:
+            return await client.post(failing_url, make_body())
+    assert asyncio.run(run()) is None
+    assert FailingHandler.num_requests == 3
@@ -0,0 +1,58 @@
+import  pytest
+
+requests = pytest.importorskip("requests")
+
+from    keebler_llm.core.services.rest import ServiceClient, service_stream
+from    keebler_llm.integrations.openai.streaming import StreamConsumer, StreamMetrics
+from    stubs import start_stub_server
+
+
+@pytest.fixture
+def stub_url():
+    server, base_url = start_stub_server()
+    yield f"{base_url}/v1/chat/completions"
+    server.shutdown()
+
+
+def stream_body(content:str) -> dict:
+    return dict(model="stub", messages=[dict(role="user", content=content)], stream=True)
+
+
+def test_consumer_assembles_stub_stream(stub_url):
+    with ServiceClient() as client:
+        consumer = StreamConsumer(service_stream(stub_url, stream_body("one two three"), client=client))
+        deltas   = list(consumer)
+    assert deltas == ["three ", "two ", "one "]
+    assert consumer.message == "three two one "
+    assert consumer.to_dict() == dict(role="assistant", content="three two one ", finish_reason="stop")
+
+
+def test_consumer_records_latency(stub_url):
+    with ServiceClient() as client:
+        consumer = StreamConsumer(service_stream(stub_url, stream_body("a b c d"), client=client))
+        consumer.consume()
+    metrics = consumer.metrics
+    assert metrics.num_tokens == 4
+    assert metrics.ttft_sec is not None and metrics.ttft_sec > 0
+    assert metrics.total_sec >= metrics.ttft_sec
+    # the stub spaces events by token_delay_sec
+    assert len(metrics.inter_token_sec) == 3 and (metrics.inter_token_sec > 0).all()
+    assert metrics.tokens_per_sec > 0
+    summary = metrics.to_dict()
+    assert summary['num_tokens'] == 4 and summary['inter_token_p95'] >= summary['inter_token_mean'] > 0
+
+
+def test_consumer_message_tracks_partial_iteration():
+    chunks   = [dict(choices=[dict(delta=dict(content=word), finish_reason=None)]) for word in ["x", "y"]]
+    consumer = StreamConsumer(chunks, start=0.0)
+    iterator = iter(consumer)
+    assert next(iterator) == "x" and consumer.message == "x"
+    assert next(iterator) == "y" and consumer.message == "xy"
+    # a provided start is kept rather than reset on first iteration
+    assert consumer.metrics.start == 0.0
+
+
+def test_metrics_without_tokens():
+    metrics = StreamMetrics(start=1.0)
+    assert metrics.ttft_sec is None and metrics.total_sec is None and metrics.tokens_per_sec is None
+    assert metrics.to_dict()['inter_token_mean'] is None